@@ -1,90 +1,252 @@
 import tkinter as tk
-from tkinter import ttk
-from netmiko import ConnectHandler
-import json
+from tkinter import ttk, filedialog
 import os
 import time
 import threading
-
-config_file = "running_config.json"
-command_history = []
+from concurrent.futures import CancelledError, TimeoutError
+from device_worker import UiDispatcher, DeviceWorker
+from device_engine import (DeviceEngine, vlan_commands, switchport_lines, native_vlan_lines,
+                           port_security_lines, speed_duplex_lines, shutdown_lines)
+from fleet import load_hosts, staged_rollout, format_summary
+from state_cache import format_stats
+from ios_parsers import parse_ip_interface_brief, parse_vlan_brief
+from traffic_monitor import TrafficMonitor, format_rate
+from port_grid import PortGrid
+from session_pool import format_metrics
+from vlan_bulk import parse_vlan_spec, parse_vlan_csv
+from interface_range import group_interface_ranges, parse_range_echo, is_multi_selection
+from device_metrics import instrument_connect, format_seconds
+from host_inventory import HostInventory
+from inventory_cache import InventoryCache, format_age
+from output_viewer import OutputViewer
+from config_snapshots import SnapshotStore, capture_fleet, format_diff, format_store_stats
+from syslog_listener import SyslogListener, default_port, format_listener_stats
+import socket
+from config_validation import ValidationError, validate_commands
+from timing_profiles import format_profile
+from config_push import TftpServer, TftpTransfer, ScpTransfer, default_tftp_port
+from counter_store import CounterStore, collect_fleet as collect_counters, format_report, format_counter_stats
+from ios_parsers import parse_interfaces_counters
+from mac_index import MacIndex, collect_fleet, format_index_stats, uplink_threshold
+import credential_store
+
+device_timeout = 120
+bulk_vlan_csv = {}
+# All device state lives in the engine; this module only reads widgets and renders results.
+# Netmiko is imported by the engine on the first connect. The engine and the disk-backed stores are
+# opened by open_stores() and the window by build_window(), so importing this module creates neither.
+engine = None
+# The interface/VLAN snapshot currently rendered, so refreshes that change nothing skip the redraw
+displayed_snapshot = None
+host_inventory = None
+host_picker_page_size = 200
+snapshot_store = None
+# With live syslog updates the port grid is event driven and only re-polled every reconcile_interval seconds
+syslog_port = default_port
+syslog_listener = None
+reconcile_interval = 300
+reconcile_after_id = None
+device_addresses = {}
+mac_index = None
+# Fleet MAC/ARP collection skips devices collected within the last mac_index_max_age seconds
+mac_index_max_age = 900
+# Whole-config pushes: the device pulls from our TFTP server (started on first use) or we copy by SCP
+tftp_port = default_tftp_port
+tftp_server = None
+# Interface counter history; "Record counters" polls the fleet every counter_interval seconds
+counter_store = None
+counter_interval = 60
+counter_after_id = None
+# Streamed commands such as show tech-support can run far longer than device_timeout
+stream_timeout = 1800
 
 class ConnectionTimer:
     def __init__(self, label):
         self.label = label
         self.start_time = None
         self.running = False
-        self.thread = None
+        self.after_id = None
 
     def start(self):
+        self.stop()
         self.start_time = time.time()
         self.running = True
-        self.thread = threading.Thread(target=self.update)
-        self.thread.start()
+        self.update()
 
     def stop(self):
         self.running = False
-        if self.thread is not None:
-            self.thread.join()
+        if self.after_id is not None:
+            self.label.after_cancel(self.after_id)
+            self.after_id = None
 
     def update(self):
-        while self.running:
-            elapsed_time = int(time.time() - self.start_time)
-            minutes, seconds = divmod(elapsed_time, 60)
-            hours, minutes = divmod(minutes, 60)
-            time_format = f"{hours:02}:{minutes:02}:{seconds:02}"
-            self.label.config(text=time_format)
-            time.sleep(1)
-
-def save_running_config():
-    with open(config_file, 'w') as f:
-        json.dump(command_history, f)
-
-def load_running_config():
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            return json.load(f)
-    return []
+        # Rescheduled with after() so the label is only touched from the Tk main thread
+        if not self.running:
+            return
+        elapsed_time = int(time.time() - self.start_time)
+        minutes, seconds = divmod(elapsed_time, 60)
+        hours, minutes = divmod(minutes, 60)
+        time_format = f"{hours:02}:{minutes:02}:{seconds:02}"
+        self.label.config(text=time_format)
+        self.after_id = self.label.after(1000, self.update)
+
+def run_device_task(task, on_success=None, message="Working...", error_message="An error occurred", on_error=None, timeout=None):
+    def done(future):
+        engine.metrics.observe_queue_wait(getattr(future, "queue_wait", None))
+        try:
+            result = future.result()
+        except TimeoutError as e:
+            update_status(f"{error_message}: {e}")
+            if on_error:
+                on_error(e)
+        except CancelledError as e:
+            update_status("Cancelled.")
+            if on_error:
+                on_error(e)
+        except Exception as e:
+            update_status(f"{error_message}: {e}")
+            if on_error:
+                on_error(e)
+        else:
+            if on_success:
+                on_success(result)
+
+    if message:
+        update_status(message)
+    return device_worker.submit(task, timeout=timeout or device_timeout, on_done=done)
+
+def update_busy_indicator():
+    device_worker.check_timeouts()
+    if device_worker.busy and not busy_progress.winfo_ismapped():
+        busy_progress.pack(side='left', padx=5)
+        cancel_button.pack(side='left', padx=5)
+        busy_progress.start(10)
+    elif not device_worker.busy and busy_progress.winfo_ismapped():
+        busy_progress.stop()
+        busy_progress.pack_forget()
+        cancel_button.pack_forget()
+
+def cancel_device_tasks():
+    device_worker.cancel_all()
+
+def schedule_keepalive():
+    def done(future):
+        try:
+            lost = future.result()
+        except Exception:
+            return
+        if lost:
+            update_status(f"Lost the session to {lost}; reconnect to continue.")
+            update_connection_status(False)
+            connection_timer.stop()
+
+    # Keepalives go through the device worker so they never overlap a command on the same session
+    device_worker.submit(engine.keepalive, on_done=done)
+    root.after(engine.session_pool.keepalive_interval * 1000, schedule_keepalive)
+
+def on_close():
+    if syslog_listener is not None:
+        syslog_listener.stop()
+    if tftp_server is not None:
+        tftp_server.stop()
+    counter_store.close()
+    device_worker.submit(engine.close)
+    device_worker.stop()
+    root.destroy()
+
+def refresh_inventory(force=False):
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
+
+    def render(snapshot):
+        render_snapshot(snapshot)
+        if force:
+            update_status(f"{format_stats(engine.state_cache.stats())} | {format_metrics(engine.session_pool.metrics())}")
+
+    run_device_task(lambda: engine.snapshot(force), render, "Fetching interfaces and VLANs...",
+                    "An error occurred while fetching interfaces and VLANs")
+
+def render_snapshot(snapshot):
+    # Comboboxes and the port grid are all fed from the same snapshot; returns False when nothing changed
+    global displayed_snapshot
+    key = (snapshot["interfaces"], snapshot["vlans"])
+    if key == displayed_snapshot:
+        return False
+    displayed_snapshot = key
+    populate_interfaces_and_vlans(snapshot)
+    populate_port_status(snapshot)
+    return True
+
+def show_cached_inventory(host):
+    # Last known state from disk, shown before any round trip; the next refresh reconciles it
+    snapshot = engine.inventory_cache.load(host) if host else None
+    if snapshot is None:
+        render_snapshot({"interfaces": "", "vlans": ""})
+        return False
+    render_snapshot(snapshot)
+    update_status(f"Showing last known interfaces and VLANs of {host} ({format_age(snapshot['taken'])}).")
+    return True
 
 def connect_device():
-    global net_connect
-    device = {
-        "device_type": "cisco_ios",
-        "host": host_entry.get(),
-        "username": username_entry.get(),
-        "password": password_entry.get(),
-        "secret": secret_entry.get(),
-    }
-    
-    try:
-        net_connect = ConnectHandler(**device)
-        net_connect.enable()
-        update_status(f"Connected to {host_entry.get()}")
+    host = host_entry.get()
+    username = username_entry.get()
+    password = password_entry.get()
+    secret = secret_entry.get()
+    show_cached_inventory(host)
+    saved = host_inventory.get(host)
+    timing = saved["timing"] if saved else None
+
+    def connect():
+        engine.connect(host, username, password, secret, saved["device_type"] if saved else "cisco_ios", timing=timing)
+        # Syslog arrives from the device's address, which may differ from the name typed in
+        try:
+            device_addresses[host] = socket.gethostbyname(host)
+        except OSError:
+            device_addresses[host] = host
+        # Saved hosts are measured once; the profile is stored with the host and reused on later connects
+        if saved and not timing:
+            return engine.calibrate_timing()
+        return None
+
+    def connected(profile):
+        if profile:
+            host_inventory.set_timing(host, profile)
+        update_status(f"Connected to {host}. {format_profile(engine.timing)}")
         update_connection_status(True)
         connection_timer.start()
-        populate_interfaces_and_vlans()
-        populate_port_status()
+        refresh_inventory()
         apply_stored_config()
-    except Exception as e:
-        update_status(f"An error occurred: {e}")
-        update_connection_status(False)
+
+    run_device_task(connect, connected, f"Connecting to {host}...", on_error=lambda e: update_connection_status(False))
 
 def apply_stored_config():
-    global command_history
-    command_history = load_running_config()
-    if command_history:
-        for command_set in command_history:
-            net_connect.send_config_set(command_set)
+    host = host_entry.get()
+
+    def replayed(counts):
+        if counts is None:
+            update_status(f"Connected to {host}")
+        else:
+            update_status(f"Connected to {host}. Stored config: {counts[0]} commands sent, {counts[1]} skipped.")
+
+    run_device_task(engine.apply_stored_config, replayed, "Replaying stored config...")
 
 def disconnect_device():
-    try:
-        net_connect.disconnect()
-        update_status(f"Disconnected from {host_entry.get()}")
+    host = host_entry.get()
+
+    def disconnected(_):
+        update_status(f"Disconnected from {host}")
         update_connection_status(False)
         connection_timer.stop()
-    except Exception as e:
-        update_status(f"An error occurred: {e}")
+
+    def failed(e):
         update_connection_status(False)
+        connection_timer.stop()
+
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
+    run_device_task(engine.disconnect, disconnected, f"Disconnecting from {host}...", on_error=failed)
 
 def update_connection_status(connected):
     if connected:
@@ -94,85 +256,141 @@ def update_connection_status(connected):
         connection_timer_label.config(text="00:00:00")
 
 def save_input():
-    new_data = {
-        "host": host_entry.get(),
-        "username": username_entry.get(),
-        "password": password_entry.get(),
-        "secret": secret_entry.get()
-    }
-    
-    if os.path.exists('saved_inputs.json'):
-        with open('saved_inputs.json', 'r') as f:
-            saved_inputs = json.load(f)
+    host = host_entry.get().strip()
+    if not host:
+        update_status("Enter a host to save.")
+        return
+    if not host_inventory.add(host, username_entry.get()):
+        update_status("Host already exists. Duplicate not allowed.")
+        return
+
+    # Passwords go to the OS keyring, never into the inventory database
+    if credential_store.save_credentials(host, password_entry.get(), secret_entry.get()):
+        update_status("Saved successfully.")
     else:
-        saved_inputs = []
+        update_status("Saved host and username. Install the keyring package to remember passwords.")
 
-    # Check for duplicate host
-    for data in saved_inputs:
-        if data['host'] == new_data['host']:
-            update_status("Host already exists. Duplicate not allowed.")
-            return
-    
-    saved_inputs.append(new_data)
-    
-    with open('saved_inputs.json', 'w') as f:
-        json.dump(saved_inputs, f, indent=4)
-    
-    update_status("Saved successfully.")
-    save_running_config()
+def import_saved_inputs():
+    try:
+        imported, skipped, stored = host_inventory.import_json()
+    except Exception as e:
+        update_status(f"An error occurred while importing saved_inputs.json: {e}")
+        return
+    if imported or skipped:
+        update_status(f"Imported {imported} hosts from saved_inputs.json ({skipped} duplicates, {stored} with stored passwords). "
+                      f"The file still contains plaintext passwords and can be deleted.")
 
 def load_saved_inputs():
-    if os.path.exists('saved_inputs.json'):
-        with open('saved_inputs.json', 'r') as f:
-            saved_inputs = json.load(f)
-    else:
-        saved_inputs = []
-    
     popup = tk.Toplevel()
     popup.title("Saved Hosts")
-
-    # Dynamically set the window size based on the number of saved inputs
-    window_height = min(400, 50 + len(saved_inputs) * 30)
-    popup.geometry(f"300x{window_height}")
-
-    for widget in popup.winfo_children():
-        widget.destroy()
-    
-    for data in saved_inputs:
-        host = data['host']
-        button_frame = tk.Frame(popup)
-        button_frame.pack(fill='x', padx=5, pady=2)
-        button = tk.Button(button_frame, text=f"{host}", command=lambda data=data: load_input(data, popup), relief='flat')
-        button.pack(side='left', fill='x', expand=True)
-        delete_button = tk.Button(button_frame, text="X", command=lambda host=host: delete_input(host, popup), fg="red", relief='flat')
-        delete_button.pack(side='left')
+    popup.geometry("460x420")
+
+    filter_frame = tk.Frame(popup)
+    filter_frame.pack(fill='x', padx=5, pady=5)
+    tk.Label(filter_frame, text="Filter:").pack(side='left')
+    filter_entry = tk.Entry(filter_frame)
+    filter_entry.pack(side='left', fill='x', expand=True, padx=5)
+    filter_entry.focus_set()
+    count_label = tk.Label(popup, anchor='w', text="Type a host prefix, part of a name, or tag:NAME")
+    count_label.pack(fill='x', padx=5)
+
+    list_frame = tk.Frame(popup)
+    list_frame.pack(fill='both', expand=True, padx=5)
+    tree = ttk.Treeview(list_frame, columns=("username", "tags"), selectmode='browse')
+    tree.heading("#0", text="Host")
+    tree.heading("username", text="Username")
+    tree.heading("tags", text="Tags")
+    tree.column("username", width=90)
+    scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=tree.yview)
+    scrollbar.pack(side='right', fill='y')
+    tree.pack(side='left', fill='both', expand=True)
+
+    state = {"after_id": None, "query": "", "loaded": 0, "total": 0}
+
+    def load_page():
+        # Only one page of rows exists in the Treeview at a time; more are fetched as the list is scrolled
+        rows = host_inventory.search(state["query"], limit=host_picker_page_size, offset=state["loaded"])
+        for data in rows:
+            tree.insert('', tk.END, iid=data["host"], text=data["host"],
+                        values=(data["username"], ", ".join(host_inventory.host_tags(data["host"]))))
+        state["loaded"] += len(rows)
+        count_label.config(text=f"Showing {state['loaded']} of {state['total']} hosts")
+
+    def refresh():
+        state["after_id"] = None
+        state["query"] = filter_entry.get()
+        state["loaded"] = 0
+        state["total"] = host_inventory.count(state["query"])
+        tree.delete(*tree.get_children())
+        load_page()
+        children = tree.get_children()
+        if children:
+            tree.selection_set(children[0])
+            tree.focus(children[0])
+
+    def on_filter(_):
+        # Searches run once typing pauses rather than on every keystroke
+        if state["after_id"] is not None:
+            popup.after_cancel(state["after_id"])
+        state["after_id"] = popup.after(150, refresh)
+
+    def on_scroll(first, last):
+        scrollbar.set(first, last)
+        if float(last) > 0.95 and state["loaded"] < state["total"]:
+            load_page()
+
+    def selected_host():
+        return tree.focus() or (tree.selection() or (None,))[0]
+
+    def choose(_=None):
+        host = selected_host()
+        if host:
+            load_input(host_inventory.get(host), popup)
+
+    def delete():
+        host = selected_host()
+        if host:
+            host_inventory.delete(host)
+            refresh()
+
+    def save_tags():
+        host = selected_host()
+        if host:
+            host_inventory.set_tags(host, [tag.strip() for tag in tags_entry.get().split(",") if tag.strip()])
+            refresh()
+
+    tree.configure(yscrollcommand=on_scroll)
+    filter_entry.bind("<KeyRelease>", on_filter)
+    filter_entry.bind("<Return>", choose)
+    filter_entry.bind("<Down>", lambda e: tree.focus_set())
+    tree.bind("<Double-1>", choose)
+    tree.bind("<Return>", choose)
+
+    controls = tk.Frame(popup)
+    controls.pack(fill='x', padx=5, pady=5)
+    tk.Button(controls, text="Load", command=choose, bg='lightgreen').pack(side='left', padx=2)
+    tk.Button(controls, text="Delete", command=delete, fg="red").pack(side='left', padx=2)
+    tk.Label(controls, text="Tags:").pack(side='left', padx=(10, 2))
+    tags_entry = tk.Entry(controls, width=18)
+    tags_entry.pack(side='left')
+    tk.Button(controls, text="Set Tags", command=save_tags).pack(side='left', padx=2)
+    refresh()
 
 def load_input(data, popup):
+    password, secret = credential_store.load_credentials(data['host'])
     host_entry.delete(0, tk.END)
     host_entry.insert(0, data['host'])
     username_entry.delete(0, tk.END)
     username_entry.insert(0, data['username'])
     password_entry.delete(0, tk.END)
-    password_entry.insert(0, data['password'])
+    password_entry.insert(0, password)
     secret_entry.delete(0, tk.END)
-    secret_entry.insert(0, data['secret'])
+    secret_entry.insert(0, secret)
     popup.destroy()
-
-def delete_input(host, popup):
-    if os.path.exists('saved_inputs.json'):
-        with open('saved_inputs.json', 'r') as f:
-            saved_inputs = json.load(f)
-        
-        saved_inputs = [data for data in saved_inputs if data['host'] != host]
-        
-        with open('saved_inputs.json', 'w') as f:
-            json.dump(saved_inputs, f, indent=4)
-    
-    popup.destroy()
-    load_saved_inputs()
+    show_cached_inventory(data['host'])
 
 def create_vlan():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
     
@@ -180,20 +398,48 @@ def create_vlan():
     vlan_number = vlan_number_entry.get()
     
     try:
-        commands = [
-            f"vlan {vlan_number}",
-            f"name {vlan_name}",
-            "write memory"
-        ]
-        net_connect.send_config_set(commands)
-        command_history.append(commands)
-        save_running_config()
-        update_status(f"VLAN {vlan_number} named {vlan_name} created successfully.")
+        push_config(vlan_commands(vlan_number, vlan_name), f"VLAN {vlan_number} named {vlan_name} created successfully.")
     except Exception as e:
         update_status(f"An error occurred: {e}")
 
+def create_bulk_vlans():
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
+
+    try:
+        requested = {vlan: None for vlan in parse_vlan_spec(bulk_vlan_entry.get())}
+        requested.update(bulk_vlan_csv)
+    except ValueError as e:
+        update_status(f"Invalid VLAN list: {e}")
+        return
+    if not requested:
+        update_status("No VLANs to create.")
+        return
+
+    def planned(result):
+        commands, created, skipped = result
+        if not commands:
+            update_status(f"All {skipped} VLANs already exist.")
+            return
+        push_config(commands, f"Created {created} VLANs ({len(commands)} commands), {skipped} already existed.")
+
+    run_device_task(lambda: engine.plan_bulk_vlans(requested), planned, f"Checking {len(requested)} VLANs against the device...")
+
+def load_bulk_vlan_csv():
+    global bulk_vlan_csv
+    path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        with open(path, 'r') as f:
+            bulk_vlan_csv = parse_vlan_csv(f.read())
+        bulk_csv_label.config(text=f"{len(bulk_vlan_csv)} VLANs from {os.path.basename(path)}")
+    except (OSError, ValueError) as e:
+        update_status(f"An error occurred while reading {path}: {e}")
+
 def assign_vlan():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
     
@@ -202,22 +448,12 @@ def assign_vlan():
     vlan = vlan_combobox.get()
     
     try:
-        commands = [
-            f"interface {interface}",
-            f"switchport trunk encapsulation dot1q" if mode == "trunk" else "",
-            f"switchport mode {mode}",
-            f"switchport { 'access vlan' if mode == 'access' else 'trunk allowed vlan' } {vlan}",
-            "write memory"
-        ]
-        net_connect.send_config_set([cmd for cmd in commands if cmd])  # Filter out empty commands
-        command_history.append([cmd for cmd in commands if cmd])
-        save_running_config()
-        update_status(f"Assigned VLAN {vlan} to interface {interface} in {mode} mode.")
+        push_interface_config(interface, switchport_lines(mode, vlan), f"Assigned VLAN {vlan} to interface {interface} in {mode} mode.")
     except Exception as e:
         update_status(f"An error occurred: {e}")
 
 def assign_native_vlan():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
     
@@ -225,140 +461,493 @@ def assign_native_vlan():
     native_vlan = native_vlan_entry.get()
     
     try:
-        commands = [
-            f"interface {interface}",
-            f"switchport trunk native vlan {native_vlan}",
-            "write memory"
-        ]
-        net_connect.send_config_set(commands)
-        command_history.append(commands)
-        save_running_config()
-        update_status(f"Assigned native VLAN {native_vlan} to interface {interface}.")
+        push_config([f"interface {interface}"] + native_vlan_lines(native_vlan), f"Assigned native VLAN {native_vlan} to interface {interface}.")
     except Exception as e:
         update_status(f"An error occurred: {e}")
 
 def show_interface_status():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
     
     interface = status_interface_combobox.get()
     command = f"show interfaces {interface} switchport" if interface else vlan_details_combobox.get()
     
-    try:
-        output = net_connect.send_command(command)
-        show_output_popup(output)
-    except Exception as e:
-        update_status(f"An error occurred: {e}")
+    if engine.state_cache.ttl_for(command):
+        run_device_task(lambda: engine.show(command), lambda output: show_output_popup(output, command),
+                        f"Running {command}...")
+    else:
+        # Uncached commands are streamed into the viewer so large outputs show their first lines immediately
+        stream_output_popup(command)
 
 def monitor_traffic():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
 
-    command = "show interfaces counters"
-    
-    try:
-        output = net_connect.send_command(command)
-        show_output_popup(output)
-    except Exception as e:
-        update_status(f"An error occurred: {e}")
+    popup = tk.Toplevel()
+    popup.title("Traffic Monitor")
+    monitor = TrafficMonitor()
+    state = {"running": False, "after_id": None}
+
+    controls = tk.Frame(popup)
+    controls.pack(fill='x', padx=5, pady=5)
+    tk.Label(controls, text="Interval (s):").pack(side='left', padx=5)
+    interval_entry = tk.Entry(controls, width=6)
+    interval_entry.insert(0, '5')
+    interval_entry.pack(side='left', padx=5)
+
+    columns = ("in_bps", "out_bps", "in_pps", "out_pps", "peak_in", "peak_out")
+    tree = ttk.Treeview(popup, columns=columns)
+    tree.heading("#0", text="Interface")
+    for column, title in zip(columns, ("In", "Out", "In pkts", "Out pkts", "Peak in", "Peak out")):
+        tree.heading(column, text=title)
+        tree.column(column, width=100, anchor='e')
+    tree.pack(expand=True, fill='both')
+
+    def poll():
+        state["after_id"] = None
+        if not state["running"] or not engine.connection:
+            return
+        run_device_task(poll_counters, render, None, "An error occurred while polling counters", on_error=lambda e: stop())
+
+    def poll_counters():
+        output = engine.show("show interfaces counters", cached=False)
+        # Kept in the counter store too, so the history outlives the popup. Rates only: the error columns
+        # and their baseline stay with the "Record counters" collection, which polls the error counters.
+        counter_store.record(engine.host, time.time(), parse_interfaces_counters(output))
+        return time.monotonic(), output
 
-def show_output_popup(output):
+    def render(sample):
+        if not popup.winfo_exists():
+            return
+        # Update existing rows in place instead of rebuilding the table
+        for interface, rates in monitor.update(sample[1], sample[0]).items():
+            values = (format_rate(rates["in_bps"]), format_rate(rates["out_bps"]),
+                      format_rate(rates["in_pps"], "pps"), format_rate(rates["out_pps"], "pps"),
+                      format_rate(monitor.peak(interface, "in_bps")), format_rate(monitor.peak(interface, "out_bps")))
+            if tree.exists(interface):
+                tree.item(interface, values=values)
+            else:
+                tree.insert('', tk.END, iid=interface, text=interface, values=values)
+        for interface in tree.get_children():
+            if interface not in monitor.previous:
+                tree.delete(interface)
+        if state["running"]:
+            try:
+                interval = max(1.0, float(interval_entry.get()))
+            except ValueError:
+                interval = 5.0
+            state["after_id"] = popup.after(int(interval * 1000), poll)
+
+    def start():
+        if not state["running"]:
+            state["running"] = True
+            poll()
+
+    def stop():
+        state["running"] = False
+        if state["after_id"] is not None:
+            popup.after_cancel(state["after_id"])
+            state["after_id"] = None
+
+    def close():
+        stop()
+        popup.destroy()
+
+    tk.Button(controls, text="Start", command=start, bg='lightgreen').pack(side='left', padx=5)
+    tk.Button(controls, text="Stop", command=stop, bg='lightcoral').pack(side='left', padx=5)
+    popup.protocol("WM_DELETE_WINDOW", close)
+    start()
+
+def show_stats_panel():
     popup = tk.Toplevel()
-    popup.title("Output")
-    text = tk.Text(popup, wrap='word')
-    text.insert(tk.END, output)
-    text.pack(expand=True, fill='both')
-    text.config(state=tk.DISABLED)
+    popup.title("Device Stats")
+    popup.geometry("900x400")
+
+    summary_label = tk.Label(popup, anchor='w')
+    summary_label.pack(fill='x', padx=10, pady=5)
+
+    columns = ("host", "method", "count", "mean", "p95", "max", "bytes", "errors")
+    tree = ttk.Treeview(popup, columns=columns)
+    tree.heading("#0", text="Command")
+    tree.column("#0", width=220)
+    for column in columns:
+        tree.heading(column, text=column.capitalize())
+        tree.column(column, width=80, anchor='e')
+    tree.pack(expand=True, fill='both')
+
+    def refresh():
+        if not popup.winfo_exists():
+            return
+        tree.delete(*tree.get_children())
+        for row in engine.metrics.rows():
+            tree.insert('', tk.END, text=row["command"], values=(
+                row["host"], row["method"], row["count"], format_seconds(row["mean"]), format_seconds(row["p95"]),
+                format_seconds(row["max"]), row["bytes"], row["errors"]))
+        queue_wait = engine.metrics.queue_wait
+        summary_label.config(text=f"Queue wait: {queue_wait.count} tasks, p95 {format_seconds(queue_wait.quantile(0.95))}, "
+                                  f"max {format_seconds(queue_wait.max)} | {format_stats(engine.state_cache.stats())} | "
+                                  f"Validation: {engine.validation_stats['rejected']}/{engine.validation_stats['checked']} "
+                                  f"config sets stopped before sending | {format_profile(engine.timing)}")
+        popup.after(2000, refresh)
+
+    def export(kind):
+        path = filedialog.asksaveasfilename(defaultextension=".prom" if kind == "prometheus" else ".json",
+                                            initialfile="cisco_manager.prom" if kind == "prometheus" else "cisco_manager_metrics.json")
+        if not path:
+            return
+        try:
+            if kind == "prometheus":
+                engine.metrics.write_prometheus(path)
+            else:
+                engine.metrics.write_json(path)
+            update_status(f"Metrics written to {path}")
+        except Exception as e:
+            update_status(f"An error occurred while writing metrics: {e}")
+
+    controls = tk.Frame(popup)
+    controls.pack(fill='x', padx=10, pady=5)
+    tk.Button(controls, text="Export Prometheus", command=lambda: export("prometheus"), bg='lightblue').pack(side='left', padx=5)
+    tk.Button(controls, text="Export JSON", command=lambda: export("json"), bg='lightyellow').pack(side='left', padx=5)
+    tk.Button(controls, text="Reset", command=engine.metrics.reset, bg='lightcoral').pack(side='left', padx=5)
+    refresh()
+
+def take_snapshot():
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
 
-def populate_interfaces_and_vlans():
-    try:
-        interfaces_output = net_connect.send_command('show ip interface brief')
-        vlans_output = net_connect.send_command('show vlan brief')
-
-        interfaces = [line.split()[0] for line in interfaces_output.splitlines() if len(line.split()) > 0 and 'Interface' not in line]
-        vlans = [line.split()[0] for line in vlans_output.splitlines() if len(line.split()) > 0 and line.split()[0].isdigit()]
-
-        interface_combobox['values'] = interfaces
-        native_interface_combobox['values'] = interfaces
-        status_interface_combobox['values'] = interfaces
-        port_security_interface_combobox['values'] = interfaces
-        port_speed_interface_combobox['values'] = interfaces
-        vlan_combobox['values'] = vlans
-    except Exception as e:
-        update_status(f"An error occurred while fetching interfaces and VLANs: {e}")
+    def taken(result):
+        digest, stored = result
+        update_status(f"Snapshot {digest[:12]} of {engine.host} "
+                      f"{'saved' if stored else 'matches a stored config; nothing new written'}.")
+
+    run_device_task(lambda: engine.capture_config(snapshot_store), taken,
+                    "Reading running-config...", "An error occurred while taking the snapshot")
 
-def populate_port_status():
-    if not net_connect:
+def show_snapshot_compare():
+    entries = snapshot_store.history()
+    if not entries:
+        update_status("No snapshots stored yet.")
+        return
+    # Newest first; each choice maps back to the content hash it names
+    choices = {}
+    for entry in reversed(entries):
+        taken = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["taken"]))
+        choices[f"{entry['host']}  {taken}  {entry['hash'][:12]}"] = entry["hash"]
+
+    popup = tk.Toplevel()
+    popup.title("Compare Snapshots")
+    tk.Label(popup, text="Old:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
+    old_combobox = ttk.Combobox(popup, values=list(choices), width=60, state='readonly')
+    old_combobox.grid(row=0, column=1, padx=10, pady=5)
+    tk.Label(popup, text="New:").grid(row=1, column=0, padx=10, pady=5, sticky='w')
+    new_combobox = ttk.Combobox(popup, values=list(choices), width=60, state='readonly')
+    new_combobox.grid(row=1, column=1, padx=10, pady=5)
+    new_combobox.current(0)
+    old_combobox.current(min(1, len(choices) - 1))
+
+    def compare():
+        old, new = old_combobox.get(), new_combobox.get()
+        try:
+            changes = snapshot_store.diff(choices[old], choices[new])
+        except Exception as e:
+            update_status(f"An error occurred while comparing snapshots: {e}")
+            return
+        show_output_popup(format_diff(changes, old, new), "Snapshot diff")
+        update_status(f"{len(changes)} sections differ.")
+
+    tk.Button(popup, text="Compare", command=compare, bg='lightblue').grid(row=2, column=1, padx=10, pady=5, sticky='e')
+
+def config_transfer(method):
+    global tftp_server
+    if method == "SCP":
+        return ScpTransfer()
+    if tftp_server is None:
+        tftp_server = TftpServer(port=tftp_port).start()
+    return TftpTransfer(tftp_server)
+
+def show_config_push():
+    # Compiles the stored history (or a template file) into a complete config, previews the section diff
+    # and pushes it as one file instead of line by line
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
-    
+    popup = tk.Toplevel()
+    popup.title("Push Full Config")
+    template = {"path": None, "text": None}
+
+    tk.Label(popup, text="Source:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
+    source_label = tk.Label(popup, text="Stored command history", width=50, anchor='w')
+    source_label.grid(row=0, column=1, padx=10, pady=5, sticky='w')
+
+    def choose_template():
+        path = filedialog.askopenfilename(filetypes=[("Config files", "*.cfg *.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, 'r') as f:
+                template["text"] = f.read()
+        except OSError as e:
+            update_status(f"Could not read template: {e}")
+            return
+        template["path"] = path
+        source_label.config(text=os.path.basename(path))
+
+    tk.Button(popup, text="Template...", command=choose_template).grid(row=0, column=2, padx=10, pady=5)
+    tk.Label(popup, text="Mode:").grid(row=1, column=0, padx=10, pady=5, sticky='w')
+    mode_combobox = ttk.Combobox(popup, values=["configure replace", "merge (copy to running-config)"], width=30,
+                                 state='readonly')
+    mode_combobox.current(0)
+    mode_combobox.grid(row=1, column=1, padx=10, pady=5, sticky='w')
+    tk.Label(popup, text="Transfer:").grid(row=2, column=0, padx=10, pady=5, sticky='w')
+    transfer_combobox = ttk.Combobox(popup, values=["TFTP", "SCP"], width=30, state='readonly')
+    transfer_combobox.current(0)
+    transfer_combobox.grid(row=2, column=1, padx=10, pady=5, sticky='w')
+
+    def run(dry_run):
+        replace = mode_combobox.current() == 0
+        try:
+            transfer = None if dry_run else config_transfer(transfer_combobox.get())
+        except OSError as e:
+            update_status(f"Could not start the TFTP server on port {tftp_port} ({e}); use SCP instead.")
+            return
+
+        def pushed(result):
+            changes, output = result
+            if dry_run:
+                show_output_popup(format_diff(changes, "running-config", template["path"] or "compiled config"),
+                                  "Config push preview")
+                update_status(f"{len(changes)} sections would change.")
+                return
+            if changes:
+                show_output_popup(output, "Config push")
+                refresh_inventory(force=True)
+            update_status(f"Config pushed, {len(changes)} sections changed." if changes else "Device already matches.")
+
+        run_device_task(lambda: engine.push_config_file(transfer, template["text"], replace, dry_run), pushed,
+                        "Compiling config..." if dry_run else "Pushing config file...",
+                        "An error occurred while pushing the config")
+
+    tk.Button(popup, text="Preview", command=lambda: run(True), bg='lightblue').grid(row=3, column=1, padx=10, pady=5, sticky='e')
+    tk.Button(popup, text="Push", command=lambda: run(False), bg='lightgreen').grid(row=3, column=2, padx=10, pady=5)
+
+def show_output_popup(output, title="Output"):
+    update_status("Done.")
+    viewer = OutputViewer(root, title, ui_dispatch)
+    viewer.append(output)
+    viewer.finish()
+
+def stream_output_popup(command):
+    viewer = OutputViewer(root, command, ui_dispatch)
+
+    def streamed(total):
+        update_status(f"{command}: {viewer.spool.line_count()} lines ({total / 1024:.0f} KB).")
+        viewer.finish()
+
+    run_device_task(lambda: engine.stream(command, viewer.append), streamed, f"Streaming {command}...",
+                    f"An error occurred while running {command}", on_error=viewer.finish, timeout=stream_timeout)
+
+def populate_interfaces_and_vlans(snapshot):
+    interfaces = [record.interface for record in parse_ip_interface_brief(snapshot["interfaces"])]
+    vlans = [str(record.vlan_id) for record in parse_vlan_brief(snapshot["vlans"])]
+
+    interface_combobox['values'] = interfaces
+    native_interface_combobox['values'] = interfaces
+    status_interface_combobox['values'] = interfaces
+    port_security_interface_combobox['values'] = interfaces
+    port_speed_interface_combobox['values'] = interfaces
+    vlan_combobox['values'] = vlans
+
+def populate_port_status(snapshot):
     try:
-        interfaces_output = net_connect.send_command('show ip interface brief')
-        interfaces = []
-        for line in interfaces_output.splitlines():
-            if 'Interface' in line:
-                continue
-            parts = line.split()
-            if len(parts) > 0:
-                interfaces.append((parts[0], parts[4]))  # Interface and Status
-        
-        for widget in port_symbols_frame.winfo_children():
-            widget.destroy()
-        
-        for interface, status in interfaces:
-            port_container = tk.Frame(port_symbols_frame)
-            port_container.pack(side='left', padx=0)
-
-            color = '#00ff00' if status == 'up' else '#ff0000'
-            port_label = tk.Label(port_container, text="■", fg=color, font=("Arial", 40))
-            port_label.pack(side='top', padx=0)
-            port_label.bind("<Enter>", lambda e, intf=interface, stat=status: show_tooltip(e, intf, stat))
-            port_label.bind("<Leave>", hide_tooltip)
-            port_label.bind("<Double-1>", lambda e, intf=interface, lbl=port_label: toggle_port(e, intf, lbl))
-
-            short_interface_name = interface.replace("Ethernet", "e")
-            port_text_label = tk.Label(port_container, text=short_interface_name, font=("Arial", 8))  # Reduced font size
-            port_text_label.pack(side='top', pady=0)  # Reduced padding
-        
+        interfaces = [(record.interface, record.status) for record in parse_ip_interface_brief(snapshot["interfaces"])]
+        port_grid.update(interfaces)
     except Exception as e:
         update_status(f"An error occurred while fetching port status: {e}")
 
-def toggle_port(event, interface, label):
-    try:
-        current_color = label.cget("fg")
-        if current_color == "#00ff00":  # Port is up
-            commands = [f"interface {interface}", "shutdown", "write memory"]
-            net_connect.send_config_set(commands)
-            command_history.append(commands)
-            label.config(fg="#ff0000")
-            update_status(f"Port {interface} has been shut down.")
-        else:  # Port is down
-            commands = [f"interface {interface}", "no shutdown", "write memory"]
-            net_connect.send_config_set(commands)
-            command_history.append(commands)
-            label.config(fg="#00ff00")
-            update_status(f"Port {interface} has been brought up.")
-        save_running_config()
-    except Exception as e:
-        update_status(f"An error occurred: {e}")
+def toggle_live_updates():
+    global syslog_listener, reconcile_after_id
+    if live_updates_var.get():
+        try:
+            syslog_listener = SyslogListener(lambda batch: ui_dispatch(apply_syslog_events, batch), port=syslog_port).start()
+        except OSError as e:
+            live_updates_var.set(False)
+            update_status(f"Could not listen on UDP port {syslog_port}: {e}")
+            return
+        update_status(f"Listening for syslog on UDP port {syslog_port}; full refresh every {reconcile_interval}s.")
+        schedule_reconcile()
+    elif syslog_listener is not None:
+        syslog_listener.stop()
+        syslog_listener = None
+        if reconcile_after_id is not None:
+            root.after_cancel(reconcile_after_id)
+            reconcile_after_id = None
+        update_status("Live port updates stopped.")
+
+def schedule_reconcile():
+    # Slow poll that catches anything the UDP messages missed
+    global reconcile_after_id
+    if reconcile_after_id is not None:
+        root.after_cancel(reconcile_after_id)
+    reconcile_after_id = root.after(reconcile_interval * 1000, reconcile_port_status)
+
+def reconcile_port_status():
+    global reconcile_after_id
+    reconcile_after_id = None
+    if syslog_listener is None:
+        return
+    if engine.connection:
+        run_device_task(lambda: engine.snapshot(force=True), populate_port_status, None,
+                        "An error occurred while refreshing port status")
+    schedule_reconcile()
+
+def apply_syslog_events(batch):
+    if syslog_listener is None:
+        return
+    syslog_stats_label.config(text=format_listener_stats(syslog_listener.stats()))
+    if not engine.connection:
+        return
+    changes = batch.get(device_addresses.get(engine.host, engine.host))
+    if not changes:
+        return
+    for interface, change in changes.items():
+        if "status" in change:
+            port_grid.set_status(interface, change["status"])
+    engine.apply_link_states(changes, ttl=reconcile_interval)
 
-def show_tooltip(event, interface, status):
-    tooltip = tk.Toplevel()
-    tooltip.wm_overrideredirect(True)
-    tooltip.geometry(f"+{event.x_root+10}+{event.y_root+10}")
-    label = tk.Label(tooltip, text=f"{interface}: {status}", background="yellow", relief='solid', borderwidth=1, font=("Arial", "10", "normal"))
-    label.pack()
-    event.widget.tooltip = tooltip
+def toggle_port(interface):
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
 
-def hide_tooltip(event):
-    if hasattr(event.widget, 'tooltip'):
-        event.widget.tooltip.destroy()
+    if port_grid.status(interface) == "up":
+        push_config([f"interface {interface}"] + shutdown_lines(True), f"Port {interface} has been shut down.",
+                    lambda _: port_grid.set_status(interface, "administratively down"))
+    else:
+        push_config([f"interface {interface}"] + shutdown_lines(False), f"Port {interface} has been brought up.",
+                    lambda _: port_grid.set_status(interface, "up"))
 
 def update_status(message):
     status_label.config(text=message)
 
+def push_config(commands, message, on_success=None):
+    # Mistakes are caught against the last inventory snapshot before anything is staged or sent
+    problems = engine.validate(commands)
+    if problems:
+        update_status(str(ValidationError(problems)))
+        return
+    if staging_var.get():
+        engine.transaction.stage(commands)
+        update_pending_label()
+        update_status(f"Staged: {message}")
+        if on_success:
+            on_success(None)
+        return
+
+    save = not defer_save_var.get()
+
+    def sent(output):
+        update_status(message)
+        if on_success:
+            on_success(output)
+
+    run_device_task(lambda: engine.send_config(commands, save, validate=False), sent, "Sending configuration...")
+
+def push_interface_config(selection, lines, message):
+    selection = selection.strip()
+    if not selection:
+        update_status("No interface selected.")
+        return
+    if selection in engine.known_interfaces or not is_multi_selection(selection):
+        push_config([f"interface {selection}"] + lines, message)
+        return
+
+    def expanded(interfaces):
+        if not interfaces:
+            update_status(f"No interfaces match {selection}.")
+            return
+        commands, blocks = engine.interface_commands(interfaces, lines)
+
+        def report(output):
+            if output is None:
+                return
+            if blocks is None:
+                update_status(message)
+                return
+            results = parse_range_echo(output, blocks)
+            failed = [name for name, error in results.items() if error]
+            if failed:
+                update_status(f"{message} Failed on {len(failed)}/{len(results)} interfaces: {', '.join(failed[:5])}"
+                              f"{'...' if len(failed) > 5 else ''} ({results[failed[0]]})")
+            else:
+                update_status(f"{message} Applied to all {len(results)} interfaces.")
+
+        # All selected interfaces go out in "interface range" blocks in a single config session
+        push_config(commands, message, report)
+
+    run_device_task(lambda: engine.resolve_interfaces(selection), expanded, "Resolving interface selection...", "Invalid interface selection")
+
+def choose_interfaces(combobox):
+    popup = tk.Toplevel()
+    popup.title("Select Interfaces")
+    listbox = tk.Listbox(popup, selectmode=tk.EXTENDED, height=20)
+    scrollbar = tk.Scrollbar(popup, orient='vertical', command=listbox.yview)
+    listbox.configure(yscrollcommand=scrollbar.set)
+    for interface in engine.known_interfaces:
+        listbox.insert(tk.END, interface)
+
+    def apply_selection():
+        chosen = [listbox.get(i) for i in listbox.curselection()]
+        combobox.delete(0, tk.END)
+        combobox.insert(0, ", ".join(spec for spec, _ in group_interface_ranges(chosen, len(chosen) or 1)))
+        popup.destroy()
+
+    tk.Button(popup, text="OK", command=apply_selection, bg='lightgreen').pack(side='bottom', pady=5)
+    scrollbar.pack(side='right', fill='y')
+    listbox.pack(side='left', fill='both', expand=True)
+
+def update_pending_label():
+    pending_label.config(text=f"{len(engine.transaction)} pending")
+
+def commit_transaction():
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
+    if not len(engine.transaction):
+        update_status("Nothing to commit.")
+        return
+
+    count = len(engine.transaction)
+    staged = engine.transaction.detach()
+    save = not defer_save_var.get()
+    update_pending_label()
+
+    def committed(result):
+        commands, _ = result
+        update_status(f"Committed {count} staged changes ({len(commands)} commands).")
+
+    def failed(e):
+        # Put the edits back in front of anything staged while the commit was running
+        engine.transaction.restore(staged)
+        update_pending_label()
+
+    run_device_task(lambda: engine.commit(save, staged), committed, "Committing staged changes...", on_error=failed)
+
+def discard_transaction():
+    engine.transaction.discard()
+    update_pending_label()
+    update_status("Discarded staged changes.")
+
+def write_memory():
+    if not engine.connection:
+        update_status("Not connected to any device.")
+        return
+
+    run_device_task(engine.write_memory, lambda _: update_status("Configuration saved to startup-config."),
+                    "Saving configuration...")
+
 def on_port_security_type_change(event):
     input_label.pack_forget()
     input_entry.pack_forget()
@@ -375,9 +964,12 @@ def on_port_security_type_change(event):
     elif selected_type == "mac address":
         input_label.config(text="Input:")
         input_label.pack(side='left', padx=5)
-        input_entry.pack(side='left', padx=5)
-        note_label.config(text="Enter MAC Address")
+        input_combobox['values'] = []
+        input_combobox.set("")
+        input_combobox.pack(side='left', padx=5)
+        note_label.config(text="Enter or pick a learned MAC Address")
         note_label.pack(side='left', padx=5)
+        suggest_sticky_macs()
     elif selected_type == "maximum":
         input_label.config(text="Input:")
         input_label.pack(side='left', padx=5)
@@ -396,38 +988,40 @@ def on_port_security_type_change(event):
         input_combobox['values'] = ["absolute", "inactivity"]
         input_combobox.pack(side='left', padx=5)
 
+def suggest_sticky_macs():
+    # Offers the MACs currently learned on the chosen port; uplinks with many MACs get no suggestions
+    interface = port_security_interface_combobox.get()
+    if not engine.connection or not interface:
+        return
+    host = engine.host
+
+    def fetched(result):
+        mac_index.update_host(host, *result)
+        macs = mac_index.suggest_sticky_macs(host, interface)
+        input_combobox['values'] = macs
+        if macs and not input_combobox.get():
+            input_combobox.set(macs[0])
+        update_status(f"{len(macs)} MAC addresses learned on {interface}.")
+
+    run_device_task(engine.addresses, fetched, "Reading MAC address table...",
+                    "An error occurred while reading the MAC address table")
+
 def apply_port_security():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
 
     interface = port_security_interface_combobox.get()
     security_type = port_security_type_combobox.get()
-    input_value = input_combobox.get() if security_type in ["violation", "aging type"] else input_entry.get()
+    input_value = input_combobox.get() if security_type in ["violation", "aging type", "mac address"] else input_entry.get()
     
     try:
-        commands = [f"interface {interface}"]
-        if security_type == "maximum":
-            commands.append(f"switchport port-security maximum {input_value}")
-        elif security_type == "violation":
-            commands.append(f"switchport port-security violation {input_value}")
-        elif security_type == "mac address":
-            commands.append(f"switchport port-security mac-address {input_value}")
-        elif security_type == "aging time":
-            commands.append(f"switchport port-security aging time {input_value}")
-        elif security_type == "aging type":
-            commands.append(f"switchport port-security aging type {input_value}")
-        
-        commands.append("write memory")
-        net_connect.send_config_set(commands)
-        command_history.append(commands)
-        save_running_config()
-        update_status(f"Applied port security settings to {interface}.")
+        push_interface_config(interface, port_security_lines(security_type, input_value), f"Applied port security settings to {interface}.")
     except Exception as e:
         update_status(f"An error occurred: {e}")
 
 def set_port_speed_duplex():
-    if not net_connect:
+    if not engine.connection:
         update_status("Not connected to any device.")
         return
 
@@ -436,207 +1030,576 @@ def set_port_speed_duplex():
     duplex = port_duplex_combobox.get()
 
     try:
-        commands = [f"interface {interface}"]
-        if speed:
-            commands.append(f"speed {speed}")
-        if duplex:
-            commands.append(f"duplex {duplex}")
-        commands.append("write memory")
-        
-        net_connect.send_config_set(commands)
-        command_history.append(commands)
-        save_running_config()
-        update_status(f"Set speed and duplex for {interface}.")
+        push_interface_config(interface, speed_duplex_lines(speed, duplex), f"Set speed and duplex for {interface}.")
     except Exception as e:
         update_status(f"An error occurred: {e}")
 
-# Create the main window
-root = tk.Tk()
-root.title("Cisco Command Executor")
-root.geometry("800x600")  # Increased window size
-
-# Create a Notebook widget for tabs
-notebook = ttk.Notebook(root)
-notebook.pack(pady=10, expand=True, fill='both')
-
-# Create frames for each tab
-frame_connection = ttk.Frame(notebook)
-frame_vlan = ttk.Frame(notebook)
-frame_port = ttk.Frame(notebook)
+def fleet_hosts():
+    source = fleet_hosts_entry.get().strip()
+    if source in ("", "all"):
+        hosts = host_inventory.hosts()
+    elif source.startswith("tag:"):
+        hosts = host_inventory.hosts(source[4:])
+    else:
+        hosts = load_hosts(source)
+    # Hosts without stored credentials use the ones typed on the Connection tab
+    for data in hosts:
+        data["username"] = data.get("username") or username_entry.get()
+        data["password"] = data.get("password") or password_entry.get()
+        data["secret"] = data.get("secret") or secret_entry.get()
+    return hosts
+
+def run_fleet_push():
+    commands = [line.strip() for line in fleet_commands_text.get("1.0", tk.END).splitlines() if line.strip()]
+    if not commands:
+        update_status("No commands to push.")
+        return
 
-frame_connection.pack(fill='both', expand=True)
-frame_vlan.pack(fill='both', expand=True)
-frame_port.pack(fill='both', expand=True)
+    # One syntax check for the whole fleet instead of the same typo failing on every device
+    problems = validate_commands(commands)
+    if problems:
+        update_status(str(ValidationError(problems)))
+        return
 
-# Add frames to notebook
-notebook.add(frame_connection, text='Connection')
-notebook.add(frame_vlan, text='VLAN')
-notebook.add(frame_port, text='Port Management')
+    hosts = fleet_hosts()
+    if not hosts:
+        update_status("No hosts found.")
+        return
 
-# Connection tab widgets
-tk.Label(frame_connection, text="Host:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
-host_entry = tk.Entry(frame_connection)
-host_entry.grid(row=0, column=1, padx=10, pady=5, sticky='w')
+    try:
+        workers = int(fleet_workers_entry.get() or 10)
+        canary_size = int(fleet_canary_entry.get() or 1)
+        wave_size = int(fleet_wave_entry.get() or 0)
+    except ValueError:
+        update_status("Workers, canary and wave sizes must be numbers.")
+        return
 
-tk.Label(frame_connection, text="Username:").grid(row=1, column=0, padx=10, pady=5, sticky='w')
-username_entry = tk.Entry(frame_connection)
-username_entry.grid(row=1, column=1, padx=10, pady=5, sticky='w')
+    fleet_output_text.config(state=tk.NORMAL)
+    fleet_output_text.delete("1.0", tk.END)
+    fleet_output_text.config(state=tk.DISABLED)
+    fleet_run_button.config(state=tk.DISABLED)
+    update_status(f"Pushing {len(commands)} commands to {len(hosts)} hosts...")
+
+    save = fleet_save_var.get()
+
+    def worker():
+        summary = staged_rollout(
+            hosts, commands, workers=workers, canary_size=canary_size, wave_size=wave_size,
+            on_result=lambda result: ui_dispatch(show_fleet_output, "result", result),
+            on_wave=lambda index, wave: ui_dispatch(show_fleet_output, "wave", (index, len(wave))),
+            connect_handler=instrument_connect(None, engine.metrics), save=save
+        )
+        ui_dispatch(show_fleet_output, "done", summary)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def run_fleet_snapshot():
+    hosts = fleet_hosts()
+    if not hosts:
+        update_status("No hosts found.")
+        return
+    try:
+        workers = int(fleet_workers_entry.get() or 10)
+    except ValueError:
+        update_status("Workers must be a number.")
+        return
 
-tk.Label(frame_connection, text="Password:").grid(row=2, column=0, padx=10, pady=5, sticky='w')
-password_entry = tk.Entry(frame_connection, show='*')
-password_entry.grid(row=2, column=1, padx=10, pady=5, sticky='w')
+    fleet_output_text.config(state=tk.NORMAL)
+    fleet_output_text.delete("1.0", tk.END)
+    fleet_output_text.config(state=tk.DISABLED)
+    fleet_snapshot_button.config(state=tk.DISABLED)
+    update_status(f"Taking running-config snapshots of {len(hosts)} hosts...")
 
-tk.Label(frame_connection, text="Secret:").grid(row=3, column=0, padx=10, pady=5, sticky='w')
-secret_entry = tk.Entry(frame_connection, show='*')
-secret_entry.grid(row=3, column=1, padx=10, pady=5, sticky='w')
+    def worker():
+        capture_fleet(hosts, snapshot_store, workers=workers,
+                      on_result=lambda result: ui_dispatch(show_fleet_output, "snapshot", result),
+                      connect_handler=instrument_connect(None, engine.metrics))
+        ui_dispatch(show_fleet_output, "snapshots done", format_store_stats(snapshot_store.stats()))
 
-# Create a frame to hold the buttons for better positioning
-button_frame = tk.Frame(frame_connection)
-button_frame.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky='w')
+    threading.Thread(target=worker, daemon=True).start()
 
-connect_button = tk.Button(button_frame, text="Connect", command=connect_device, bg='lightgreen')
-connect_button.pack(side='left', padx=5)
+def run_mac_collection():
+    hosts = fleet_hosts()
+    if not hosts:
+        update_status("No hosts found.")
+        return
+    try:
+        workers = int(fleet_workers_entry.get() or 10)
+    except ValueError:
+        update_status("Workers must be a number.")
+        return
 
-disconnect_button = tk.Button(button_frame, text="Disconnect", command=disconnect_device, bg='lightcoral')
-disconnect_button.pack(side='left')
+    fleet_output_text.config(state=tk.NORMAL)
+    fleet_output_text.delete("1.0", tk.END)
+    fleet_output_text.config(state=tk.DISABLED)
+    mac_collect_button.config(state=tk.DISABLED)
+    update_status(f"Collecting MAC and ARP tables from up to {len(hosts)} hosts...")
+
+    def worker():
+        results = collect_fleet(hosts, mac_index, workers=workers, max_age=mac_index_max_age,
+                                on_result=lambda result: ui_dispatch(show_fleet_output, "addresses", result),
+                                connect_handler=instrument_connect(None, engine.metrics))
+        skipped = len(hosts) - len(results)
+        ui_dispatch(show_fleet_output, "addresses done",
+                    f"{format_index_stats(mac_index.stats())} ({skipped} devices still fresh, skipped)")
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def toggle_counter_recording():
+    global counter_after_id
+    if counter_recording_var.get():
+        record_counters()
+    elif counter_after_id is not None:
+        root.after_cancel(counter_after_id)
+        counter_after_id = None
+        update_status("Counter recording stopped.")
+
+def record_counters():
+    # Collects from every fleet host in the background, then schedules the next round
+    global counter_after_id
+    counter_after_id = None
+    if not counter_recording_var.get():
+        return
+    hosts = fleet_hosts()
+    try:
+        workers = int(fleet_workers_entry.get() or 10)
+    except ValueError:
+        workers = 10
+
+    def worker():
+        results = collect_counters(hosts, counter_store, workers=workers,
+                                   connect_handler=instrument_connect(None, engine.metrics))
+        failed = sum(1 for result in results if not result["ok"])
+        ui_dispatch(counters_recorded, len(results), failed)
+
+    def counters_recorded(count, failed):
+        global counter_after_id
+        update_status(f"Counters recorded from {count - failed}/{count} devices. "
+                      f"{format_counter_stats(counter_store.stats())}")
+        if counter_recording_var.get():
+            counter_after_id = root.after(counter_interval * 1000, record_counters)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def show_traffic_report():
+    try:
+        hours = float(report_hours_entry.get() or 24)
+    except ValueError:
+        update_status("Hours must be a number.")
+        return
+    end = time.time()
+    try:
+        report = format_report(counter_store, end - hours * 3600, end)
+    except Exception as e:
+        update_status(f"An error occurred while building the report: {e}")
+        return
+    show_output_popup(report, f"Traffic report, last {hours:g} h")
 
-separator_label = tk.Label(button_frame, text=" | ")
-separator_label.pack(side='left', padx=2)  # Reduced padding
+def locate_address():
+    query = mac_query_entry.get().strip()
+    if not query:
+        return
+    try:
+        mac, locations = mac_index.lookup(query)
+    except ValueError as e:
+        update_status(str(e))
+        return
+    fleet_output_text.config(state=tk.NORMAL)
+    fleet_output_text.delete("1.0", tk.END)
+    if not locations:
+        fleet_output_text.insert(tk.END, f"{query}: not found in the MAC index.\n")
+    else:
+        fleet_output_text.insert(tk.END, f"{mac} ({', '.join(mac_index.ips_for(mac)) or 'no IP known'}):\n")
+        for location in locations:
+            kind = "uplink?" if location.port_macs > uplink_threshold else "access"
+            fleet_output_text.insert(tk.END, f"  {location.host} {location.interface} vlan {location.vlan} "
+                                             f"({location.port_macs} MACs on port, {kind})\n")
+    fleet_output_text.config(state=tk.DISABLED)
+    update_status(f"{len(locations)} locations for {query}.")
+
+def show_fleet_output(kind, payload):
+    fleet_output_text.config(state=tk.NORMAL)
+    if kind == "wave":
+        index, size = payload
+        fleet_output_text.insert(tk.END, f"--- {'Canary' if index == 0 else f'Wave {index}'} ({size} hosts) ---\n")
+    elif kind == "result":
+        state = "OK" if payload['ok'] else f"FAILED: {payload['error']}"
+        fleet_output_text.insert(tk.END, f"{payload['host']}: {state} ({payload['elapsed']:.1f}s)\n")
+    elif kind == "snapshot":
+        if payload['ok']:
+            state = f"{payload['hash'][:12]} {'stored' if payload['stored'] else 'unchanged'}"
+        else:
+            state = f"FAILED: {payload['error']}"
+        fleet_output_text.insert(tk.END, f"{payload['host']}: {state} ({payload['elapsed']:.1f}s)\n")
+    elif kind == "addresses":
+        if payload['ok']:
+            state = f"{len(payload['macs'])} MACs, {len(payload['arp'])} ARP entries"
+        else:
+            state = f"FAILED: {payload['error']}"
+        fleet_output_text.insert(tk.END, f"{payload['host']}: {state} ({payload['elapsed']:.1f}s)\n")
+    elif kind == "addresses done":
+        fleet_output_text.insert(tk.END, payload + "\n")
+        update_status(payload)
+        mac_collect_button.config(state=tk.NORMAL)
+    elif kind == "snapshots done":
+        fleet_output_text.insert(tk.END, payload + "\n")
+        update_status(payload)
+        fleet_snapshot_button.config(state=tk.NORMAL)
+    else:
+        fleet_output_text.insert(tk.END, format_summary(payload) + "\n")
+        update_status(format_summary(payload))
+        fleet_run_button.config(state=tk.NORMAL)
+    fleet_output_text.see(tk.END)
+    fleet_output_text.config(state=tk.DISABLED)
+
+def open_stores():
+    global engine, host_inventory, snapshot_store, mac_index, counter_store
+    engine = DeviceEngine(inventory_cache=InventoryCache())
+    host_inventory = HostInventory()
+    snapshot_store = SnapshotStore()
+    mac_index = MacIndex()
+    counter_store = CounterStore()
+
+def build_window():
+    # Widgets the handlers above use are module globals, as before; the window only exists once this runs
+    global root, ui_dispatch, device_worker, host_entry, username_entry, password_entry, secret_entry
+    global connection_timer_label, connection_status_label, connection_timer, vlan_name_entry
+    global vlan_number_entry, interface_combobox, mode_combobox, vlan_combobox, native_interface_combobox
+    global native_vlan_entry, vlan_details_combobox, status_interface_combobox, bulk_vlan_entry
+    global bulk_csv_label, live_updates_var, syslog_stats_label, port_grid
+    global port_security_interface_combobox, port_security_type_combobox, input_label, input_entry
+    global input_combobox, note_label, status_label, staging_var, defer_save_var, pending_label
+    global busy_progress, cancel_button, port_speed_interface_combobox, port_speed_combobox
+    global port_duplex_combobox, fleet_hosts_entry, fleet_workers_entry, fleet_canary_entry
+    global fleet_wave_entry, fleet_save_var, fleet_commands_text, fleet_run_button, fleet_snapshot_button
+    global mac_collect_button, mac_query_entry, fleet_output_text, counter_recording_var, report_hours_entry
+
+    # Create the main window
+    root = tk.Tk()
+    root.title("Cisco Command Executor")
+    root.geometry("800x600")  # Increased window size
+
+    # All device I/O runs on a background worker; results come back through the dispatcher
+    ui_dispatch = UiDispatcher(root)
+    device_worker = DeviceWorker(ui_dispatch)
+    ui_dispatch.hooks.append(update_busy_indicator)
+
+    # Create a Notebook widget for tabs
+    notebook = ttk.Notebook(root)
+    notebook.pack(pady=10, expand=True, fill='both')
+
+    # Create frames for each tab
+    frame_connection = ttk.Frame(notebook)
+    frame_vlan = ttk.Frame(notebook)
+    frame_port = ttk.Frame(notebook)
+    frame_fleet = ttk.Frame(notebook)
+
+    frame_connection.pack(fill='both', expand=True)
+    frame_vlan.pack(fill='both', expand=True)
+    frame_port.pack(fill='both', expand=True)
+    frame_fleet.pack(fill='both', expand=True)
+
+    # Add frames to notebook
+    notebook.add(frame_connection, text='Connection')
+    notebook.add(frame_vlan, text='VLAN')
+    notebook.add(frame_port, text='Port Management')
+    notebook.add(frame_fleet, text='Fleet')
+
+    # Connection tab widgets
+    tk.Label(frame_connection, text="Host:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
+    host_entry = tk.Entry(frame_connection)
+    host_entry.grid(row=0, column=1, padx=10, pady=5, sticky='w')
+
+    tk.Label(frame_connection, text="Username:").grid(row=1, column=0, padx=10, pady=5, sticky='w')
+    username_entry = tk.Entry(frame_connection)
+    username_entry.grid(row=1, column=1, padx=10, pady=5, sticky='w')
+
+    tk.Label(frame_connection, text="Password:").grid(row=2, column=0, padx=10, pady=5, sticky='w')
+    password_entry = tk.Entry(frame_connection, show='*')
+    password_entry.grid(row=2, column=1, padx=10, pady=5, sticky='w')
+
+    tk.Label(frame_connection, text="Secret:").grid(row=3, column=0, padx=10, pady=5, sticky='w')
+    secret_entry = tk.Entry(frame_connection, show='*')
+    secret_entry.grid(row=3, column=1, padx=10, pady=5, sticky='w')
+
+    # Create a frame to hold the buttons for better positioning
+    button_frame = tk.Frame(frame_connection)
+    button_frame.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky='w')
+
+    connect_button = tk.Button(button_frame, text="Connect", command=connect_device, bg='lightgreen')
+    connect_button.pack(side='left', padx=5)
+
+    disconnect_button = tk.Button(button_frame, text="Disconnect", command=disconnect_device, bg='lightcoral')
+    disconnect_button.pack(side='left')
+
+    separator_label = tk.Label(button_frame, text=" | ")
+    separator_label.pack(side='left', padx=2)  # Reduced padding
+
+    save_button = tk.Button(button_frame, text="Save", command=save_input, bg='lightblue')
+    save_button.pack(side='left', padx=2)  # Reduced padding
+
+    load_button = tk.Button(button_frame, text="Load", command=load_saved_inputs, bg='lightyellow')
+    load_button.pack(side='left', padx=5)
+
+    stats_button = tk.Button(button_frame, text="Stats", command=show_stats_panel)
+    stats_button.pack(side='left', padx=5)
+
+    snapshot_button = tk.Button(button_frame, text="Snapshot", command=take_snapshot)
+    snapshot_button.pack(side='left', padx=2)
+
+    compare_button = tk.Button(button_frame, text="Compare", command=show_snapshot_compare)
+    compare_button.pack(side='left', padx=2)
+
+    full_config_button = tk.Button(button_frame, text="Full Config", command=show_config_push)
+    full_config_button.pack(side='left', padx=2)
+
+    # Frame for connection duration
+    connection_duration_frame = tk.Frame(root)
+    connection_duration_frame.place(relx=1, rely=0, anchor='ne', x=-15, y=0)
+
+    connection_duration_text_label = tk.Label(connection_duration_frame, text="Connection duration: ")
+    connection_duration_text_label.pack(side='left')
+
+    # Add a label to show connection duration
+    connection_timer_label = tk.Label(connection_duration_frame, text="00:00:00")
+    connection_timer_label.pack(side='left')
+
+    # Add a label to show connection status in the tab row
+    connection_status_label = tk.Label(root, text="●", fg="red")
+    connection_status_label.place(relx=1, rely=0, anchor='ne', x=-15, y=20)
+
+    # Create a connection timer instance
+    connection_timer = ConnectionTimer(connection_timer_label)
 
-save_button = tk.Button(button_frame, text="Save", command=save_input, bg='lightblue')
-save_button.pack(side='left', padx=2)  # Reduced padding
+    # VLAN tab widgets
+    tk.Label(frame_vlan, text="VLAN Management").grid(row=0, column=0, columnspan=2, padx=10, pady=7, sticky='w')
 
-load_button = tk.Button(button_frame, text="Load", command=load_saved_inputs, bg='lightyellow')
-load_button.pack(side='left', padx=5)
+    tk.Label(frame_vlan, text="VLAN Name:").grid(row=1, column=0, padx=10, pady=4, sticky='w')
+    vlan_name_entry = tk.Entry(frame_vlan)
+    vlan_name_entry.grid(row=1, column=1, padx=10, pady=4, sticky='w')
 
-# Frame for connection duration
-connection_duration_frame = tk.Frame(root)
-connection_duration_frame.place(relx=1, rely=0, anchor='ne', x=-15, y=0)
+    tk.Label(frame_vlan, text="VLAN Number:").grid(row=1, column=2, padx=10, pady=4, sticky='w')
+    vlan_number_entry = tk.Entry(frame_vlan)
+    vlan_number_entry.grid(row=1, column=3, padx=10, pady=4, sticky='w')
 
-connection_duration_text_label = tk.Label(connection_duration_frame, text="Connection duration: ")
-connection_duration_text_label.pack(side='left')
+    create_vlan_button = tk.Button(frame_vlan, text="Create VLAN", command=create_vlan, bg='lightgreen')
+    create_vlan_button.grid(row=1, column=4, padx=10, pady=4, sticky='w')
 
-# Add a label to show connection duration
-connection_timer_label = tk.Label(connection_duration_frame, text="00:00:00")
-connection_timer_label.pack(side='left')
+    tk.Label(frame_vlan, text="Interfaces:").grid(row=2, column=0, padx=10, pady=4, sticky='w')
+    interface_combobox = ttk.Combobox(frame_vlan)
+    interface_combobox.grid(row=2, column=1, padx=10, pady=4, sticky='w')
 
-# Add a label to show connection status in the tab row
-connection_status_label = tk.Label(root, text="●", fg="red")
-connection_status_label.place(relx=1, rely=0, anchor='ne', x=-15, y=20)
+    tk.Label(frame_vlan, text="Mode:").grid(row=2, column=2, padx=10, pady=4, sticky='w')
+    mode_combobox = ttk.Combobox(frame_vlan, values=["access", "trunk"])
+    mode_combobox.grid(row=2, column=3, padx=10, pady=4, sticky='w')
 
-# Create a connection timer instance
-connection_timer = ConnectionTimer(connection_timer_label)
+    tk.Label(frame_vlan, text="Select VLAN:").grid(row=2, column=4, padx=10, pady=4, sticky='w')
+    vlan_combobox = ttk.Combobox(frame_vlan)
+    vlan_combobox.grid(row=2, column=5, padx=10, pady=4, sticky='w')
 
-# VLAN tab widgets
-tk.Label(frame_vlan, text="VLAN Management").grid(row=0, column=0, columnspan=2, padx=10, pady=7, sticky='w')
+    assign_vlan_button = tk.Button(frame_vlan, text="Assign", command=assign_vlan, bg='lightblue')
+    assign_vlan_button.grid(row=2, column=6, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="VLAN Name:").grid(row=1, column=0, padx=10, pady=4, sticky='w')
-vlan_name_entry = tk.Entry(frame_vlan)
-vlan_name_entry.grid(row=1, column=1, padx=10, pady=4, sticky='w')
+    select_interfaces_button = tk.Button(frame_vlan, text="Select...", command=lambda: choose_interfaces(interface_combobox))
+    select_interfaces_button.grid(row=2, column=7, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="VLAN Number:").grid(row=1, column=2, padx=10, pady=4, sticky='w')
-vlan_number_entry = tk.Entry(frame_vlan)
-vlan_number_entry.grid(row=1, column=3, padx=10, pady=4, sticky='w')
+    # Add new widgets for assigning native VLAN
+    tk.Label(frame_vlan, text="Interfaces:").grid(row=3, column=0, padx=10, pady=4, sticky='w')
+    native_interface_combobox = ttk.Combobox(frame_vlan)
+    native_interface_combobox.grid(row=3, column=1, padx=10, pady=4, sticky='w')
 
-create_vlan_button = tk.Button(frame_vlan, text="Create VLAN", command=create_vlan, bg='lightgreen')
-create_vlan_button.grid(row=1, column=4, padx=10, pady=4, sticky='w')
+    tk.Label(frame_vlan, text="Native VLAN:").grid(row=3, column=2, padx=10, pady=4, sticky='w')
+    native_vlan_entry = tk.Entry(frame_vlan)
+    native_vlan_entry.grid(row=3, column=3, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="Interfaces:").grid(row=2, column=0, padx=10, pady=4, sticky='w')
-interface_combobox = ttk.Combobox(frame_vlan)
-interface_combobox.grid(row=2, column=1, padx=10, pady=4, sticky='w')
+    assign_native_vlan_button = tk.Button(frame_vlan, text="Assign Native VLAN", command=assign_native_vlan, bg='lightyellow')
+    assign_native_vlan_button.grid(row=3, column=4, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="Mode:").grid(row=2, column=2, padx=10, pady=4, sticky='w')
-mode_combobox = ttk.Combobox(frame_vlan, values=["access", "trunk"])
-mode_combobox.grid(row=2, column=3, padx=10, pady=4, sticky='w')
+    # Add widgets for VLAN details and interface status
+    tk.Label(frame_vlan, text="VLAN Details:").grid(row=4, column=0, padx=10, pady=4, sticky='w')
+    vlan_details_combobox = ttk.Combobox(frame_vlan, values=["show vlan brief", "show interfaces trunk", "show interfaces switchport", "show interfaces status", "show running-config", "show tech-support"])
+    vlan_details_combobox.grid(row=4, column=1, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="Select VLAN:").grid(row=2, column=4, padx=10, pady=4, sticky='w')
-vlan_combobox = ttk.Combobox(frame_vlan)
-vlan_combobox.grid(row=2, column=5, padx=10, pady=4, sticky='w')
+    tk.Label(frame_vlan, text="Interfaces:").grid(row=4, column=2, padx=10, pady=4, sticky='w')
+    status_interface_combobox = ttk.Combobox(frame_vlan)
+    status_interface_combobox.grid(row=4, column=3, padx=10, pady=4, sticky='w')
 
-assign_vlan_button = tk.Button(frame_vlan, text="Assign", command=assign_vlan, bg='lightblue')
-assign_vlan_button.grid(row=2, column=6, padx=10, pady=4, sticky='w')
+    show_status_button = tk.Button(frame_vlan, text="Show Status", command=show_interface_status, bg='lightcoral')
+    show_status_button.grid(row=4, column=4, padx=10, pady=4, sticky='w')
 
-# Add new widgets for assigning native VLAN
-tk.Label(frame_vlan, text="Interfaces:").grid(row=3, column=0, padx=10, pady=4, sticky='w')
-native_interface_combobox = ttk.Combobox(frame_vlan)
-native_interface_combobox.grid(row=3, column=1, padx=10, pady=4, sticky='w')
+    # Add widgets for bulk VLAN creation from ranges/lists and CSV files
+    tk.Label(frame_vlan, text="Bulk VLANs:").grid(row=5, column=0, padx=10, pady=4, sticky='w')
+    bulk_vlan_entry = tk.Entry(frame_vlan)
+    bulk_vlan_entry.grid(row=5, column=1, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="Native VLAN:").grid(row=3, column=2, padx=10, pady=4, sticky='w')
-native_vlan_entry = tk.Entry(frame_vlan)
-native_vlan_entry.grid(row=3, column=3, padx=10, pady=4, sticky='w')
+    load_csv_button = tk.Button(frame_vlan, text="Load CSV", command=load_bulk_vlan_csv, bg='lightyellow')
+    load_csv_button.grid(row=5, column=2, padx=10, pady=4, sticky='w')
 
-assign_native_vlan_button = tk.Button(frame_vlan, text="Assign Native VLAN", command=assign_native_vlan, bg='lightyellow')
-assign_native_vlan_button.grid(row=3, column=4, padx=10, pady=4, sticky='w')
+    bulk_csv_label = tk.Label(frame_vlan, text="e.g. 100-399,500", font=("Arial", 8))
+    bulk_csv_label.grid(row=5, column=3, padx=10, pady=4, sticky='w')
 
-# Add widgets for VLAN details and interface status
-tk.Label(frame_vlan, text="VLAN Details:").grid(row=4, column=0, padx=10, pady=4, sticky='w')
-vlan_details_combobox = ttk.Combobox(frame_vlan, values=["show vlan brief", "show interfaces trunk", "show interfaces switchport", "show interfaces status"])
-vlan_details_combobox.grid(row=4, column=1, padx=10, pady=4, sticky='w')
+    create_bulk_button = tk.Button(frame_vlan, text="Create Bulk", command=create_bulk_vlans, bg='lightgreen')
+    create_bulk_button.grid(row=5, column=4, padx=10, pady=4, sticky='w')
 
-tk.Label(frame_vlan, text="Interfaces:").grid(row=4, column=2, padx=10, pady=4, sticky='w')
-status_interface_combobox = ttk.Combobox(frame_vlan)
-status_interface_combobox.grid(row=4, column=3, padx=10, pady=4, sticky='w')
+    # Add Monitor Traffic button
+    monitor_traffic_button = tk.Button(frame_vlan, text="Monitor Traffic", command=monitor_traffic, bg='lightgrey')
+    monitor_traffic_button.grid(row=6, column=0, columnspan=5, padx=10, pady=4, sticky='w')
 
-show_status_button = tk.Button(frame_vlan, text="Show Status", command=show_interface_status, bg='lightcoral')
-show_status_button.grid(row=4, column=4, padx=10, pady=4, sticky='w')
+    # Port Management tab widgets
+    port_status_header = tk.Frame(frame_port)
+    port_status_header.pack(fill='x', anchor='w')
+    tk.Label(port_status_header, text="Port Status (double click to turn on and off)").pack(side='left', pady=10)
+    refresh_button = tk.Button(port_status_header, text="Refresh", command=lambda: refresh_inventory(force=True), bg='lightgrey')
+    refresh_button.pack(side='left', padx=10)
+    live_updates_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(port_status_header, text=f"Live updates (syslog UDP {syslog_port})", variable=live_updates_var,
+                   command=toggle_live_updates).pack(side='left', padx=5)
+    syslog_stats_label = tk.Label(port_status_header, text="")
+    syslog_stats_label.pack(side='left', padx=5)
+    port_grid = PortGrid(frame_port, on_double_click=toggle_port)
+    port_grid.pack(fill='x', padx=10, pady=0, anchor='w')
 
-# Add Monitor Traffic button
-monitor_traffic_button = tk.Button(frame_vlan, text="Monitor Traffic", command=monitor_traffic, bg='lightgrey')
-monitor_traffic_button.grid(row=5, column=0, columnspan=5, padx=10, pady=4, sticky='w')
+    tk.Label(frame_port, text="Port Security").pack(pady=10, anchor='w')
 
-# Port Management tab widgets
-tk.Label(frame_port, text="Port Status (double click to turn on and off)").pack(pady=10, anchor='w')
-port_symbols_frame = tk.Frame(frame_port)
-port_symbols_frame.pack(pady=0, anchor='w')
+    port_security_frame = tk.Frame(frame_port)
+    port_security_frame.pack(fill='x', padx=10, pady=5, anchor='w')
 
-tk.Label(frame_port, text="Port Security").pack(pady=10, anchor='w')
+    tk.Label(port_security_frame, text="Interface:").pack(side='left', padx=5)
+    port_security_interface_combobox = ttk.Combobox(port_security_frame)
+    port_security_interface_combobox.pack(side='left', padx=5)
+    port_security_interface_combobox.bind(
+        "<<ComboboxSelected>>", lambda e: suggest_sticky_macs() if port_security_type_combobox.get() == "mac address" else None)
+    tk.Button(port_security_frame, text="...", command=lambda: choose_interfaces(port_security_interface_combobox)).pack(side='left')
 
-port_security_frame = tk.Frame(frame_port)
-port_security_frame.pack(fill='x', padx=10, pady=5, anchor='w')
+    tk.Label(port_security_frame, text="Type:").pack(side='left', padx=5)
+    port_security_type_combobox = ttk.Combobox(port_security_frame, values=["maximum", "violation", "mac address", "aging time", "aging type"])
+    port_security_type_combobox.pack(side='left', padx=5)
+    port_security_type_combobox.bind("<<ComboboxSelected>>", on_port_security_type_change)
 
-tk.Label(port_security_frame, text="Interface:").pack(side='left', padx=5)
-global port_security_interface_combobox
-port_security_interface_combobox = ttk.Combobox(port_security_frame)
-port_security_interface_combobox.pack(side='left', padx=5)
+    input_label = tk.Label(port_security_frame, text="Input:")
+    input_entry = tk.Entry(port_security_frame)
+    input_combobox = ttk.Combobox(port_security_frame)
+    note_label = tk.Label(port_security_frame, text="", font=("Arial", 8))
 
-tk.Label(port_security_frame, text="Type:").pack(side='left', padx=5)
-port_security_type_combobox = ttk.Combobox(port_security_frame, values=["maximum", "violation", "mac address", "aging time", "aging type"])
-port_security_type_combobox.pack(side='left', padx=5)
-port_security_type_combobox.bind("<<ComboboxSelected>>", on_port_security_type_change)
+    # Add the "Change" button on the same row as the input fields
+    change_button = tk.Button(port_security_frame, text="Change", command=apply_port_security, bg='lightgreen')
+    change_button.pack(side='left', padx=5)
 
-input_label = tk.Label(port_security_frame, text="Input:")
-input_entry = tk.Entry(port_security_frame)
-input_combobox = ttk.Combobox(port_security_frame)
-note_label = tk.Label(port_security_frame, text="", font=("Arial", 8))
+    # Add a label to show status at the bottom of the window
+    status_label = tk.Label(root, text="Not connected")
+    status_label.pack(side='bottom', fill='x', anchor='w')
+
+    # Staging controls for batching edits into a single transaction
+    transaction_frame = tk.Frame(root)
+    transaction_frame.pack(side='bottom', fill='x', padx=10, anchor='w')
+
+    staging_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(transaction_frame, text="Stage changes", variable=staging_var).pack(side='left', padx=5)
+
+    defer_save_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(transaction_frame, text="Defer write memory", variable=defer_save_var).pack(side='left', padx=5)
+
+    pending_label = tk.Label(transaction_frame, text="0 pending")
+    pending_label.pack(side='left', padx=5)
+
+    commit_button = tk.Button(transaction_frame, text="Commit", command=commit_transaction, bg='lightgreen')
+    commit_button.pack(side='left', padx=5)
+
+    discard_button = tk.Button(transaction_frame, text="Discard", command=discard_transaction, bg='lightcoral')
+    discard_button.pack(side='left', padx=5)
+
+    write_memory_button = tk.Button(transaction_frame, text="Write Memory", command=write_memory, bg='lightblue')
+    write_memory_button.pack(side='left', padx=5)
+
+    # Busy indicator, shown while device tasks are queued or running
+    busy_progress = ttk.Progressbar(transaction_frame, mode='indeterminate', length=100)
+    cancel_button = tk.Button(transaction_frame, text="Cancel", command=cancel_device_tasks)
+
+    # Add widgets for setting port speed and duplex
+    tk.Label(frame_port, text="Set port speed and duplex settings").pack(pady=10, anchor='w')
+
+    port_speed_frame = tk.Frame(frame_port)
+    port_speed_frame.pack(fill='x', padx=10, pady=5, anchor='w')
+
+    tk.Label(port_speed_frame, text="Interface:").pack(side='left', padx=5)
+    port_speed_interface_combobox = ttk.Combobox(port_speed_frame)
+    port_speed_interface_combobox.pack(side='left', padx=5)
+    tk.Button(port_speed_frame, text="...", command=lambda: choose_interfaces(port_speed_interface_combobox)).pack(side='left')
+
+    tk.Label(port_speed_frame, text="Set Speed:").pack(side='left', padx=5)
+    port_speed_combobox = ttk.Combobox(port_speed_frame, values=["10", "100", "1000", "auto"])
+    port_speed_combobox.pack(side='left', padx=5)
+
+    tk.Label(port_speed_frame, text="Duplex Mode:").pack(side='left', padx=5)
+    port_duplex_combobox = ttk.Combobox(port_speed_frame, values=["auto", "full", "half"])
+    port_duplex_combobox.pack(side='left', padx=5)
+
+    set_speed_button = tk.Button(port_speed_frame, text="Set", command=set_port_speed_duplex, bg='lightblue')
+    set_speed_button.pack(side='left', padx=5)
+
+    # Fleet tab widgets
+    tk.Label(frame_fleet, text="Hosts (all, tag:NAME or file):").grid(row=0, column=0, padx=10, pady=4, sticky='w')
+    fleet_hosts_entry = tk.Entry(frame_fleet)
+    fleet_hosts_entry.insert(0, 'all')
+    fleet_hosts_entry.grid(row=0, column=1, padx=10, pady=4, sticky='w')
+
+    tk.Label(frame_fleet, text="Workers:").grid(row=0, column=2, padx=10, pady=4, sticky='w')
+    fleet_workers_entry = tk.Entry(frame_fleet, width=6)
+    fleet_workers_entry.insert(0, '10')
+    fleet_workers_entry.grid(row=0, column=3, padx=10, pady=4, sticky='w')
+
+    tk.Label(frame_fleet, text="Canary size:").grid(row=1, column=0, padx=10, pady=4, sticky='w')
+    fleet_canary_entry = tk.Entry(frame_fleet, width=6)
+    fleet_canary_entry.insert(0, '1')
+    fleet_canary_entry.grid(row=1, column=1, padx=10, pady=4, sticky='w')
+
+    tk.Label(frame_fleet, text="Wave size (0 = all):").grid(row=1, column=2, padx=10, pady=4, sticky='w')
+    fleet_wave_entry = tk.Entry(frame_fleet, width=6)
+    fleet_wave_entry.insert(0, '0')
+    fleet_wave_entry.grid(row=1, column=3, padx=10, pady=4, sticky='w')
 
-# Add the "Change" button on the same row as the input fields
-change_button = tk.Button(port_security_frame, text="Change", command=apply_port_security, bg='lightgreen')
-change_button.pack(side='left', padx=5)
+    fleet_save_var = tk.BooleanVar(value=True)
+    tk.Checkbutton(frame_fleet, text="Write memory", variable=fleet_save_var).grid(row=1, column=4, padx=10, pady=4, sticky='w')
 
-# Add a label to show status at the bottom of the window
-status_label = tk.Label(root, text="Not connected")
-status_label.pack(side='bottom', fill='x', anchor='w')
+    tk.Label(frame_fleet, text="Commands (one per line):").grid(row=2, column=0, columnspan=2, padx=10, pady=4, sticky='w')
+    fleet_commands_text = tk.Text(frame_fleet, height=6, width=60)
+    fleet_commands_text.grid(row=3, column=0, columnspan=5, padx=10, pady=4, sticky='w')
+
+    fleet_run_button = tk.Button(frame_fleet, text="Push to Fleet", command=run_fleet_push, bg='lightgreen')
+    fleet_run_button.grid(row=4, column=0, padx=10, pady=4, sticky='w')
+
+    fleet_snapshot_button = tk.Button(frame_fleet, text="Snapshot Fleet", command=run_fleet_snapshot, bg='lightyellow')
+    fleet_snapshot_button.grid(row=4, column=1, padx=10, pady=4, sticky='w')
 
-# Add widgets for setting port speed and duplex
-tk.Label(frame_port, text="Set port speed and duplex settings").pack(pady=10, anchor='w')
+    mac_collect_button = tk.Button(frame_fleet, text="Collect MAC/ARP", command=run_mac_collection, bg='lightyellow')
+    mac_collect_button.grid(row=4, column=2, padx=10, pady=4, sticky='w')
 
-port_speed_frame = tk.Frame(frame_port)
-port_speed_frame.pack(fill='x', padx=10, pady=5, anchor='w')
+    mac_query_entry = tk.Entry(frame_fleet)
+    mac_query_entry.grid(row=4, column=3, padx=10, pady=4, sticky='w')
+    mac_query_entry.bind("<Return>", lambda e: locate_address())
+    tk.Button(frame_fleet, text="Locate MAC/IP", command=locate_address).grid(row=4, column=4, padx=10, pady=4, sticky='w')
 
-tk.Label(port_speed_frame, text="Interface:").pack(side='left', padx=5)
-port_speed_interface_combobox = ttk.Combobox(port_speed_frame)
-port_speed_interface_combobox.pack(side='left', padx=5)
+    fleet_output_text = tk.Text(frame_fleet, height=12, width=90, state=tk.DISABLED)
+    fleet_output_text.grid(row=5, column=0, columnspan=5, padx=10, pady=4, sticky='w')
 
-tk.Label(port_speed_frame, text="Set Speed:").pack(side='left', padx=5)
-port_speed_combobox = ttk.Combobox(port_speed_frame, values=["10", "100", "1000", "auto"])
-port_speed_combobox.pack(side='left', padx=5)
+    counter_recording_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(frame_fleet, text="Record counters", variable=counter_recording_var,
+                   command=toggle_counter_recording).grid(row=6, column=0, padx=10, pady=4, sticky='w')
+    tk.Label(frame_fleet, text="Report hours:").grid(row=6, column=1, padx=10, pady=4, sticky='e')
+    report_hours_entry = tk.Entry(frame_fleet, width=6)
+    report_hours_entry.insert(0, '24')
+    report_hours_entry.grid(row=6, column=2, padx=10, pady=4, sticky='w')
+    tk.Button(frame_fleet, text="Traffic Report", command=show_traffic_report).grid(row=6, column=3, padx=10, pady=4, sticky='w')
 
-tk.Label(port_speed_frame, text="Duplex Mode:").pack(side='left', padx=5)
-port_duplex_combobox = ttk.Combobox(port_speed_frame, values=["auto", "full", "half"])
-port_duplex_combobox.pack(side='left', padx=5)
+    root.after(engine.session_pool.keepalive_interval * 1000, schedule_keepalive)
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    root.after(0, import_saved_inputs)
 
-set_speed_button = tk.Button(port_speed_frame, text="Set", command=set_port_speed_duplex, bg='lightblue')
-set_speed_button.pack(side='left', padx=5)
+def main():
+    open_stores()
+    build_window()
+    # Start the Tkinter main loop
+    root.mainloop()
 
-# Start the Tkinter main loop
-root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "cisco_cli.py")
+RUNS = 15
+
+CASES = [
+    ("python -c pass", ["-c", "pass"]),
+    ("cli --help", [CLI, "--help"]),
+    ("cli show (fake)", [CLI, "--fake", "--host", "sw1", "show", "vlan", "brief"]),
+    ("cli port set (fake)", [CLI, "--fake", "--host", "sw1", "port", "set", "Gi1/0/1-24", "--speed", "100"]),
+    ("import netmiko", ["-c", "import netmiko"]),
+]
+
+
+def time_run(args, cwd):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start, result.returncode
+
+
+def slowest_imports(args, cwd, count=8):
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not name.startswith(" "):
+            rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cwd:
+        print(f"median of {RUNS} runs")
+        for name, args in CASES:
+            times = []
+            for _ in range(RUNS):
+                elapsed, code = time_run(args, cwd)
+                times.append(elapsed)
+            status = "" if code == 0 else f"  (exit {code})"
+            print(f"{name:<22} {statistics.median(times) * 1000:8.1f} ms{status}")
+
+        print("\nslowest top-level imports for 'cli show (fake)':")
+        for cumulative, name in slowest_imports(CASES[2][1], cwd):
+            print(f"  {name:<24} {cumulative / 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
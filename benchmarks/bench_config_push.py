@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_push import TftpServer, TftpTransfer, ScpTransfer
+from config_replay import compact_history, desired_commands
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler, fake_file_transfer
+from timing_profiles import calibrate
+
+
+def build_history(vlans, ports):
+    history = [[f"vlan {vlan}", f"name users-{vlan}"] for vlan in range(100, 100 + vlans)]
+    for port in range(1, ports + 1):
+        history.append([f"interface GigabitEthernet{(port - 1) // 48 + 1}/0/{(port - 1) % 48 + 1}",
+                        f"description desk-{port}", "switchport mode access",
+                        f"switchport access vlan {100 + port % vlans}", "spanning-tree portfast"])
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line-by-line push vs compiled config file push.")
+    parser.add_argument("--latency", type=float, default=0.02, help="per-exchange delay of the fake device")
+    parser.add_argument("--line-latency", type=float, default=0.0005, help="device parse time per config line")
+    parser.add_argument("--vlans", type=int, default=400)
+    parser.add_argument("--ports", type=int, default=192)
+    args = parser.parse_args()
+
+    history = build_history(args.vlans, args.ports)
+    commands = desired_commands(compact_history(history))
+    print(f"{len(commands)} config lines ({args.vlans} VLANs, {args.ports} ports), "
+          f"{args.latency * 1000:.0f} ms per exchange, {args.line_latency * 1000:.1f} ms per line on the device")
+
+    server = TftpServer("127.0.0.1", 0).start()
+    handler = fake_connect_handler(latency=args.latency, line_latency=args.line_latency, port_count=args.ports,
+                                   netmiko_timing=True)
+    methods = [
+        ("line by line (cmd_verify)", "lines", None),
+        ("line by line (fast mode)", "lines", calibrate([args.latency], "cisco_ios", fast=True)),
+        ("file via TFTP + replace", TftpTransfer(server, "127.0.0.1"), None),
+        ("file via SCP + replace", ScpTransfer(fake_file_transfer), None),
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            reference = None
+            for i, (name, method, timing) in enumerate(methods):
+                host = f"sw{i}"
+                engine = DeviceEngine(connect_handler=handler, journal_directory=directory)
+                engine.connect(host, timing=timing)
+                engine.command_history = history
+                start = time.perf_counter()
+                if method == "lines":
+                    engine.send_config(commands, validate=False)
+                    trips_label = f"{len(commands)} lines sent"
+                else:
+                    changes, _ = engine.push_config_file(method)
+                    trips_label = f"{len(changes)} sections changed"
+                elapsed = time.perf_counter() - start
+                config = handler.switches[host].running_config().replace(f"hostname {host}", "hostname sw")
+                reference = reference or config
+                print(f"  {name:<28} {elapsed:7.2f}s  ({trips_label}, same result: {config == reference})")
+                engine.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
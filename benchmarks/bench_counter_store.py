@@ -0,0 +1,79 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from counter_store import CounterStore, format_counter_stats
+from ios_parsers import InterfaceCounters, InterfaceErrors
+
+
+def samples(host_index, ports, minute):
+    # Cumulative counters with a daily traffic curve; every 97th port takes an error burst once a day
+    counters = []
+    errors = []
+    load = 1 + (minute % 1440 > 480) * 4
+    for port in range(ports):
+        rate = (host_index * ports + port) % 500 + 1
+        octets = minute * rate * 7500 * load
+        counters.append(InterfaceCounters(f"Gi{port // 48 + 1}/0/{port % 48 + 1}", octets, 0, 0, 0, octets // 2, 0, 0, 0))
+        burst = 5000 * (minute // 1440 + (minute % 1440 >= 1200)) if port % 97 == 0 else 0
+        errors.append(InterfaceErrors(counters[-1].interface, 0, minute // 10 + burst, 0, 0, 0, 0))
+    return counters, errors
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"  {label:<44} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write and query months-scale interface counter history.")
+    parser.add_argument("--hosts", type=int, default=42)
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--days", type=float, default=1)
+    args = parser.parse_args()
+
+    minutes = int(args.days * 1440)
+    start_time = 1767225600  # 2026-01-01 00:00 UTC
+    speeds = {f"Gi{port // 48 + 1}/0/{port % 48 + 1}": 1e9 for port in range(args.ports)}
+    with tempfile.TemporaryDirectory() as directory:
+        store = CounterStore(os.path.join(directory, "store"))
+        start = time.perf_counter()
+        for minute in range(minutes + 1):
+            for host in range(args.hosts):
+                counters, errors = samples(host, args.ports, minute)
+                store.record(f"sw{host}", start_time + minute * 60, counters, errors, speeds if minute == 0 else None)
+        elapsed = time.perf_counter() - start
+        port_minutes = minutes * args.hosts * args.ports
+        stats = store.stats()
+        print(f"{args.hosts * args.ports} ports, {minutes} minutes: {elapsed:.1f}s to record "
+              f"({port_minutes / elapsed:,.0f} port-minutes/s), {format_counter_stats(stats)}")
+        print(f"  {stats['bytes'] / port_minutes:.1f} bytes per port-minute including hourly rollups")
+        store.close()
+
+        # A fresh process: nothing is loaded until a query maps the files it needs
+        store = CounterStore(os.path.join(directory, "store"))
+        day = (start_time, start_time + 86400)
+        whole = (start_time, start_time + minutes * 60)
+        top = timed("top 10 by inbound rate, 1 day of minutes", lambda: store.top_ports(*day, n=10))
+        timed("top 10 by peak outbound, 1 day of minutes", lambda: store.top_ports(*day, "out_bps", 10, "max"))
+        spikes = timed("error spikes, 1 day of minutes", lambda: store.error_spikes(*day))
+        timed("p50/p95/p99 utilization, 1 day of minutes", lambda: store.utilization(*day))
+        timed(f"top 10 by inbound rate, {args.days:g} days of hourly rollups",
+              lambda: store.top_ports(*whole, n=10, level="hour"))
+        timed(f"error spikes, {args.days:g} days of hourly rollups", lambda: store.error_spikes(*whole, level="hour"))
+        timed("one port, 1 day of minutes", lambda: store.series("sw0", "Gi1/0/1", "in_bps", *day))
+        print(f"  busiest: {top[0].host} {top[0].interface}; {len(spikes)} error spikes found")
+        print(f"  peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB "
+              f"(store on disk {stats['bytes'] / 1048576:.0f} MB)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
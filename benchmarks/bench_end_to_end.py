@@ -0,0 +1,119 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_replay import compact_history, missing_commands
+from fake_device import fake_connect_handler
+from interface_range import group_interface_ranges, build_range_commands
+from ios_parsers import parse_ip_interface_brief, parse_vlan_brief
+from session_pool import SessionPool
+from vlan_bulk import build_vlan_commands, parse_vlan_spec
+
+HISTORY_SIZE = 2000
+
+
+def handler_commands(port_count):
+    # The command sets each GUI handler sends for a typical request
+    interface = "GigabitEthernet1/0/1"
+    access_ports = [f"GigabitEthernet1/0/{n}" for n in range(1, min(port_count, 24) + 1)]
+    bulk_vlans, _, _ = build_vlan_commands({vlan: None for vlan in parse_vlan_spec("100-399")}, {})
+    return {
+        "create_vlan": ["vlan 10", "name USERS"],
+        "create_bulk_vlans": bulk_vlans,
+        "assign_vlan": [f"interface {interface}", "switchport mode access", "switchport access vlan 10"],
+        "assign_vlan (range)": build_range_commands(group_interface_ranges(access_ports),
+                                                    ["switchport mode access", "switchport access vlan 10"]),
+        "assign_native_vlan": [f"interface {interface}", "switchport trunk native vlan 99"],
+        "port_security": [f"interface {interface}", "switchport mode access", "switchport port-security",
+                          "switchport port-security maximum 2"],
+        "speed_duplex": [f"interface {interface}", "speed 100", "duplex full"],
+        "toggle_port": [f"interface {interface}", "shutdown"],
+    }
+
+
+def history_entries(count, port_count):
+    history = []
+    for i in range(count):
+        interface = f"GigabitEthernet1/0/{i % port_count + 1}"
+        kind = i % 4
+        if kind == 0:
+            history.append([f"vlan {i % 200 + 100}", f"name VLAN_{i % 200 + 100}"])
+        elif kind == 1:
+            history.append([f"interface {interface}", "switchport mode access", f"switchport access vlan {i % 200 + 100}"])
+        elif kind == 2:
+            history.append([f"interface {interface}", f"speed {(10, 100, 1000)[i % 3]}", "duplex full"])
+        else:
+            history.append([f"interface {interface}", "shutdown" if i % 8 == 3 else "no shutdown"])
+    return history
+
+
+def measure(name, connection, fn):
+    trips = connection.round_trips
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24} {connection.round_trips - trips:>6} {elapsed * 1000:>10.1f} {peak / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end timings against the fake IOS device")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per round trip")
+    parser.add_argument("--line-latency", type=float, default=0.002, help="extra seconds per config line")
+    parser.add_argument("--ports", type=int, default=48)
+    args = parser.parse_args()
+
+    connect = fake_connect_handler(latency=args.latency, line_latency=args.line_latency, port_count=args.ports)
+    pool = SessionPool(connect_handler=connect)
+    device = {"device_type": "cisco_ios", "host": "sw1", "username": "admin", "password": "admin"}
+
+    print(f"{args.ports} ports, {args.latency * 1000:.0f} ms per round trip, {args.line_latency * 1000:.1f} ms per line")
+    print(f"{'step':<24} {'trips':>6} {'wall ms':>10} {'peak KiB':>10}")
+
+    start = time.perf_counter()
+    connection = pool.get(device)
+    print(f"{'connect':<24} {connection.round_trips:>6} {(time.perf_counter() - start) * 1000:>10.1f} {'':>10}")
+    measure("reconnect (pooled)", connection, lambda: pool.get(device))
+
+    def populate():
+        parse_ip_interface_brief(connection.send_command("show ip interface brief"))
+        parse_vlan_brief(connection.send_command("show vlan brief"))
+    measure("populate", connection, populate)
+
+    for name, commands in handler_commands(args.ports).items():
+        def push(commands=commands):
+            connection.send_config_set(commands)
+            connection.save_config()
+        measure(name, connection, push)
+
+    history = history_entries(HISTORY_SIZE, args.ports)
+
+    def replay_legacy():
+        # The original startup path: one send_config_set per stored history entry
+        for entry in history:
+            connection.send_config_set(entry)
+    measure(f"replay legacy ({HISTORY_SIZE})", connection, replay_legacy)
+
+    # Compacted diff replay runs against a second, unconfigured switch so it has real work to do
+    fresh = pool.get(dict(device, host="sw2"))
+
+    def replay_diff():
+        state = compact_history(history)
+        commands, _ = missing_commands(state, fresh.send_command("show running-config"),
+                                       fresh.send_command("show vlan brief"))
+        if commands:
+            fresh.send_config_set(commands)
+    measure(f"replay diff ({HISTORY_SIZE})", fresh, replay_diff)
+    measure("replay diff (in sync)", fresh, replay_diff)
+
+    pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
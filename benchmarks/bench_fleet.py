@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import fake_connect_handler
+from fleet import run_fleet
+
+HOST_COUNT = 300
+LATENCY = 0.02
+COMMANDS = ["vlan 100", "name USERS"]
+
+
+def main():
+    hosts = [{"host": f"10.0.{i // 250}.{i % 250 + 1}"} for i in range(HOST_COUNT)]
+    connect = fake_connect_handler(latency=LATENCY)
+    print(f"{HOST_COUNT} hosts, {LATENCY * 1000:.0f} ms per round trip")
+    for workers in (1, 5, 10, 25, 50, 100):
+        start = time.time()
+        results = run_fleet(hosts, COMMANDS, workers=workers, connect_handler=connect)
+        elapsed = time.time() - start
+        ok = sum(1 for r in results if r["ok"])
+        print(f"workers={workers:<4} {elapsed:7.2f}s  {HOST_COUNT / elapsed:8.1f} hosts/s  ok={ok}")
+
+
+if __name__ == "__main__":
+    main()
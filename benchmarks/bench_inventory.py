@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from host_inventory import HostInventory
+
+HOST_COUNT = 5000
+SAMPLE = 50
+
+
+def entry(i):
+    return {"host": f"sw-{('core', 'dist', 'access')[i % 3]}-{i:05}", "username": "admin", "password": "", "secret": ""}
+
+
+def json_save(path, data):
+    # The previous save_input(): read everything, scan for a duplicate, rewrite everything
+    with open(path, 'r') as f:
+        saved_inputs = json.load(f)
+    if any(saved['host'] == data['host'] for saved in saved_inputs):
+        return
+    saved_inputs.append(data)
+    with open(path, 'w') as f:
+        json.dump(saved_inputs, f, indent=4)
+
+
+def timed(fn, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "saved_inputs.json")
+        with open(json_path, 'w') as f:
+            json.dump([entry(i) for i in range(HOST_COUNT)], f, indent=4)
+
+        inventory = HostInventory(os.path.join(directory, "inventory.db"))
+        start = time.perf_counter()
+        inventory.import_json(json_path)
+        print(f"import {HOST_COUNT} hosts from JSON: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        json_time = timed(lambda i: json_save(json_path, entry(HOST_COUNT + i)), SAMPLE)
+        db_time = timed(lambda i: inventory.add(entry(HOST_COUNT + i)["host"], "admin"), SAMPLE)
+        print(f"save one host      json {json_time * 1000:8.2f} ms   sqlite {db_time * 1000:8.2f} ms")
+
+        lookup = timed(lambda i: inventory.get(f"sw-dist-{(i * 3 + 1):05}"), 1000)
+        print(f"lookup by host     {lookup * 1e6:8.1f} us")
+        for query in ("sw-core-01", "access-049", "tag:none sw", ""):
+            elapsed = timed(lambda i: inventory.search(query), 200)
+            print(f"search {query!r:<16} {elapsed * 1e6:8.1f} us  ({inventory.count(query)} matches)")
+
+        plan = inventory.db.execute("EXPLAIN QUERY PLAN SELECT * FROM hosts WHERE host >= ? AND host < ?",
+                                    ("sw-core", "sw-core\U0010ffff")).fetchall()
+        print("prefix query plan:", "; ".join(row[-1] for row in plan))
+        inventory.close()
+
+
+if __name__ == "__main__":
+    main()
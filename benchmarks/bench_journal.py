@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_journal import CommandJournal
+
+TOTAL_ENTRIES = 100000
+SAMPLE_EVERY = 20000
+SAMPLE_SIZE = 200
+
+
+def entry(i):
+    return [f"interface GigabitEthernet1/0/{i % 48 + 1}", f"speed {(10, 100, 1000)[i % 3]}"]
+
+
+def time_appends(journal, start, count, commit):
+    begin = time.perf_counter()
+    for i in range(start, start + count):
+        journal.append(entry(i), commit=commit)
+    return (time.perf_counter() - begin) / count
+
+
+def time_rewrites(history, count):
+    # The previous approach: re-serialize the whole history on every change
+    path = os.path.join(tempfile.gettempdir(), "bench_running_config.json")
+    begin = time.perf_counter()
+    for i in range(count):
+        history.append(entry(i))
+        with open(path, 'w') as f:
+            json.dump(history, f)
+    os.remove(path)
+    return (time.perf_counter() - begin) / count
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        journal = CommandJournal("bench", directory=directory, compact_every=0)
+        print(f"{'history':>8}  {'append':>10}  {'append+fsync':>13}  {'full rewrite':>13}")
+        written = 0
+        history = []
+        while written <= TOTAL_ENTRIES:
+            append = time_appends(journal, written, SAMPLE_SIZE, commit=False)
+            fsync = time_appends(journal, written, 20, commit=True)
+            rewrite = time_rewrites(history, 5) if written <= 40000 else float('nan')  # too slow beyond this
+            print(f"{written:>8}  {append * 1e6:>8.1f}us  {fsync * 1e6:>11.1f}us  {rewrite * 1e6:>11.1f}us")
+            fill = SAMPLE_EVERY - SAMPLE_SIZE - 20
+            for i in range(written, written + fill):
+                journal.append(entry(i), commit=False)
+            history.extend(entry(i) for i in range(SAMPLE_EVERY - 5))
+            written += SAMPLE_EVERY
+        journal.commit()
+
+        begin = time.perf_counter()
+        journal.tail(50)
+        print(f"tail(50) at {written} entries: {(time.perf_counter() - begin) * 1e3:.2f} ms")
+        begin = time.perf_counter()
+        journal.compact()
+        print(f"compact(): {(time.perf_counter() - begin) * 1e3:.1f} ms, "
+              f"{len(journal.load())} snapshot entries remain")
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
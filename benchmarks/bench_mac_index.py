@@ -0,0 +1,74 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import fake_connect_handler, generate_ip_arp, generate_mac_address_table
+from ios_parsers import parse_ip_arp, parse_mac_address_table
+from mac_index import MacIndex, collect_fleet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAC/ARP index: collection, lookups and reload.")
+    parser.add_argument("--hosts", type=int, default=1000, help="devices in the synthetic index")
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--macs-per-port", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--fleet", type=int, default=100, help="fake devices for the collection timing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        hosts = [{"host": f"sw-{i:04}"} for i in range(args.fleet)]
+        index = MacIndex(os.path.join(directory, "collect.db"))
+        handler = fake_connect_handler(latency=args.latency, port_count=args.ports)
+        for workers in (1, 20):
+            start = time.perf_counter()
+            collect_fleet(hosts, index, workers=workers, connect_handler=handler)
+            print(f"collect {args.fleet} devices, {workers:>2} workers: {time.perf_counter() - start:6.2f} s")
+        start = time.perf_counter()
+        results = collect_fleet(hosts, index, workers=20, max_age=900, connect_handler=handler)
+        print(f"incremental refresh (all fresh): {len(results)} devices visited in {(time.perf_counter() - start) * 1000:.1f} ms")
+        index.close()
+
+        path = os.path.join(directory, "mac_index.db")
+        index = MacIndex(path)
+        per_host = args.ports * args.macs_per_port
+        start = time.perf_counter()
+        for i in range(args.hosts):
+            macs = parse_mac_address_table(generate_mac_address_table(args.ports, args.macs_per_port, i * per_host))
+            arp = parse_ip_arp(generate_ip_arp(per_host, i * per_host))
+            index.update_host(f"sw-{i:04}", macs, arp)
+        build = time.perf_counter() - start
+        print(f"index {args.hosts} devices ({args.hosts * per_host} MACs): {build:.2f} s incl. parsing, "
+              f"{build / args.hosts * 1000:.2f} ms per device update")
+
+        random.seed(1)
+        queries = [random.randrange(args.hosts * per_host) for _ in range(2000)]
+        start = time.perf_counter()
+        for value in queries:
+            index.locate(f"0011.{value >> 16 & 0xffff:04x}.{value & 0xffff:04x}")
+        mac_time = (time.perf_counter() - start) / len(queries)
+        ips = list(index.ips)
+        start = time.perf_counter()
+        for ip in random.sample(ips, 2000):
+            index.lookup(ip)
+        ip_time = (time.perf_counter() - start) / 2000
+        print(f"lookup by MAC {mac_time * 1e6:.1f} us, by IP {ip_time * 1e6:.1f} us; "
+              f"searching device by device would take ~{args.hosts / 2 * args.latency:.0f} s at {args.latency * 1000:.0f} ms/device")
+        index.close()
+
+        start = time.perf_counter()
+        index = MacIndex(path)
+        opened = time.perf_counter() - start
+        index.locate("0011.0000.0001")
+        print(f"reload from disk: open {opened * 1000:.1f} ms, first lookup (loads the index) "
+              f"{time.perf_counter() - start:.2f} s")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_metrics import DeviceMetrics, InstrumentedConnection
+from fake_device import FakeDevice
+
+CALLS = 100000
+COMMANDS = ["show ip interface brief", "show vlan brief", "show interfaces GigabitEthernet1/0/7 switchport"]
+
+
+def time_calls(connection):
+    start = time.perf_counter()
+    for i in range(CALLS):
+        connection.send_command(COMMANDS[i % len(COMMANDS)])
+    return (time.perf_counter() - start) / CALLS
+
+
+def main():
+    # A zero-latency fake device with 2 ports keeps the device side cheap so the wrapper cost shows
+    device = FakeDevice("bench", port_count=2)
+    metrics = DeviceMetrics()
+    plain = time_calls(device)
+    wrapped = time_calls(InstrumentedConnection(device, metrics))
+    print(f"{CALLS} send_command calls")
+    print(f"plain         {plain * 1e6:8.2f} us/call")
+    print(f"instrumented  {wrapped * 1e6:8.2f} us/call  (+{(wrapped - plain) * 1e6:.2f} us)")
+    print(f"overhead vs a 50 ms round trip: {(wrapped - plain) / 0.05:.4%}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        metrics.write_prometheus(os.path.join(directory, "metrics.prom"))
+        metrics.write_json(os.path.join(directory, "metrics.json"))
+        print(f"export both formats: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    for row in metrics.rows():
+        print(f"  {row['command']:<40} {row['count']:>7} calls  p95 {row['p95'] * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
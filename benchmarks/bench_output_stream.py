@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import FakeDevice
+from output_stream import OutputSpool, stream_command
+
+CHUNK_SIZE = 16384
+CHUNK_INTERVAL = 0.001  # about 16 MB/s off the channel
+
+
+def run_buffered(device):
+    # The previous path: the whole output arrives as one string before anything is shown
+    start = time.perf_counter()
+    output = device.send_command("show tech-support")
+    # send_command cannot return early, so the first line is only available once everything has been read
+    chunks = (len(output) + CHUNK_SIZE - 1) // CHUNK_SIZE
+    time.sleep(chunks * CHUNK_INTERVAL)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, sys.getsizeof(output)
+
+
+def run_streamed(device):
+    spool = OutputSpool()
+    state = {"first": None}
+    start = time.perf_counter()
+
+    def on_chunk(chunk):
+        if state["first"] is None:
+            state["first"] = time.perf_counter() - start
+        spool.append(chunk)
+
+    stream_command(device, "show tech-support", on_chunk, poll_interval=0.001)
+    elapsed = time.perf_counter() - start
+    # Only the line offsets stay in memory; the text itself is in the spool file
+    retained = spool.offsets.buffer_info()[1] * spool.offsets.itemsize
+    search_start = time.perf_counter()
+    spool.search("trnet-default", spool.line_count() // 2)
+    search = time.perf_counter() - search_start
+    spool.close()
+    return state["first"], elapsed, retained, search
+
+
+def main():
+    print(f"{'repeat':>7} {'size':>9} {'mode':<9} {'first line':>11} {'total':>9} {'retained':>10}")
+    for repeat in (10, 100, 400):
+        device = FakeDevice("bench", port_count=48, chunk_size=CHUNK_SIZE, chunk_interval=CHUNK_INTERVAL,
+                            tech_repeat=repeat)
+        device.enable()
+        size = len(device.send_command("show tech-support"))
+        for mode, run in (("buffered", run_buffered), ("streamed", run_streamed)):
+            result = run(device)
+            extra = f"  search {result[3] * 1000:.1f} ms" if len(result) > 3 else ""
+            print(f"{repeat:>7} {size / 1e6:>7.1f}MB {mode:<9} {result[0] * 1000:>9.0f}ms {result[1]:>8.2f}s "
+                  f"{result[2] / 1e6:>8.2f}MB{extra}")
+
+
+if __name__ == "__main__":
+    main()
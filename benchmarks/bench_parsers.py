@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import (generate_ip_interface_brief, generate_vlan_brief, generate_interfaces_status,
+                         generate_interfaces_counters, generate_mac_address_table)
+from ios_parsers import (parse_ip_interface_brief, parse_vlan_brief, parse_interfaces_status,
+                         parse_interfaces_counters, parse_mac_address_table)
+
+SIZES = (10000, 20000, 40000, 80000)
+
+
+def legacy_parse_ip_interface_brief(output):
+    # What populate_interfaces_and_vlans() / populate_port_status() used to do
+    interfaces = [line.split()[0] for line in output.splitlines() if len(line.split()) > 0 and 'Interface' not in line]
+    statuses = []
+    for line in output.splitlines():
+        if 'Interface' in line:
+            continue
+        parts = line.split()
+        if len(parts) > 0:
+            statuses.append((parts[0], parts[4]))
+    return interfaces, statuses
+
+
+def best_of(fn, arg, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    cases = [
+        ("show ip interface brief (legacy)", generate_ip_interface_brief, legacy_parse_ip_interface_brief),
+        ("show ip interface brief", generate_ip_interface_brief, parse_ip_interface_brief),
+        ("show vlan brief", lambda n: generate_vlan_brief({str(i): f"VLAN{i:04}" for i in range(1, 4095)}, n), parse_vlan_brief),
+        ("show interfaces status", generate_interfaces_status, parse_interfaces_status),
+        ("show interfaces counters", generate_interfaces_counters, parse_interfaces_counters),
+        ("show mac address-table", generate_mac_address_table, parse_mac_address_table),
+    ]
+    print(f"{'command':<34}" + "".join(f"{size:>12}" for size in SIZES) + "   us/row")
+    for name, generate, parse in cases:
+        timings = [best_of(parse, generate(size)) for size in SIZES]
+        per_row = timings[-1] / SIZES[-1] * 1e6
+        print(f"{name:<34}" + "".join(f"{t * 1000:>10.1f}ms" for t in timings) + f"   {per_row:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import interface_names
+from port_grid import PortGrid
+
+PORT_COUNTS = (48, 480, 4800)
+CHANGED_FRACTION = 0.02
+
+
+def legacy_render(frame, statuses):
+    # The old populate_port_status(): destroy everything, then a Frame and two Labels per port
+    for widget in frame.winfo_children():
+        widget.destroy()
+    for interface, status in statuses:
+        container = tk.Frame(frame)
+        container.pack(side='left', padx=0)
+        label = tk.Label(container, text="■", fg='#00ff00' if status == 'up' else '#ff0000', font=("Arial", 40))
+        label.pack(side='top', padx=0)
+        label.bind("<Double-1>", lambda e: None)
+        tk.Label(container, text=interface.replace("Ethernet", "e"), font=("Arial", 8)).pack(side='top', pady=0)
+
+
+def timed(root, fn):
+    start = time.perf_counter()
+    fn()
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    root = tk.Tk()
+    root.geometry("800x600")
+    random.seed(1)
+    print(f"{'ports':>6} {'legacy full':>12} {'legacy refresh':>15} {'grid first':>11} {'grid refresh':>13}")
+    for count in PORT_COUNTS:
+        statuses = [(name, 'up' if i % 3 else 'down') for i, name in enumerate(interface_names(count))]
+        refreshed = list(statuses)
+        for i in random.sample(range(count), max(1, int(count * CHANGED_FRACTION))):
+            refreshed[i] = (refreshed[i][0], 'down' if refreshed[i][1] == 'up' else 'up')
+
+        frame = tk.Frame(root)
+        frame.pack()
+        legacy_first = timed(root, lambda: legacy_render(frame, statuses))
+        legacy_refresh = timed(root, lambda: legacy_render(frame, refreshed))
+        frame.destroy()
+
+        grid = PortGrid(root)
+        grid.pack(fill='both', expand=True)
+        grid_first = timed(root, lambda: grid.update(statuses))
+        grid_refresh = timed(root, lambda: grid.update(refreshed))
+        grid.frame.destroy()
+        print(f"{count:>6} {legacy_first:>10.1f}ms {legacy_refresh:>13.1f}ms {grid_first:>9.1f}ms {grid_refresh:>11.1f}ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
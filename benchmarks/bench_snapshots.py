@@ -0,0 +1,69 @@
+import difflib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_snapshots import SnapshotStore, format_store_stats
+from fake_device import FakeSwitch
+
+HOST_COUNT = 200
+DAYS = 20
+CHANGE_RATE = 0.2  # share of hosts with a config change on any given day
+
+
+def device_config(switch, day):
+    # IOS stamps the time into the header even when nothing changed
+    return (f"Building configuration...\n\nCurrent configuration : {9000 + day} bytes\n"
+            f"! Last configuration change at 0{day % 10}:00:00 UTC\n" + switch.running_config())
+
+
+def main():
+    random.seed(1)
+    switches = [FakeSwitch(f"sw-{i:04}", 48) for i in range(HOST_COUNT)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = SnapshotStore(directory)
+        raw = {}
+        start = time.perf_counter()
+        for day in range(DAYS):
+            for switch in switches:
+                if day and random.random() < CHANGE_RATE:
+                    name = random.choice(list(switch.interfaces))
+                    switch.interfaces[name]["lines"]["switchport access vlan"] = f"switchport access vlan {random.randint(2, 400)}"
+                config = device_config(switch, day)
+                digest, _ = store.capture(switch.hostname, config, taken=day * 86400 + 1)
+                raw[digest] = config
+        elapsed = time.perf_counter() - start
+        snapshots = HOST_COUNT * DAYS
+        print(f"capture {snapshots} snapshots: {elapsed * 1000:.0f} ms ({elapsed / snapshots * 1e6:.0f} us each)")
+        print(format_store_stats(store.stats()))
+
+        pairs = [(history[i - 1]["hash"], history[i]["hash"])
+                 for host in store.hosts() for history in [store.history(host)] for i in range(1, len(history))]
+
+        start = time.perf_counter()
+        changed = sum(1 for old, new in pairs if store.diff(old, new))
+        section_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for old, new in pairs:
+            list(difflib.unified_diff(raw[old].splitlines(), raw[new].splitlines(), lineterm=""))
+        difflib_time = time.perf_counter() - start
+
+        print(f"diff {len(pairs)} consecutive pairs ({changed} with changes)")
+        print(f"  section diff  {section_time * 1000:8.0f} ms  ({section_time / len(pairs) * 1e6:6.0f} us/pair, includes loading)")
+        print(f"  difflib       {difflib_time * 1000:8.0f} ms  ({difflib_time / len(pairs) * 1e6:6.0f} us/pair, text already in memory)")
+
+        start = time.perf_counter()
+        hosts = store.hosts()
+        for host in hosts[1:]:
+            store.diff(hosts[0], host)
+        cross = time.perf_counter() - start
+        print(f"diff {hosts[0]} against {len(hosts) - 1} other devices: {cross * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_device import FakeDevice, FakeSwitch, generate_ip_interface_brief, send_link_flaps, syslog_message
+from ios_parsers import update_ip_interface_brief
+from syslog_listener import SyslogListener, merge_events, parse_syslog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Syslog listener throughput and cost of a push update vs a poll.")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--rate", type=int, default=0, help="messages per second (0 = as fast as possible)")
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake device round trip for the poll comparison")
+    args = parser.parse_args()
+
+    messages = [syslog_message(f"GigabitEthernet1/0/{i % args.ports + 1}", ("status", "protocol")[i % 2],
+                               ("up", "down")[i % 3 == 0], i) for i in range(10000)]
+    start = time.perf_counter()
+    events = [parse_syslog(message, "10.0.0.1") for message in messages]
+    merged = merge_events(events)
+    parse_time = time.perf_counter() - start
+    print(f"parse + merge: {len(messages) / parse_time:,.0f} messages/s")
+
+    batches = []
+    listener = SyslogListener(batches.append, host="127.0.0.1", port=0, batch_interval=0.1).start()
+    sent_time = send_link_flaps(listener.address, args.messages, args.ports, args.rate or None, noise=0.1)
+    time.sleep(0.5)
+    listener.stop()
+    stats = listener.stats()
+    print(f"sent {args.messages} datagrams in {sent_time:.2f}s ({args.messages / sent_time:,.0f}/s): "
+          f"received {stats['received']} ({1 - stats['received'] / args.messages:.1%} lost in the kernel), "
+          f"{stats['matched']} port events in {stats['batches']} UI updates")
+
+    output = generate_ip_interface_brief(args.ports)
+    changes = merged["10.0.0.1"]
+    start = time.perf_counter()
+    for _ in range(200):
+        update_ip_interface_brief(output, changes)
+    patch_time = (time.perf_counter() - start) / 200
+    device = FakeDevice(latency=args.latency, switch=FakeSwitch("bench", args.ports))
+    start = time.perf_counter()
+    device.send_command("show ip interface brief")
+    poll_time = time.perf_counter() - start
+    print(f"apply one batch to the cached interface list: {patch_time * 1e6:.0f} us; "
+          f"re-poll show ip interface brief: {poll_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler
+from timing_profiles import default_profile, format_profile
+
+
+def per_command(engine, repeat):
+    # Mean seconds per call for each kind of device call
+    config = [f"interface GigabitEthernet1/0/{port}" for port in range(1, 4)] + ["description bench"] * 7
+    calls = {
+        "show ip interface brief": lambda: engine.show("show ip interface brief", cached=False),
+        "show vlan brief": lambda: engine.show("show vlan brief", cached=False),
+        f"config set ({len(config)} lines)": lambda: engine.send_config(config, save=False, validate=False),
+    }
+    results = {}
+    for name, call in calls.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = (time.perf_counter() - start) / repeat
+    return results
+
+
+def run(latency, device_type, repeat, directory):
+    handler = fake_connect_handler(latency=latency, port_count=48, netmiko_timing=True)
+    engine = DeviceEngine(connect_handler=handler, journal_directory=directory)
+
+    # Before: Netmiko defaults, prompt looked up before every command, every config line verified
+    engine.connect("sw1", device_type=device_type)
+    engine.prompt = None
+    engine.timing = dict(default_profile)
+    before = per_command(engine, repeat)
+    engine.disconnect()
+
+    engine.connect("sw1", device_type=device_type)
+    profile = engine.calibrate_timing()
+    after = per_command(engine, repeat)
+    engine.close()
+    return before, after, profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-command latency with Netmiko defaults vs a calibrated profile.")
+    parser.add_argument("--latencies", default="0.02,0.1,0.6", help="injected per-exchange delays in seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for latency in [float(value) for value in args.latencies.split(",")]:
+            for device_type in ("cisco_ios", "cisco_nxos"):
+                before, after, profile = run(latency, device_type, args.repeat, directory)
+                print(f"{device_type}, {latency * 1000:.0f} ms per exchange: {format_profile(profile)}")
+                for name in before:
+                    print(f"  {name:<26} {before[name] * 1000:8.1f} ms -> {after[name] * 1000:8.1f} ms "
+                          f"({before[name] / after[name]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_worker import UiDispatcher, DeviceWorker
+from fake_device import FakeDevice
+
+FRAME_MS = 16
+
+
+def measure(root, start_command):
+    # Schedules a ticker every FRAME_MS and records how late each tick fires while the command runs
+    gaps = []
+    state = {"last": time.perf_counter(), "done": False}
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append((now - state["last"]) * 1000 - FRAME_MS)
+        state["last"] = now
+        if state["done"]:
+            root.quit()
+        else:
+            root.after(FRAME_MS, tick)
+
+    def finished(*args):
+        state["done"] = True
+
+    root.after(FRAME_MS, tick)
+    root.after(50, lambda: start_command(finished))
+    root.mainloop()
+    gaps.sort()
+    return gaps[len(gaps) // 2], gaps[-1]
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    root = tk.Tk()
+    root.withdraw()
+    device = FakeDevice(latency=latency)
+    print(f"show command taking {latency:.1f}s")
+
+    median, worst = measure(root, lambda done: done(device.send_command("show tech-support")))
+    print(f"on Tk thread:   median frame delay {median:8.1f} ms, worst {worst:8.1f} ms")
+
+    worker = DeviceWorker(UiDispatcher(root, interval=10))
+    median, worst = measure(root, lambda done: worker.submit(device.send_command, "show tech-support", on_done=done))
+    print(f"on worker:      median frame delay {median:8.1f} ms, worst {worst:8.1f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
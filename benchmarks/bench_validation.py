@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_validation import ValidationError
+from device_engine import DeviceEngine, port_security_lines, speed_duplex_lines, switchport_lines
+from fake_device import fake_connect_handler, interface_names
+
+
+def good_operation(interfaces, vlans):
+    interface = random.choice(interfaces)
+    lines = random.choice([
+        switchport_lines("access", random.choice(vlans)),
+        port_security_lines("maximum", random.randint(1, 10)),
+        speed_duplex_lines(random.choice(["100", "1000", "auto"]), "full"),
+    ])
+    return [f"interface {interface}"] + lines
+
+
+def bad_operation(interfaces, vlans):
+    # Typical operator mistakes, each turned into the config set a handler would send
+    interface = random.choice(interfaces)
+    return random.choice([
+        [f"interface {interface}"] + switchport_lines("access", 3999),                      # VLAN not created
+        [f"interface {interface[:-1]}9{interface[-1]}"] + speed_duplex_lines("auto"),        # port typo
+        [f"interface {interface}"] + port_security_lines("mac address", "00:11:22:33:44:55"),  # MAC notation
+        [f"interface {interface}"] + speed_duplex_lines("1001"),                            # bad value
+    ])
+
+
+def run(workload, validate, latency, ports):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = DeviceEngine(connect_handler=fake_connect_handler(latency=latency, port_count=ports),
+                              journal_directory=directory)
+        engine.connect("bench")
+        engine.snapshot()
+        trips = engine.connection.round_trips
+        start = time.perf_counter()
+        failed = 0
+        for commands in workload:
+            try:
+                engine.send_config(commands, save=True, validate=validate)
+            except ValidationError:
+                failed += 1
+        elapsed = time.perf_counter() - start
+        trips = engine.connection.round_trips - trips
+        engine.close()
+    return trips, elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips saved by local validation.")
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--ports", type=int, default=48)
+    args = parser.parse_args()
+
+    random.seed(1)
+    interfaces = interface_names(args.ports)
+    vlans = [1]
+    bad = [random.random() < args.error_rate for _ in range(args.operations)]
+    workload = [bad_operation(interfaces, vlans) if is_bad else good_operation(interfaces, vlans) for is_bad in bad]
+
+    print(f"{args.operations} config sets, {sum(bad)} with a mistake, {args.latency * 1000:.0f} ms per round trip")
+    for validate in (False, True):
+        trips, elapsed, stopped = run(workload, validate, args.latency, args.ports)
+        print(f"validation {'on ' if validate else 'off'}: {trips:5} round trips, {elapsed:6.2f} s, "
+              f"{stopped} bad config sets stopped locally")
+
+
+if __name__ == "__main__":
+    main()
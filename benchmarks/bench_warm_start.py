@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler
+from inventory_cache import InventoryCache
+from ios_parsers import parse_ip_interface_brief, parse_vlan_brief
+
+
+def usable(snapshot):
+    # What the UI needs to fill the comboboxes and the port grid
+    return ([record.interface for record in parse_ip_interface_brief(snapshot["interfaces"])],
+            [vlan.vlan_id for vlan in parse_vlan_brief(snapshot["vlans"])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time until interfaces and VLANs are available after connect.")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--ports", type=int, default=96)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = InventoryCache(os.path.join(directory, "cache"))
+        handler = fake_connect_handler(latency=args.latency, port_count=args.ports)
+
+        engine = DeviceEngine(connect_handler=handler, journal_directory=directory, inventory_cache=cache)
+        start = time.perf_counter()
+        engine.connect("sw1")
+        interfaces, vlans = usable(engine.snapshot())
+        cold = time.perf_counter() - start
+        engine.close()
+        size = os.path.getsize(cache._path("sw1"))
+
+        # A new process: nothing in memory, only the file on disk
+        cache = InventoryCache(os.path.join(directory, "cache"))
+        start = time.perf_counter()
+        snapshot = cache.load("sw1")
+        warm_interfaces, warm_vlans = usable(snapshot)
+        warm = time.perf_counter() - start
+        assert (warm_interfaces, warm_vlans) == (interfaces, vlans)
+
+        engine = DeviceEngine(connect_handler=handler, journal_directory=directory, inventory_cache=cache)
+        engine.connect("sw1")
+        start = time.perf_counter()
+        engine.snapshot()
+        reconcile = time.perf_counter() - start
+        rewritten = cache.save("sw1", engine.snapshot())
+        engine.close()
+
+    print(f"{args.ports} ports, {len(vlans)} VLANs, {args.latency * 1000:.0f} ms latency, cache file {size} bytes")
+    print(f"cold: connect + snapshot before the UI is usable  {cold * 1000:8.1f} ms")
+    print(f"warm: load from disk before connecting             {warm * 1000:8.1f} ms")
+    print(f"background reconcile after connect                 {reconcile * 1000:8.1f} ms "
+          f"(file rewritten: {'yes' if rewritten else 'no, unchanged'})")
+
+
+if __name__ == "__main__":
+    main()
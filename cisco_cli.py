@@ -0,0 +1,339 @@
+import argparse
+import os
+import sys
+
+# Only argparse is imported up front; the engine, Netmiko and Tk load when a command needs them,
+# which keeps "--help" and argument errors fast on slow jump hosts.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cisco_cli", description="Manage Cisco IOS switches without the GUI.")
+    parser.add_argument("--host", help="device address")
+    parser.add_argument("--username", default=os.environ.get("CISCO_USERNAME", ""))
+    parser.add_argument("--password", help="defaults to $CISCO_PASSWORD, otherwise prompted")
+    parser.add_argument("--secret", help="enable secret, defaults to $CISCO_SECRET")
+    parser.add_argument("--device-type", default="cisco_ios")
+    parser.add_argument("--no-save", action="store_true", help="skip write memory after config changes")
+    parser.add_argument("--stats", action="store_true", help="print device call timings to stderr on exit")
+    parser.add_argument("--metrics-file", help="write device call metrics (.prom or .json) on exit")
+    parser.add_argument("--fake", action="store_true", help="use the local fake device instead of SSH (testing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    connect = commands.add_parser("connect", help="connect and report interface and VLAN counts")
+    connect.add_argument("--replay", action="store_true", help="push stored config the device is missing")
+    connect.add_argument("--calibrate", action="store_true",
+                         help="measure the device's response time and store the timing profile with the saved host")
+
+    vlan = commands.add_parser("vlan", help="VLAN operations").add_subparsers(dest="vlan_command", required=True)
+    vlan_create = vlan.add_parser("create", help="create one VLAN or a list/range such as 100-199,300")
+    vlan_create.add_argument("vlans")
+    vlan_create.add_argument("--name")
+
+    port = commands.add_parser("port", help="interface operations").add_subparsers(dest="port_command", required=True)
+    port_set = port.add_parser("set", help="configure one interface or a selection such as Gi1/0/1-24")
+    port_set.add_argument("interfaces")
+    port_set.add_argument("--mode", choices=["access", "trunk"])
+    port_set.add_argument("--vlan", help="access VLAN, or allowed VLANs in trunk mode")
+    port_set.add_argument("--native-vlan")
+    port_set.add_argument("--speed", choices=["10", "100", "1000", "auto"])
+    port_set.add_argument("--duplex", choices=["auto", "full", "half"])
+    port_set.add_argument("--port-security", nargs=2, metavar=("OPTION", "VALUE"),
+                          help="maximum, violation, mac-address, aging-time or aging-type")
+    state = port_set.add_mutually_exclusive_group()
+    state.add_argument("--shutdown", action="store_true")
+    state.add_argument("--no-shutdown", action="store_true")
+
+    show = commands.add_parser("show", help="run a show command, e.g. show ip interface brief")
+    show.add_argument("words", nargs="+")
+    show.add_argument("--json", action="store_true", help="print parsed records for supported commands")
+
+    snapshot = commands.add_parser("snapshot", help="running-config snapshots").add_subparsers(
+        dest="snapshot_command", required=True)
+    snapshot_take = snapshot.add_parser("take", help="store the current running-config of --host")
+    snapshot_list = snapshot.add_parser("list", help="list stored snapshots")
+    snapshot_list.add_argument("for_host", nargs="?", metavar="HOST")
+    snapshot_diff = snapshot.add_parser("diff", help="compare two snapshots by section")
+    snapshot_diff.add_argument("old", help="hash prefix, HOST (latest) or HOST~N (N captures earlier)")
+    snapshot_diff.add_argument("new")
+    for snapshot_parser in (snapshot_take, snapshot_list, snapshot_diff):
+        snapshot_parser.add_argument("--directory", default="snapshots", help="snapshot store location")
+
+    push = commands.add_parser("push-config", help="push the stored history or a template as one complete config file")
+    push.add_argument("--template", help="config file to push instead of the compiled history ($host is substituted)")
+    push.add_argument("--merge", action="store_true", help="copy onto the running config instead of configure replace")
+    push.add_argument("--via", choices=["tftp", "scp"], default="tftp", help="tftp: the device pulls from this PC")
+    push.add_argument("--tftp-address", help="this PC's address as seen by the device (default: from the route)")
+    push.add_argument("--dry-run", action="store_true", help="only print the section diff")
+
+    counters = commands.add_parser("counters", help="interface counter history").add_subparsers(
+        dest="counters_command", required=True)
+    counters_collect = counters.add_parser("collect", help="record one sample of --host (run every minute, e.g. from cron)")
+    counters_report = counters.add_parser("report", help="busiest ports, error spikes and utilization percentiles")
+    counters_report.add_argument("--hours", type=float, default=24)
+    counters_report.add_argument("--top", type=int, default=10)
+    counters_report.add_argument("--for-host", action="append", metavar="HOST", help="limit to these hosts")
+    for counters_parser in (counters_collect, counters_report):
+        counters_parser.add_argument("--directory", default="counter_store", help="counter store location")
+
+    commands.add_parser("gui", help="start the desktop application")
+    return parser
+
+
+def connect(engine, args):
+    from host_inventory import inventory_file
+    timing = None
+    if os.path.exists(inventory_file):
+        # Saved hosts supply the username and any keyring credentials not given on the command line
+        import credential_store
+        from host_inventory import HostInventory
+        inventory = HostInventory()
+        saved = inventory.get(args.host)
+        inventory.close()
+        if saved is not None:
+            args.username = args.username or saved["username"]
+            args.device_type = saved["device_type"] if args.device_type == "cisco_ios" else args.device_type
+            password, secret = credential_store.load_credentials(saved["host"])
+            args.password = args.password or password or None
+            args.secret = args.secret or secret or None
+            timing = saved["timing"]
+    password = args.password or os.environ.get("CISCO_PASSWORD")
+    if password is None and not args.fake:
+        import getpass
+        password = getpass.getpass(f"Password for {args.host}: ")
+    secret = args.secret or os.environ.get("CISCO_SECRET", password or "")
+    engine.connect(args.host, args.username, password or "", secret, args.device_type, timing=timing)
+
+
+def run_connect(engine, args):
+    if args.calibrate:
+        from host_inventory import HostInventory, inventory_file
+        from timing_profiles import format_profile
+        profile = engine.calibrate_timing()
+        if os.path.exists(inventory_file):
+            inventory = HostInventory()
+            if not inventory.set_timing(args.host, profile):
+                print(f"{args.host} is not a saved host; the profile is not stored.", file=sys.stderr)
+            inventory.close()
+        print(format_profile(profile))
+    if args.replay:
+        counts = engine.apply_stored_config()
+        if counts is not None:
+            print(f"Stored config: {counts[0]} commands sent, {counts[1]} skipped.")
+    print(f"Connected to {args.host}: {len(engine.interfaces())} interfaces, {len(engine.vlans())} VLANs")
+
+
+def run_vlan_create(engine, args):
+    from vlan_bulk import parse_vlan_spec
+    vlans = parse_vlan_spec(args.vlans)
+    commands, created, skipped = engine.plan_bulk_vlans({vlan: args.name for vlan in vlans})
+    if not commands:
+        print(f"All {skipped} VLANs already exist.")
+        return 0
+    engine.send_config(commands, save=not args.no_save)
+    print(f"Created {created} VLANs ({len(commands)} commands), {skipped} already existed.")
+    return 0
+
+
+def run_port_set(engine, args):
+    from device_engine import switchport_lines, native_vlan_lines, port_security_lines, speed_duplex_lines, shutdown_lines
+    lines = []
+    if args.mode or args.vlan:
+        if not (args.mode and args.vlan):
+            raise ValueError("--mode and --vlan must be given together")
+        lines += switchport_lines(args.mode, args.vlan)
+    if args.native_vlan:
+        lines += native_vlan_lines(args.native_vlan)
+    if args.port_security:
+        option, value = args.port_security
+        lines += port_security_lines(option.replace("-", " "), value)
+    lines += speed_duplex_lines(args.speed, args.duplex)
+    if args.shutdown or args.no_shutdown:
+        lines += shutdown_lines(args.shutdown)
+    if not lines:
+        raise ValueError("Nothing to set; see port set --help")
+
+    results, _ = engine.configure_interfaces(args.interfaces, lines, save=not args.no_save)
+    failed = {name: error for name, error in results.items() if error}
+    for name, error in failed.items():
+        print(f"{name}: {error}", file=sys.stderr)
+    print(f"Applied {len(lines)} lines to {len(results) - len(failed)}/{len(results)} interfaces.")
+    return 1 if failed else 0
+
+
+def run_show(engine, args):
+    command = "show " + " ".join(args.words)
+    if not args.json:
+        # Lines are printed as the device sends them rather than after the whole output arrives
+        engine.stream(command, sys.stdout.write)
+        sys.stdout.flush()
+        return 0
+    output = engine.show(command)
+
+    import json
+    import ios_parsers
+    parsers = {
+        "show ip interface brief": ios_parsers.parse_ip_interface_brief,
+        "show vlan brief": ios_parsers.parse_vlan_brief,
+        "show interfaces status": ios_parsers.parse_interfaces_status,
+        "show interfaces counters": ios_parsers.parse_interfaces_counters,
+        "show interfaces description": ios_parsers.parse_interfaces_description,
+        "show mac address-table": ios_parsers.parse_mac_address_table,
+    }
+    if command not in parsers:
+        raise ValueError(f"No parser for '{command}'; drop --json for raw output")
+    print(json.dumps([record._asdict() for record in parsers[command](output)], indent=2))
+    return 0
+
+
+def run_snapshot_take(engine, args):
+    from config_snapshots import SnapshotStore
+    digest, stored = engine.capture_config(SnapshotStore(args.directory))
+    print(f"{args.host}: {digest[:12]} {'stored' if stored else 'unchanged, already stored'}")
+    return 0
+
+
+def run_snapshot_offline(args):
+    # Listing and diffing only read the local store, so no device connection is made
+    import time
+    from config_snapshots import SnapshotStore, format_diff, format_store_stats
+    store = SnapshotStore(args.directory)
+    if args.snapshot_command == "list":
+        for entry in store.history(args.for_host):
+            taken = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["taken"]))
+            print(f"{taken}  {entry['hash'][:12]}  {entry['host']}")
+        print(format_store_stats(store.stats()))
+        return 0
+    sys.stdout.write(format_diff(store.diff(args.old, args.new), args.old, args.new))
+    return 0
+
+
+def run_push_config(engine, args):
+    from config_push import TftpServer, TftpTransfer, ScpTransfer, default_tftp_port
+    from config_snapshots import format_diff
+    template = None
+    if args.template:
+        with open(args.template, 'r') as f:
+            template = f.read()
+    server = None
+    if args.dry_run:
+        transfer = None
+    elif args.via == "scp":
+        transfer_function = None
+        if args.fake:
+            from fake_device import fake_file_transfer as transfer_function
+        transfer = ScpTransfer(transfer_function)
+    else:
+        # The fake device can pull from any port; a real one only from 69
+        server = TftpServer("127.0.0.1", 0) if args.fake else TftpServer(port=default_tftp_port)
+        transfer = TftpTransfer(server.start(), "127.0.0.1" if args.fake else args.tftp_address)
+    try:
+        changes, output = engine.push_config_file(transfer, template, replace=not args.merge, dry_run=args.dry_run,
+                                                  save=not args.no_save)
+    finally:
+        if server is not None:
+            server.stop()
+    if args.dry_run:
+        sys.stdout.write(format_diff(changes, "running-config", args.template or "compiled config"))
+    elif changes:
+        print(output)
+        print(f"{len(changes)} sections changed.")
+    else:
+        print("Device already matches.")
+    return 0
+
+
+def run_counters_collect(engine, args):
+    import time
+    from counter_store import CounterStore, read_counters
+    store = CounterStore(args.directory)
+    try:
+        counters, errors, speeds = read_counters(engine.require_connection())
+        ports = store.record(args.host, time.time(), counters, errors, speeds)
+    finally:
+        store.close()
+    # The first sample of a host only sets the baseline for the next one
+    print(f"{args.host}: {ports} ports recorded" if ports else f"{args.host}: baseline stored, rates start with the next sample")
+    return 0
+
+
+def run_counters_report(args):
+    import time
+    from counter_store import CounterStore, format_report
+    store = CounterStore(args.directory)
+    end = time.time()
+    try:
+        sys.stdout.write(format_report(store, end - args.hours * 3600, end, args.top, args.for_host))
+    finally:
+        store.close()
+    return 0
+
+
+def write_metrics(engine, args):
+    if args.metrics_file:
+        if args.metrics_file.endswith(".json"):
+            engine.metrics.write_json(args.metrics_file)
+        else:
+            engine.metrics.write_prometheus(args.metrics_file)
+    if args.stats:
+        from device_metrics import format_seconds
+        for row in engine.metrics.rows():
+            print(f"{row['method']:<16} {row['command']:<32} {row['count']:>4}x  mean {format_seconds(row['mean'])}",
+                  file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "gui":
+        import Cisco_Interface_Manager
+        Cisco_Interface_Manager.main()
+        return 0
+    if args.command == "snapshot" and args.snapshot_command != "take":
+        try:
+            return run_snapshot_offline(args)
+        except Exception as e:
+            print(f"cisco_cli: {e}", file=sys.stderr)
+            return 1
+    if args.command == "counters" and args.counters_command == "report":
+        try:
+            return run_counters_report(args)
+        except Exception as e:
+            print(f"cisco_cli: {e}", file=sys.stderr)
+            return 1
+    if not args.host:
+        print("cisco_cli: --host is required", file=sys.stderr)
+        return 2
+
+    from device_engine import DeviceEngine
+    connect_handler = None
+    if args.fake:
+        from fake_device import fake_connect_handler
+        connect_handler = fake_connect_handler()
+    inventory_cache = None
+    from inventory_cache import inventory_cache_dir
+    if os.path.isdir(inventory_cache_dir):
+        # Interface selections resolve from the GUI's last known inventory instead of two extra show commands
+        from inventory_cache import InventoryCache
+        inventory_cache = InventoryCache()
+    engine = DeviceEngine(connect_handler=connect_handler, inventory_cache=inventory_cache)
+    handlers = {
+        "connect": run_connect,
+        "vlan": run_vlan_create,
+        "port": run_port_set,
+        "show": run_show,
+        "snapshot": run_snapshot_take,
+        "push-config": run_push_config,
+        "counters": run_counters_collect,
+    }
+    try:
+        connect(engine, args)
+        return handlers[args.command](engine, args) or 0
+    except Exception as e:
+        print(f"cisco_cli: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.close()
+        write_metrics(engine, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
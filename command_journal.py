@@ -0,0 +1,120 @@
+import json
+import os
+import re
+
+from config_replay import compact_history, desired_commands
+
+journal_dir = "running_config"
+legacy_config_file = "running_config.json"
+
+
+class CommandJournal:
+    def __init__(self, host, directory=journal_dir, compact_every=5000):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', host) or "default"
+        os.makedirs(directory, exist_ok=True)
+        self.journal_path = os.path.join(directory, f"{name}.jsonl")
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot.json")
+        self.compact_every = compact_every
+        self.entries_since_snapshot = 0
+        self.file = None
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.journal_path, 'a')
+        return self.file
+
+    def append(self, commands, commit=True):
+        f = self._open()
+        f.write(json.dumps(commands, separators=(',', ':')) + "\n")
+        if commit:
+            self.commit()
+        self.entries_since_snapshot += 1
+        if self.compact_every and self.entries_since_snapshot >= self.compact_every:
+            self.compact()
+
+    def commit(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is not None:
+            self.commit()
+            self.file.close()
+            self.file = None
+
+    def _read_snapshot(self):
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                return json.load(f)
+        return []
+
+    def _read_journal(self):
+        entries = []
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A crash mid-append leaves a truncated last line; skip it
+                    continue
+        return entries
+
+    def load(self):
+        entries = self._read_journal()
+        self.entries_since_snapshot = len(entries)
+        return self._read_snapshot() + entries
+
+    def tail(self, count=10):
+        if count <= 0 or not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(65536, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        entries = []
+        for line in data.splitlines()[-count:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def compact(self):
+        self.commit()
+        state = compact_history(self.load())
+        commands = desired_commands(state)
+        snapshot = [commands] if commands else []
+
+        # Write the snapshot atomically before truncating the journal, so a crash
+        # in between only leaves entries that replay idempotently on top of it
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        open(self.journal_path, 'w').close()
+        self.entries_since_snapshot = 0
+
+    def import_legacy(self, path=legacy_config_file):
+        # One-time migration of the old full-rewrite running_config.json
+        if not os.path.exists(path) or os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path):
+            return 0
+        with open(path, 'r') as f:
+            history = json.load(f)
+        for commands in history:
+            self.append(commands, commit=False)
+        self.commit()
+        return len(history)
@@ -0,0 +1,209 @@
+import os
+import re
+import socket
+import struct
+import tempfile
+import threading
+
+# IOS always pulls from port 69, which needs root (or CAP_NET_BIND_SERVICE) on the PC
+default_tftp_port = 69
+default_file_system = "flash:"
+
+_opcodes = {"RRQ": 1, "WRQ": 2, "DATA": 3, "ACK": 4, "ERROR": 5, "OACK": 6}
+# IOS prints errors as "%..." lines (warnings such as the overwrite notice excepted) or "% Invalid input ..."
+_error_line = re.compile(r"^\s*%(?!\s*Warning).*$|^.*Invalid input.*$|^\s*Rollback aborted.*$", re.MULTILINE)
+_overwrite_confirm = re.compile(r"over\s*write\?\s*\[confirm\]\s*$")
+
+
+class PushError(Exception):
+    pass
+
+
+def config_file_name(digest):
+    # Named by content, so a file left behind by an interrupted push holds the same config when it is overwritten
+    return f"cim-{digest[:12]}.cfg"
+
+
+def local_address_for(host, port=22):
+    # The PC's address on the route to the device, which the device needs for tftp:// URLs
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect((socket.gethostbyname(host), port))
+        return probe.getsockname()[0]
+    finally:
+        probe.close()
+
+
+class TftpServer:
+    # Read-only TFTP server (RFC 1350 with the blksize option, RFC 2348) serving published files from memory.
+    # Each transfer runs on its own socket and thread, so several devices can pull at once.
+    def __init__(self, host="0.0.0.0", port=default_tftp_port, timeout=2.0, retries=5):
+        self.timeout = timeout
+        self.retries = retries
+        self.files = {}
+        self.lock = threading.Lock()
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.2)
+        self.address = self.socket.getsockname()
+        self.sent = 0
+        self.running = False
+        self.thread = None
+
+    def publish(self, name, data):
+        with self.lock:
+            self.files[name] = data
+
+    def withdraw(self, name):
+        with self.lock:
+            self.files.pop(name, None)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.socket.close()
+
+    def _run(self):
+        while self.running:
+            try:
+                packet, client = self.socket.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(packet) < 4 or struct.unpack("!H", packet[:2])[0] != _opcodes["RRQ"]:
+                continue
+            fields = packet[2:].split(b"\0")
+            name = fields[0].decode('ascii', 'replace')
+            options = {fields[i].decode('ascii', 'replace').lower(): fields[i + 1].decode('ascii', 'replace')
+                       for i in range(2, len(fields) - 1, 2)}
+            threading.Thread(target=self._send, args=(name, options, client), daemon=True).start()
+
+    def _send(self, name, options, client):
+        with self.lock:
+            data = self.files.get(name)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.settimeout(self.timeout)
+        try:
+            if data is None:
+                sender.sendto(struct.pack("!HH", _opcodes["ERROR"], 1) + b"File not found\0", client)
+                return
+            block_size = 512
+            if options.get("blksize", "").isdigit():
+                block_size = max(8, min(65464, int(options["blksize"])))
+                if not self._exchange(sender, struct.pack("!H", _opcodes["OACK"]) + f"blksize\0{block_size}\0".encode(),
+                                      client, 0):
+                    return
+            # A final block shorter than block_size (possibly empty) ends the transfer
+            for block in range(len(data) // block_size + 1):
+                chunk = data[block * block_size:(block + 1) * block_size]
+                if not self._exchange(sender, struct.pack("!HH", _opcodes["DATA"], (block + 1) & 0xffff) + chunk,
+                                      client, (block + 1) & 0xffff):
+                    return
+            self.sent += 1
+        finally:
+            sender.close()
+
+    def _exchange(self, sender, packet, client, block):
+        # Sends packet until the matching ACK arrives; False when the client gave up or went away
+        for _ in range(self.retries):
+            sender.sendto(packet, client)
+            try:
+                while True:
+                    reply, _ = sender.recvfrom(516)
+                    opcode, number = struct.unpack("!HH", reply[:4])
+                    if opcode == _opcodes["ACK"] and number == block:
+                        return True
+                    if opcode == _opcodes["ERROR"]:
+                        return False
+            except socket.timeout:
+                continue
+        return False
+
+
+class TftpTransfer:
+    # The device pulls the file from our TftpServer; address is the PC as the device sees it
+    def __init__(self, server, address=None):
+        self.server = server
+        self.address = address
+
+    def send(self, connection, name, data, file_system, prompt=None, read_timeout=120):
+        self.server.publish(name, data)
+        address = self.address or local_address_for(connection.host)
+        port = self.server.address[1]
+        # Ports other than 69 are only understood by the fake device
+        url = f"tftp://{address}/{name}" if port == default_tftp_port else f"tftp://{address}:{port}/{name}"
+        done = prompt or r"#\s*$"
+        try:
+            output = connection.send_command(f"copy {url} {file_system}{name}", expect_string=r"\?\s*$",
+                                             read_timeout=read_timeout)
+            output += connection.send_command("", expect_string=rf"{done}|\[confirm\]\s*$",
+                                              read_timeout=read_timeout)
+            if _overwrite_confirm.search(output):
+                # A file of that name was left on flash (e.g. by an interrupted push); its content is the same
+                output += connection.send_command("", expect_string=done, read_timeout=read_timeout)
+        finally:
+            self.server.withdraw(name)
+        if _error_line.search(output):
+            raise PushError(f"Transfer failed: {_error_line.search(output).group(0).strip()}")
+        return output
+
+
+class ScpTransfer:
+    # The PC copies the file to the device's SCP server ("ip scp server enable") with Netmiko's file_transfer,
+    # which also checks the MD5 on the device. file_transfer can be replaced (the fake device has a stand-in).
+    def __init__(self, file_transfer=None, directory=None):
+        self.file_transfer = file_transfer
+        self.directory = directory
+
+    def send(self, connection, name, data, file_system, prompt=None, read_timeout=120):
+        file_transfer = self.file_transfer
+        if file_transfer is None:
+            from netmiko import file_transfer
+        fd, path = tempfile.mkstemp(suffix=".cfg", dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            result = file_transfer(connection, source_file=path, dest_file=name, file_system=file_system,
+                                   direction="put", overwrite_file=True)
+        finally:
+            os.remove(path)
+        if not result.get("file_verified", result.get("file_exists")):
+            raise PushError(f"Transfer of {name} could not be verified on the device")
+        return f"{name}: {'transferred' if result.get('file_transferred') else 'already on the device'}"
+
+
+def delete_config_file(connection, name, file_system=default_file_system, prompt=None, read_timeout=60):
+    return connection.send_command(f"delete /force {file_system}{name}", expect_string=prompt or r"#\s*$",
+                                   read_timeout=read_timeout)
+
+
+def apply_config_file(connection, name, file_system=default_file_system, replace=True, prompt=None, read_timeout=300,
+                      delete=True):
+    # "configure replace" makes the file the whole running config; merge copies it over the running config like
+    # pasting it in config mode. Both run on the device in one command instead of a round trip per line.
+    # The file is deleted afterwards, even when the apply failed, so staged files do not fill flash.
+    path = f"{file_system}{name}"
+    try:
+        if replace:
+            output = connection.send_command(f"configure replace {path} force", expect_string=prompt or r"#\s*$",
+                                             read_timeout=read_timeout)
+        else:
+            output = connection.send_command(f"copy {path} running-config", expect_string=r"\?\s*$",
+                                             read_timeout=read_timeout)
+            output += connection.send_command("", expect_string=prompt or r"#\s*$", read_timeout=read_timeout)
+    finally:
+        if delete:
+            delete_config_file(connection, name, file_system, prompt)
+    errors = [line.strip() for line in _error_line.findall(output) if line.strip()]
+    if errors:
+        raise PushError(f"{'configure replace' if replace else 'copy'} reported: {'; '.join(errors[:3])}")
+    return output
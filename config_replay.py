@@ -0,0 +1,229 @@
+import re
+from collections import OrderedDict
+
+from config_snapshots import normalize_config, parse_sections
+from ios_parsers import parse_vlan_brief
+from vlan_bulk import parse_vlan_spec, range_commands
+from interface_range import expand_range_spec
+
+
+def _line_key(line):
+    # Lines sharing a key overwrite each other, so only the last one survives compaction
+    words = line.split()
+    if words[0] == "no":
+        words = words[1:]
+    if words == ["shutdown"]:
+        return "shutdown"
+    if words[:3] == ["switchport", "port-security", "mac-address"]:
+        # One slot per address, shared by its "no" form
+        return " ".join(words)
+    if words[:2] == ["switchport", "port-security"] and len(words) > 3 and words[2] == "aging":
+        return " ".join(words[:4])
+    return " ".join(words[:-1]) if len(words) > 1 else words[0]
+
+
+def _negation_key(words):
+    # "no vlan 100" and "no interface Vlan100" name one object each; other global lines share a slot like settings
+    if words[0] in ("vlan", "interface"):
+        return " ".join(words)
+    return _line_key(" ".join(words))
+
+
+def compact_history(history):
+    # "negations" holds top-level "no ..." lines (e.g. "no vlan 100", "no cdp run") by key, so a deleted VLAN
+    # is not recreated on replay; the positive form of the same line cancels it again
+    state = {"vlans": {}, "interfaces": {}, "negations": {}}
+    for command_set in history:
+        context = None
+        for line in command_set:
+            line = line.strip()
+            if not line or line == "write memory":
+                continue
+            words = line.split()
+            if words[0] == "no" and len(words) > 1 and (context is None or words[1] in ("vlan", "interface")):
+                context = None
+                if words[1] == "vlan" and len(words) == 3:
+                    for vlan in parse_vlan_spec(words[2]):
+                        state["vlans"].pop(str(vlan), None)
+                        state["negations"][f"vlan {vlan}"] = f"no vlan {vlan}"
+                    continue
+                if words[1] == "interface":
+                    state["interfaces"].pop(" ".join(words[2:]), None)
+                key = _negation_key(words[1:])
+                state["negations"].pop(key, None)
+                state["negations"][key] = line
+            elif words[0] == "vlan" and len(words) == 2 and words[1].isdigit():
+                context = ("vlan", words[1])
+                state["vlans"].setdefault(words[1], None)
+                state["negations"].pop(f"vlan {words[1]}", None)
+            elif words[0] == "vlan" and len(words) == 2:
+                # Range syntax such as "vlan 100-199,300"
+                context = None
+                for vlan in parse_vlan_spec(words[1]):
+                    state["vlans"].setdefault(str(vlan), None)
+                    state["negations"].pop(f"vlan {vlan}", None)
+            elif words[:2] == ["interface", "range"]:
+                # Settings under "interface range" apply to every member interface
+                context = ("interface", expand_range_spec(" ".join(words[2:])))
+                for interface in context[1]:
+                    state["interfaces"].setdefault(interface, {})
+            elif words[0] == "interface":
+                context = ("interface", [" ".join(words[1:])])
+                state["interfaces"].setdefault(context[1][0], {})
+                state["negations"].pop(line, None)
+            elif context and context[0] == "vlan" and words[0] == "name":
+                state["vlans"][context[1]] = " ".join(words[1:])
+            elif context and context[0] == "interface":
+                key = _line_key(line)
+                for interface in context[1]:
+                    settings = state["interfaces"][interface]
+                    settings.pop(key, None)
+                    settings[key] = line
+            elif context is None:
+                state["negations"].pop(_negation_key(words), None)
+    return state
+
+
+def desired_commands(state):
+    commands = range_commands(int(vlan) for vlan, name in state["vlans"].items() if not name)
+    for vlan, name in state["vlans"].items():
+        if name:
+            commands.extend([f"vlan {vlan}", f"name {name}"])
+    commands.extend(state.get("negations", {}).values())
+    for interface, settings in state["interfaces"].items():
+        if settings:
+            commands.append(f"interface {interface}")
+            commands.extend(settings.values())
+    return commands
+
+
+def parse_running_config(running_config):
+    sections = {}
+    current = None
+    for line in running_config.splitlines():
+        if not line.strip() or line.startswith("!"):
+            current = None
+            continue
+        if line[0] != " ":
+            current = line.strip()
+            sections.setdefault(current, set())
+        elif current is not None:
+            sections[current].add(line.strip())
+    return sections
+
+
+def parse_vlan_names(vlan_brief):
+    return {str(vlan.vlan_id): vlan.name for vlan in parse_vlan_brief(vlan_brief)}
+
+
+def _is_present(line, children):
+    if line in children:
+        return True
+    words = line.split()
+    if line == "no shutdown":
+        return "shutdown" not in children
+    if words[0] == "no":
+        return " ".join(words[1:]) not in children
+    # IOS hides defaults such as "speed auto" from the running-config
+    if len(words) == 2 and words[1] == "auto" and words[0] in ("speed", "duplex"):
+        return not any(child.split()[0] == words[0] for child in children)
+    return False
+
+
+def missing_commands(state, running_config, vlan_brief=""):
+    sections = parse_running_config(running_config)
+    existing_vlans = parse_vlan_names(vlan_brief)
+    commands = []
+    unnamed = []
+    skipped = 0
+
+    for vlan, name in state["vlans"].items():
+        section = sections.get(f"vlan {vlan}")
+        if section is not None:
+            present = not name or f"name {name}" in section
+        else:
+            present = vlan in existing_vlans and (not name or existing_vlans[vlan] == name)
+        if present:
+            skipped += 1 + (1 if name else 0)
+        elif name:
+            commands.extend([f"vlan {vlan}", f"name {name}"])
+        else:
+            unnamed.append(int(vlan))
+    commands = range_commands(unnamed) + commands
+
+    for key, line in state.get("negations", {}).items():
+        if line in sections:
+            present = True
+        elif key.startswith("vlan "):
+            present = key not in sections and key[5:] not in existing_vlans
+        else:
+            present = line[3:] not in sections
+        if present:
+            skipped += 1
+        else:
+            commands.append(line)
+
+    for interface, settings in state["interfaces"].items():
+        children = sections.get(f"interface {interface}", set())
+        missing = []
+        for line in settings.values():
+            if _is_present(line, children):
+                skipped += 1
+            else:
+                missing.append(line)
+        if missing:
+            commands.append(f"interface {interface}")
+            commands.extend(missing)
+
+    return commands, skipped
+
+
+def compile_config(running_config, state):
+    # The running config with the desired state applied, as one complete file for "configure replace".
+    # Setting lines replace the running line with the same key; "no" lines only remove it.
+    sections = parse_sections(normalize_config(running_config))
+    sections.pop("end", None)
+    negated = OrderedDict()
+    for key, line in state.get("negations", {}).items():
+        # "no vlan 100" and "no interface Vlan100" just leave the section out; other negations replace the line
+        sections.pop(line[3:], None)
+        if not key.startswith(("vlan ", "interface ")):
+            sections.pop(line, None)
+            negated[line] = ()
+    vlans = OrderedDict()
+    for vlan, name in state["vlans"].items():
+        header = f"vlan {vlan}"
+        children = [child for child in sections.pop(header, ()) if not child.startswith("name ")]
+        if name:
+            children.insert(0, f"name {name}")
+        vlans[header] = tuple(children)
+
+    compiled = OrderedDict()
+    for header, children in sections.items():
+        # VLANs go before the first interface, where IOS lists them
+        if vlans and header.startswith("interface "):
+            compiled.update(vlans)
+            vlans = None
+        compiled[header] = children
+    if vlans:
+        compiled.update(vlans)
+    compiled.update(negated)
+
+    for interface, settings in state["interfaces"].items():
+        header = f"interface {interface}"
+        children = list(compiled.get(header, ()))
+        for line in settings.values():
+            key = _line_key(line)
+            children = [child for child in children if child.startswith(" ") or _line_key(child) != key]
+            if line.split()[0] != "no":
+                children.append(line)
+        compiled[header] = tuple(children)
+
+    lines = []
+    for header, children in compiled.items():
+        lines.append(re.sub(r" #\d+$", "", header))
+        # Banner text is written back unindented, as parse_sections() read it
+        lines.extend(children if header.startswith("banner ") else (f" {child}" for child in children))
+        lines.append("!")
+    lines.append("end")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fleet import build_device
+
+snapshot_dir = "snapshots"
+
+# Lines IOS rewrites without any configuration change; dropped so identical configs hash the same
+_volatile_line = re.compile(
+    r"^(Building configuration\.\.\.|Current configuration : \d+ bytes|"
+    r"! (Last configuration change|NVRAM config last updated|No configuration change since).*|"
+    r"ntp clock-period \d+)$")
+# "banner motd ^C" opens a banner whose text runs, unindented, up to the next ^C (or other delimiter character)
+_banner_start = re.compile(r"^banner \S+ (\^C|\S)(.*)$")
+
+
+def normalize_config(running_config):
+    lines = [line.rstrip() for line in running_config.replace("\r", "").splitlines()]
+    lines = [line for line in lines if not _volatile_line.match(line.strip())]
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines) + "\n"
+
+
+def config_hash(config):
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+
+def parse_sections(config):
+    # {top-level line: (child lines in order)}; children keep their nesting as relative indentation.
+    # Repeated top-level lines (e.g. several "banner" blocks) get a numbered key so none are lost.
+    # A banner's text lines, up to and including the closing delimiter, are its children exactly as written.
+    sections = OrderedDict()
+    header = None
+    children = []
+    delimiter = None
+    for line in config.splitlines():
+        if delimiter is not None:
+            children.append(line)
+            if delimiter in line:
+                delimiter = None
+            continue
+        if not line.strip() or line.strip() == "!":
+            continue
+        if line[0] != " ":
+            if header is not None:
+                sections[header] = tuple(children)
+            header = line
+            if header in sections:
+                count = 2
+                while f"{line} #{count}" in sections:
+                    count += 1
+                header = f"{line} #{count}"
+            children = []
+            match = _banner_start.match(line)
+            if match and match.group(1) not in match.group(2):
+                delimiter = match.group(1)
+        elif header is not None:
+            children.append(line[1:])
+    if header is not None:
+        sections[header] = tuple(children)
+    return sections
+
+
+def _ordered_difference(left, right):
+    right = set(right)
+    return [line for line in left if line not in right]
+
+
+def diff_sections(old, new):
+    # Returns [(header, removed lines, added lines, kind)] with kind "added", "removed" or "changed"
+    changes = []
+    for header, children in old.items():
+        if header not in new:
+            changes.append((header, list(children), [], "removed"))
+        elif new[header] != children:
+            removed = _ordered_difference(children, new[header])
+            added = _ordered_difference(new[header], children)
+            if removed or added:
+                changes.append((header, removed, added, "changed"))
+            else:
+                # Same lines in a different order, which matters for ACLs and route-maps
+                changes.append((header, list(children), list(new[header]), "changed"))
+    for header, children in new.items():
+        if header not in old:
+            changes.append((header, [], list(children), "added"))
+    return changes
+
+
+def format_diff(changes, old_label="old", new_label="new"):
+    if not changes:
+        return f"No differences between {old_label} and {new_label}.\n"
+    lines = [f"--- {old_label}", f"+++ {new_label}"]
+    for header, removed, added, kind in changes:
+        prefix = {"added": "+", "removed": "-", "changed": " "}[kind]
+        lines.append(f"{prefix}{header}")
+        lines.extend(f"- {line}" for line in removed)
+        lines.extend(f"+ {line}" for line in added)
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotStore:
+    # Configs are stored once per distinct content under objects/<hash>, zlib compressed;
+    # index.jsonl records which host had which hash when, appended one line per capture
+    def __init__(self, directory=snapshot_dir, cache_size=256):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_path = os.path.join(directory, "index.jsonl")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.cache_size = cache_size
+        self.section_cache = OrderedDict()
+        self.entries = []
+        self.by_host = {}
+        self.hashes = set()
+        for entry in self._load_index():
+            self._add_entry(entry)
+
+    def _load_index(self):
+        entries = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue  # A torn line from an interrupted write; later appends start on a new line
+        return entries
+
+    def _add_entry(self, entry):
+        self.entries.append(entry)
+        self.by_host.setdefault(entry["host"], []).append(entry)
+        self.hashes.add(entry["hash"])
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def capture(self, host, running_config, taken=None):
+        # Returns (hash, stored) where stored is False when identical content already existed
+        config = normalize_config(running_config)
+        digest = config_hash(config)
+        path = self._object_path(digest)
+        entry = {"host": host, "hash": digest, "taken": taken or time.time(), "size": len(config)}
+        with self.lock:
+            stored = not os.path.exists(path)
+            if stored:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(zlib.compress(config.encode('utf-8'), 6))
+                os.replace(temp_path, path)
+            with open(self.index_path, 'ab+') as f:
+                line = json.dumps(entry, separators=(',', ':')).encode('utf-8') + b"\n"
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+            self._add_entry(entry)
+        return digest, stored
+
+    def load(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read()).decode('utf-8')
+
+    def sections(self, digest):
+        # Parsed sections are cached by hash, which is safe because the content behind a hash never changes
+        with self.lock:
+            sections = self.section_cache.get(digest)
+            if sections is not None:
+                self.section_cache.move_to_end(digest)
+                return sections
+        sections = parse_sections(self.load(digest))
+        with self.lock:
+            self.section_cache[digest] = sections
+            while len(self.section_cache) > self.cache_size:
+                self.section_cache.popitem(last=False)
+        return sections
+
+    def history(self, host=None):
+        with self.lock:
+            return list(self.entries if host is None else self.by_host.get(host, []))
+
+    def hosts(self):
+        with self.lock:
+            return sorted(self.by_host)
+
+    def resolve(self, ref):
+        # "host" is its latest snapshot, "host~2" two captures earlier, otherwise a hash or unique hash prefix
+        if ref in self.hashes:
+            return ref
+        host, _, back = ref.partition("~")
+        history = self.history(host)
+        if history:
+            index = len(history) - 1 - (int(back) if back else 0)
+            if index < 0:
+                raise ValueError(f"{host} has only {len(history)} snapshots")
+            return history[index]["hash"]
+        with self.lock:
+            matches = {digest for digest in self.hashes if digest.startswith(ref)}
+        if len(matches) != 1:
+            raise ValueError(f"{'Ambiguous' if matches else 'Unknown'} snapshot reference: {ref}")
+        return matches.pop()
+
+    def diff(self, old_ref, new_ref):
+        old_hash, new_hash = self.resolve(old_ref), self.resolve(new_ref)
+        if old_hash == new_hash:
+            return []
+        return diff_sections(self.sections(old_hash), self.sections(new_hash))
+
+    def stats(self):
+        objects = 0
+        stored_bytes = 0
+        for directory, _, files in os.walk(self.objects_dir):
+            for name in files:
+                objects += 1
+                stored_bytes += os.path.getsize(os.path.join(directory, name))
+        with self.lock:
+            raw_bytes = sum(entry["size"] for entry in self.entries)
+            snapshots = len(self.entries)
+        return {"snapshots": snapshots, "objects": objects, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+
+
+def format_store_stats(stats):
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+    return (f"{stats['snapshots']} snapshots, {stats['objects']} distinct configs, "
+            f"{stats['stored_bytes'] / 1024:.0f} KB on disk ({ratio:.1f}x smaller than raw)")
+
+
+def capture_on_host(data, store, connect_handler=None):
+    if connect_handler is None:
+        from netmiko import ConnectHandler
+        connect_handler = ConnectHandler
+
+    start = time.time()
+    result = {"host": data["host"], "ok": False, "hash": None, "stored": False, "error": None, "elapsed": 0.0}
+    net_connect = None
+    try:
+        net_connect = connect_handler(**build_device(data))
+        net_connect.enable()
+        result["hash"], result["stored"] = store.capture(data["host"], net_connect.send_command("show running-config"))
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if net_connect is not None:
+            try:
+                net_connect.disconnect()
+            except Exception:
+                pass
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def capture_fleet(hosts, store, workers=10, on_result=None, connect_handler=None):
+    results = []
+    if not hosts:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as pool:
+        futures = [pool.submit(capture_on_host, data, store, connect_handler) for data in hosts]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
@@ -0,0 +1,50 @@
+class ConfigTransaction:
+    def __init__(self):
+        self.pending = []
+
+    def stage(self, commands):
+        commands = [cmd for cmd in commands if cmd and cmd != "write memory"]
+        if commands:
+            self.pending.append(commands)
+
+    def discard(self):
+        self.pending = []
+
+    def detach(self):
+        # Hand the staged edits to a separate transaction so new edits can be staged meanwhile
+        detached = ConfigTransaction()
+        detached.pending = self.pending
+        self.pending = []
+        return detached
+
+    def restore(self, other):
+        self.pending = other.pending + self.pending
+
+    def merged(self):
+        # Consecutive fragments for the same interface share one "interface" line. A range push can hold several
+        # "interface range" blocks, so the context a fragment leaves behind is its last interface line.
+        merged = []
+        current_context = None
+        for fragment in self.pending:
+            header = fragment[0]
+            if header.startswith("interface ") and header == current_context:
+                merged.extend(fragment[1:])
+            else:
+                merged.extend(fragment)
+            headers = [line for line in fragment if line.startswith("interface ")]
+            current_context = headers[-1] if header.startswith("interface ") else None
+        return merged
+
+    def commit(self, net_connect, save=True, **kwargs):
+        # kwargs go to send_config_set (read_timeout, cmd_verify)
+        commands = self.merged()
+        if not commands:
+            return [], ""
+        output = net_connect.send_config_set(commands, **kwargs)
+        if save:
+            output += "\n" + net_connect.save_config()
+        self.pending = []
+        return commands, output
+
+    def __len__(self):
+        return len(self.pending)
@@ -0,0 +1,226 @@
+import re
+from collections import namedtuple
+
+from interface_range import expand_range_spec, short_interface_name
+from vlan_bulk import parse_vlan_spec
+
+ValidationProblem = namedtuple("ValidationProblem", "line command message")
+
+reserved_vlans = range(1002, 1006)
+max_vlan_name_length = 32
+
+# Interface-mode commands that are rejected by IOS outside an interface block
+interface_keywords = {"switchport", "speed", "duplex", "shutdown", "storm-control", "channel-group"}
+# Keywords that are interface commands only with one of these second words: "cdp enable" is, "cdp run",
+# "spanning-tree mode rapid-pvst" and "power redundancy-mode combined" are global
+interface_subcommands = {
+    "spanning-tree": {"portfast", "bpduguard", "bpdufilter", "guard", "link-type", "cost", "port-priority"},
+    "cdp": {"enable"},
+    "lldp": {"transmit", "receive", "med-tlv-select"},
+    "power": {"inline"},
+}
+# Also valid under an interface, so an unindented one does not end the interface block
+interface_shared_keywords = {"description", "ip", "ipv6", "mtu", "bandwidth", "load-interval", "logging", "snmp",
+                             "service-policy", "channel-protocol", "udld", "dot1x", "mab", "authentication",
+                             "access-session", "device-tracking", "mls", "auto", "qos", "srr-queue", "priority-queue",
+                             "flowcontrol", "carrier-delay", "keepalive", "media-type", "negotiation", "macro"}
+# Subcommands of a "vlan" block
+vlan_keywords = {"name", "state", "shutdown", "remote-span", "private-vlan", "media", "mtu"}
+# Global commands that start with "vlan" but take no VLAN ID, such as "vlan internal allocation policy ascending"
+vlan_global_keywords = {"internal", "dot1q", "filter", "access-map", "configuration", "accounting", "access-log",
+                        "group", "ifdescr"}
+
+speed_values = {"10", "100", "1000", "2500", "5000", "10000", "auto"}
+duplex_values = {"auto", "full", "half"}
+mode_values = {"access", "trunk", "dynamic"}
+encapsulation_values = {"dot1q", "isl", "negotiate"}
+violation_values = {"protect", "restrict", "shutdown"}
+aging_type_values = {"absolute", "inactivity"}
+
+_ios_mac = re.compile(r"^[0-9a-fA-F]{1,4}\.[0-9a-fA-F]{1,4}\.[0-9a-fA-F]{1,4}$")
+
+
+class ValidationError(ValueError):
+    # Raised before anything is sent; problems holds every ValidationProblem found
+    def __init__(self, problems):
+        self.problems = problems
+        details = "; ".join(f"line {p.line} '{p.command}': {p.message}" for p in problems[:3])
+        more = f" (+{len(problems) - 3} more)" if len(problems) > 3 else ""
+        super().__init__(f"Not sent, {len(problems)} problem{'s' if len(problems) != 1 else ''}: {details}{more}")
+
+
+def interface_key(name):
+    # "GigabitEthernet1/0/1", "Gi1/0/1" and "gi 1/0/1" compare equal
+    return short_interface_name(name.replace(" ", "")).lower()
+
+
+def _vlan_number(text):
+    if not text.isdigit() or not 1 <= int(text) <= 4094:
+        return None, f"VLAN must be a number between 1 and 4094, not '{text}'"
+    return int(text), None
+
+
+def _check_vlan_exists(vlan, vlans, created):
+    if vlans is not None and vlan not in vlans and vlan not in created:
+        return f"VLAN {vlan} does not exist on the device; create it first"
+    return None
+
+
+def _check_port_security(words):
+    # words start after "switchport port-security"
+    if not words:
+        return None
+    option, values = words[0], words[1:]
+    if option == "maximum":
+        if not values or not values[0].isdigit() or not 1 <= int(values[0]) <= 8192:
+            return "port-security maximum must be a number between 1 and 8192"
+    elif option == "violation":
+        if not values or values[0] not in violation_values:
+            return f"violation must be one of {', '.join(sorted(violation_values))}"
+    elif option == "mac-address":
+        values = values[1:] if values and values[0] == "sticky" else values
+        if values and not _ios_mac.match(values[0]):
+            digits = re.sub(r"[^0-9a-fA-F]", "", values[0])
+            hint = f" (e.g. {digits[0:4]}.{digits[4:8]}.{digits[8:12]})" if len(digits) == 12 else ""
+            return f"MAC address must be written as xxxx.xxxx.xxxx{hint}"
+        if not values and words[1:2] != ["sticky"]:
+            return "MAC address missing"
+    elif option == "aging":
+        if values[:1] == ["time"]:
+            if len(values) < 2 or not values[1].isdigit() or not 1 <= int(values[1]) <= 1440:
+                return "aging time must be between 1 and 1440 minutes"
+        elif values[:1] == ["type"]:
+            if len(values) < 2 or values[1] not in aging_type_values:
+                return f"aging type must be one of {', '.join(sorted(aging_type_values))}"
+        else:
+            return "expected 'aging time' or 'aging type'"
+    return None
+
+
+def _check_switchport(words, vlans, created):
+    # words start after "switchport"
+    if not words:
+        return None
+    if words[0] == "mode":
+        if len(words) < 2 or words[1] not in mode_values:
+            return f"switchport mode must be one of {', '.join(sorted(mode_values))}"
+    elif words[0] == "access" and words[1:2] == ["vlan"]:
+        if len(words) < 3:
+            return "access VLAN missing"
+        vlan, error = _vlan_number(words[2])
+        if error:
+            return error
+        if vlan in reserved_vlans:
+            return f"VLAN {vlan} is reserved and cannot be used as an access VLAN"
+        return _check_vlan_exists(vlan, vlans, created)
+    elif words[0] == "trunk":
+        if words[1:2] == ["encapsulation"]:
+            if len(words) < 3 or words[2] not in encapsulation_values:
+                return f"encapsulation must be one of {', '.join(sorted(encapsulation_values))}"
+        elif words[1:3] == ["native", "vlan"]:
+            if len(words) < 4:
+                return "native VLAN missing"
+            vlan, error = _vlan_number(words[3])
+            return error or _check_vlan_exists(vlan, vlans, created)
+        elif words[1:3] == ["allowed", "vlan"]:
+            spec = words[3:]
+            if spec[:1] in (["add"], ["remove"], ["except"]):
+                spec = spec[1:]
+            elif spec in (["all"], ["none"]):
+                return None
+            if not spec:
+                return "allowed VLAN list missing"
+            try:
+                parse_vlan_spec(" ".join(spec))
+            except ValueError as e:
+                return f"bad allowed VLAN list: {e}"
+    elif words[0] == "port-security":
+        return _check_port_security(words[1:])
+    return None
+
+
+def interface_scope(words):
+    # "interface" for commands IOS only accepts under an interface, "shared" for commands that are also valid
+    # under an interface, None for the rest (global commands); words exclude a leading "no"
+    keyword = words[0]
+    if keyword in interface_keywords:
+        return "interface"
+    if keyword in interface_subcommands and len(words) > 1 and "default" not in words:
+        if words[1] in interface_subcommands[keyword]:
+            return "interface"
+        # Per-VLAN cost and port priority are set under the interface, priority and timers globally
+        if keyword == "spanning-tree" and words[1] == "vlan" and words[3:4] in (["cost"], ["port-priority"]):
+            return "interface"
+    if keyword in interface_shared_keywords:
+        return "shared"
+    return None
+
+
+def validate_commands(commands, interfaces=None, vlans=None):
+    # Checks a config set locally. With interfaces/vlans (the device inventory) unknown interfaces and
+    # missing VLANs are reported too; without them only syntax and value ranges are checked.
+    known = {interface_key(name) for name in interfaces} if interfaces else None
+    vlans = set(vlans) if vlans else None
+    created = set()
+    problems = []
+    context = None
+    for number, command in enumerate(commands, 1):
+        line = command.strip()
+        words = line.split()
+        if not words or line.startswith("!"):
+            continue
+        keyword = words[0]
+        error = None
+        if keyword in ("end", "exit"):
+            context = None
+        elif keyword == "interface":
+            context = "interface"
+            if len(words) < 2:
+                error = "interface name missing"
+            elif known is not None:
+                names = expand_range_spec(" ".join(words[2:])) if words[1] == "range" else ["".join(words[1:])]
+                unknown = [name for name in names if interface_key(name) not in known]
+                if unknown:
+                    error = f"no such interface on the device: {', '.join(unknown[:3])}"
+        elif keyword == "vlan" and len(words) > 1 and words[1] in vlan_global_keywords:
+            context = None
+        elif keyword == "vlan":
+            context = "vlan"
+            try:
+                if len(words) < 2 or not re.fullmatch(r"\d+(-\d+)?(,\d+(-\d+)?)*", words[1]):
+                    raise ValueError(f"VLAN IDs must be between 1 and 4094: '{' '.join(words[1:])}'")
+                ids = parse_vlan_spec(words[1])
+            except ValueError as e:
+                error = str(e)
+            else:
+                if any(vlan in reserved_vlans for vlan in ids):
+                    error = "VLANs 1002-1005 are reserved"
+                created.update(ids)
+        elif keyword == "name":
+            name = line[len("name"):].strip()
+            if context != "vlan":
+                error = "'name' is only valid under a vlan"
+            elif not name or len(name) > max_vlan_name_length or " " in name:
+                error = f"VLAN name must be 1-{max_vlan_name_length} characters without spaces"
+        else:
+            negated = keyword == "no"
+            target = words[1:] if negated and len(words) > 1 else words
+            scope = interface_scope(target)
+            if context == "vlan" and target[0] in vlan_keywords:
+                scope = "vlan"
+            elif scope is None and command == command.lstrip():
+                # An unindented global command ends the interface or vlan block
+                context = None
+            if scope == "interface" and context != "interface":
+                name = " ".join(target[:2]) if target[0] in interface_subcommands else target[0]
+                error = f"'{name}' is only valid under an interface"
+            elif not negated:
+                if keyword == "speed" and (len(words) < 2 or words[1] not in speed_values):
+                    error = f"speed must be one of {', '.join(sorted(speed_values))}"
+                elif keyword == "duplex" and (len(words) < 2 or words[1] not in duplex_values):
+                    error = f"duplex must be one of {', '.join(sorted(duplex_values))}"
+                elif keyword == "switchport":
+                    error = _check_switchport(words[1:], vlans, created)
+        if error:
+            problems.append(ValidationProblem(number, line, error))
+    return problems
@@ -0,0 +1,499 @@
+import calendar
+import json
+import math
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fleet import build_device
+from ios_parsers import parse_interfaces_counters, parse_interfaces_counters_errors, parse_interfaces_status
+from traffic_monitor import counter_delta, format_rate
+
+store_dir = "counter_store"
+# Rates in bits per second; errors per minute (input: align, FCS, receive, undersize; output: transmit, discards)
+fields = ("in_bps", "out_bps", "in_errors", "out_errors")
+# Samples further apart than this are not turned into a rate (the collector was stopped in between)
+max_sample_gap = 900
+# Minute data older than this is deleted by prune(); the hourly rollups are kept
+minute_retention_days = 92
+# Ranges longer than this are answered from the hourly rollups unless a level is given
+minute_query_span = 2 * 86400
+
+PortStat = namedtuple("PortStat", "host interface value")
+ErrorSpike = namedtuple("ErrorSpike", "host interface field time value baseline")
+PortUtilization = namedtuple("PortUtilization", "host interface speed percentiles")
+
+_nan = float("nan")
+_nan_cell = array('f', [_nan]).tobytes()
+# Positions in InterfaceErrors (after the name) summed into in_errors and out_errors
+_input_errors = (0, 1, 3, 4)  # align, FCS, receive, undersize
+_output_errors = (2, 5)  # transmit, discards
+_speed = re.compile(r"^(?:a-)?(\d+(?:\.\d+)?)(G|M)?$")
+
+
+def speed_bps(text):
+    # "a-1000" and "1000" are Mb/s, "a-10G" is 10 Gb/s; "auto" (link down) has no speed
+    match = _speed.match(text)
+    if match is None:
+        return None
+    return float(match.group(1)) * (1e9 if match.group(2) == "G" else 1e6)
+
+
+def _elapsed(previous_time, timestamp):
+    # Seconds since the previous sample, or 0 when there is none or it is too old to make a rate from
+    if not previous_time or not 0 < timestamp - previous_time <= max_sample_gap:
+        return 0
+    return timestamp - previous_time
+
+
+class Segment:
+    # One file of float32 cells laid out [port][column][slot] and memory-mapped. A new port appends one block,
+    # so a file only grows with the port count and a query reads just the blocks of the ports it visits.
+    def __init__(self, path, columns, slots):
+        self.path = path
+        self.columns = columns
+        self.slots = slots
+        self.block = columns * slots
+        self.file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        self.ports = 0
+        self.map = None
+        self.cells = None
+        self._map()
+
+    def _map(self):
+        self._unmap()
+        self.ports = os.fstat(self.file.fileno()).st_size // (self.block * 4)
+        if self.ports:
+            self.map = mmap.mmap(self.file.fileno(), self.ports * self.block * 4)
+            self.cells = memoryview(self.map).cast('f')
+
+    def _unmap(self):
+        if self.cells is not None:
+            self.cells.release()
+            self.cells = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def grow(self, ports):
+        # New cells start as NaN, which every query reads as "no sample"
+        if ports <= self.ports:
+            return
+        self.file.seek(self.ports * self.block * 4)
+        self.file.write(_nan_cell * (self.block * (ports - self.ports)))
+        self.file.flush()
+        self._map()
+
+    def index(self, port, column, slot):
+        return (port * self.columns + column) * self.slots + slot
+
+    def values(self, port, column, first, last):
+        # Zero-copy view of one column of one port; another process may have grown the file since it was mapped
+        if port >= self.ports:
+            if os.fstat(self.file.fileno()).st_size < (port + 1) * self.block * 4:
+                return ()
+            self._map()
+        start = self.index(port, column, 0)
+        return self.cells[start + first:start + last]
+
+    def close(self):
+        if self.map is not None:
+            self.map.flush()
+        self._unmap()
+        self.file.close()
+
+
+class CounterStore:
+    # Per host: m-YYYYMMDD.f32 holds one float per port, field and minute of a UTC day; h-YYYYMM.f32 holds the
+    # hourly sum, max and sample count of each field for a month. Port numbers, speeds and the last raw counters
+    # are in meta.json, so a collector started by cron computes rates from the previous run.
+    def __init__(self, directory=store_dir, max_open=64):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.max_open = max_open
+        self.lock = threading.Lock()
+        self.segments = OrderedDict()
+        self.meta = {}
+        self.port_numbers = {}
+
+    def close(self):
+        with self.lock:
+            for segment in self.segments.values():
+                segment.close()
+            self.segments.clear()
+
+    def _host_dir(self, host):
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9_.-]', '_', host) or "default")
+
+    def _meta(self, host):
+        meta = self.meta.get(host)
+        if meta is None:
+            try:
+                with open(os.path.join(self._host_dir(host), "meta.json"), 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {"host": host, "ports": [], "speeds": {}, "last": {}, "last_time": None, "last_errors": {},
+                        "errors_time": None}
+            self.meta[host] = meta
+            self.port_numbers[host] = {interface: number for number, interface in enumerate(meta["ports"])}
+        return meta
+
+    def _save_meta(self, host):
+        path = os.path.join(self._host_dir(host), "meta.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(json.dumps(self.meta[host], separators=(",", ":")))
+        os.replace(temp_path, path)
+
+    def _port(self, host, interface):
+        numbers = self.port_numbers[host]
+        if interface not in numbers:
+            numbers[interface] = len(self.meta[host]["ports"])
+            self.meta[host]["ports"].append(interface)
+        return numbers[interface]
+
+    def _segment(self, host, kind, key, create=False):
+        path = os.path.join(self._host_dir(host), f"{kind}-{key}.f32")
+        segment = self.segments.get(path)
+        if segment is not None:
+            self.segments.move_to_end(path)
+            return segment
+        if not create and not os.path.exists(path):
+            return None
+        if kind == "m":
+            segment = Segment(path, len(fields), 1440)
+        else:
+            segment = Segment(path, len(fields) * 3, 31 * 24)
+        self.segments[path] = segment
+        while len(self.segments) > self.max_open:
+            self.segments.popitem(last=False)[1].close()
+        return segment
+
+    def hosts(self):
+        return sorted(meta["host"] for meta in (self._read_meta(name) for name in os.listdir(self.directory)) if meta)
+
+    def _read_meta(self, name):
+        try:
+            with open(os.path.join(self.directory, name, "meta.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def record(self, host, timestamp, counters, errors=(), speeds=None):
+        # Turns one poll of "show interfaces counters" (and optionally "... errors") into rates against the
+        # previous poll of the host; returns the number of ports written. A poll without error counters (the
+        # traffic monitor) leaves the error cells and the error baseline of the last full poll alone.
+        current = {record.interface: [record.in_octets, record.out_octets] for record in counters}
+        current_errors = {entry.interface: list(entry[1:]) for entry in errors}
+        with self.lock:
+            os.makedirs(self._host_dir(host), exist_ok=True)
+            meta = self._meta(host)
+            if speeds:
+                meta["speeds"].update(speeds)
+            previous, elapsed = meta["last"], _elapsed(meta["last_time"], timestamp)
+            previous_errors = meta.setdefault("last_errors", {})
+            errors_elapsed = _elapsed(meta.setdefault("errors_time", None), timestamp) if current_errors else 0
+            meta["last"], meta["last_time"] = current, timestamp
+            if current_errors:
+                meta["last_errors"], meta["errors_time"] = current_errors, timestamp
+            rows = []
+            for interface, octets in current.items():
+                sample = [_nan] * len(fields)
+                old = previous.get(interface)
+                if elapsed and old:
+                    for column in (0, 1):
+                        delta = counter_delta(old[column], octets[column])
+                        if delta is not None:
+                            sample[column] = delta * 8 / elapsed
+                old, new = previous_errors.get(interface), current_errors.get(interface)
+                if errors_elapsed and old and new:
+                    # Each hardware counter gets its own wrap check before they are summed
+                    deltas = [counter_delta(a, b) for a, b in zip(old, new)]
+                    for column, indexes in ((2, _input_errors), (3, _output_errors)):
+                        group = [deltas[i] for i in indexes]
+                        if None not in group:
+                            sample[column] = sum(group) * 60 / errors_elapsed
+                if any(value == value for value in sample):
+                    rows.append((self._port(host, interface), sample))
+            if rows:
+                self._write(host, timestamp, rows)
+            self._save_meta(host)
+            return len(rows)
+
+    def _write(self, host, timestamp, rows):
+        moment = time.gmtime(int(timestamp))
+        minute = self._segment(host, "m", time.strftime("%Y%m%d", moment), create=True)
+        hour = self._segment(host, "h", time.strftime("%Y%m", moment), create=True)
+        ports = len(self.meta[host]["ports"])
+        minute.grow(ports)
+        hour.grow(ports)
+        minute_slot = moment.tm_hour * 60 + moment.tm_min
+        hour_slot = (moment.tm_mday - 1) * 24 + moment.tm_hour
+        # Hourly columns are sums, then maxima, then sample counts, count * slots cells apart
+        stride = len(fields) * hour.slots
+        minute_cells, hour_cells = minute.cells, hour.cells
+        for port, sample in rows:
+            for column, value in enumerate(sample):
+                # A missing value never overwrites a sample already taken in this minute
+                if value != value:
+                    continue
+                index = minute.index(port, column, minute_slot)
+                old = minute_cells[index]
+                minute_cells[index] = value
+                # Rollups are kept incrementally; a second sample in the same minute replaces the first in the sum
+                total = hour.index(port, column, hour_slot)
+                peak = total + stride
+                samples = peak + stride
+                if hour_cells[samples] != hour_cells[samples]:
+                    hour_cells[total], hour_cells[peak], hour_cells[samples] = value, value, 1
+                    continue
+                if old == old:
+                    hour_cells[total] += value - old
+                else:
+                    hour_cells[total] += value
+                    hour_cells[samples] += 1
+                if value > hour_cells[peak]:
+                    hour_cells[peak] = value
+
+    def _ranges(self, host, start, end, level):
+        # [(segment, first slot, last slot, time of the first slot, seconds per slot)] covering [start, end)
+        step = 60 if level == "minute" else 3600
+        # Callers pass time.time(); whole steps keep every slot index an int
+        moment = math.floor(start) // step * step
+        end = -(-math.ceil(end) // step) * step
+        ranges = []
+        while moment < end:
+            parts = time.gmtime(moment)
+            if level == "minute":
+                segment_start = moment - moment % 86400
+                segment_end = segment_start + 86400
+                key = time.strftime("%Y%m%d", parts)
+            else:
+                segment_start = calendar.timegm((parts.tm_year, parts.tm_mon, 1, 0, 0, 0))
+                segment_end = calendar.timegm((parts.tm_year + parts.tm_mon // 12, parts.tm_mon % 12 + 1, 1, 0, 0, 0))
+                key = time.strftime("%Y%m", parts)
+            last = min(end, segment_end)
+            segment = self._segment(host, "m" if level == "minute" else "h", key)
+            if segment is not None:
+                first_slot = (moment - segment_start) // step
+                ranges.append((segment, first_slot, first_slot + -(-(last - moment) // step), moment, step))
+            moment = segment_end
+        return ranges
+
+    def _scan(self, hosts, start, end, level):
+        # Yields (host, interface, port, ranges, level) for every known port; segments stay memory-mapped
+        level = level or ("minute" if end - start <= minute_query_span else "hour")
+        for host in hosts or self.hosts():
+            meta = self._meta(host)
+            ranges = self._ranges(host, start, end, level)
+            if not ranges:
+                continue
+            for port, interface in enumerate(meta["ports"]):
+                yield host, interface, port, ranges, level
+
+    @staticmethod
+    def _values(port, column, ranges):
+        return [value for segment, first, last, _, _ in ranges for value in segment.values(port, column, first, last)
+                if value == value]
+
+    def _mean(self, port, column, ranges, level):
+        if level == "minute":
+            values = self._values(port, column, ranges)
+            return sum(values) / len(values) if values else None
+        total = sum(self._values(port, column, ranges))
+        samples = sum(self._values(port, 2 * len(fields) + column, ranges))
+        return total / samples if samples else None
+
+    def series(self, host, interface, field, start, end, level=None):
+        # [(time, value)] for one port: minute samples, or hourly means from the rollups
+        level = level or ("minute" if end - start <= minute_query_span else "hour")
+        column = fields.index(field)
+        with self.lock:
+            port = self._meta(host)["ports"].index(interface)
+            points = []
+            for segment, first, last, moment, step in self._ranges(host, start, end, level):
+                if level == "minute":
+                    values = segment.values(port, column, first, last)
+                    points.extend((moment + i * step, value) for i, value in enumerate(values) if value == value)
+                else:
+                    totals = segment.values(port, column, first, last)
+                    counts = segment.values(port, 2 * len(fields) + column, first, last)
+                    points.extend((moment + i * step, total / samples) for i, (total, samples) in
+                                  enumerate(zip(totals, counts)) if samples == samples and samples)
+            return points
+
+    def top_ports(self, start, end, field="in_bps", n=10, stat="mean", hosts=None, level=None):
+        # Busiest ports over [start, end) by mean or peak of field
+        column = fields.index(field)
+        results = []
+        with self.lock:
+            for host, interface, port, ranges, level in self._scan(hosts, start, end, level):
+                if stat == "max":
+                    values = self._values(port, column if level == "minute" else len(fields) + column, ranges)
+                    value = max(values) if values else None
+                else:
+                    value = self._mean(port, column, ranges, level)
+                if value is not None:
+                    results.append(PortStat(host, interface, value))
+        return sorted(results, key=lambda item: item.value, reverse=True)[:n]
+
+    def error_spikes(self, start, end, threshold=100, factor=10.0, n=20, hosts=None, level=None):
+        # Ports whose worst minute had at least threshold errors and factor times their average over the range.
+        # From the hourly rollups the time is that of the hour containing the worst minute.
+        spikes = []
+        with self.lock:
+            for host, interface, port, ranges, level in self._scan(hosts, start, end, level):
+                for name in ("in_errors", "out_errors"):
+                    column = fields.index(name)
+                    peak_column = column if level == "minute" else len(fields) + column
+                    worst, when = None, None
+                    for segment, first, last, moment, step in ranges:
+                        for i, value in enumerate(segment.values(port, peak_column, first, last)):
+                            if value == value and (worst is None or value > worst):
+                                worst, when = value, moment + i * step
+                    if worst is None or worst < threshold:
+                        continue
+                    baseline = self._mean(port, column, ranges, level) or 0.0
+                    if worst >= factor * baseline:
+                        spikes.append(ErrorSpike(host, interface, name, when, worst, baseline))
+        return sorted(spikes, key=lambda spike: spike.value, reverse=True)[:n]
+
+    def utilization(self, start, end, percentiles=(50, 95, 99), direction="in", n=20, hosts=None, level=None):
+        # Percentiles of link utilization (% of the port speed from "show interfaces status"), highest first.
+        # From the hourly rollups they are percentiles of hourly means, which smooths short bursts.
+        column = fields.index(f"{direction}_bps")
+        results = []
+        with self.lock:
+            for host, interface, port, ranges, level in self._scan(hosts, start, end, level):
+                speed = self.meta[host]["speeds"].get(interface)
+                if not speed:
+                    continue
+                if level == "minute":
+                    values = self._values(port, column, ranges)
+                else:
+                    totals = [value for segment, first, last, _, _ in ranges
+                              for value in segment.values(port, column, first, last)]
+                    counts = [value for segment, first, last, _, _ in ranges
+                              for value in segment.values(port, 2 * len(fields) + column, first, last)]
+                    values = [total / samples for total, samples in zip(totals, counts) if samples == samples and samples]
+                if not values:
+                    continue
+                values.sort()
+                result = {p: values[min(len(values) - 1, int(len(values) * p / 100))] * 100 / speed for p in percentiles}
+                results.append(PortUtilization(host, interface, speed, result))
+        return sorted(results, key=lambda item: item.percentiles[max(percentiles)], reverse=True)[:n]
+
+    def prune(self, keep_days=minute_retention_days, now=None):
+        # Deletes minute files older than keep_days; returns how many were removed
+        cutoff = time.strftime("%Y%m%d", time.gmtime((now or time.time()) - keep_days * 86400))
+        removed = 0
+        with self.lock:
+            for name in os.listdir(self.directory):
+                directory = os.path.join(self.directory, name)
+                if not os.path.isdir(directory):
+                    continue
+                for file_name in os.listdir(directory):
+                    if file_name.startswith("m-") and file_name[2:10] < cutoff:
+                        path = os.path.join(directory, file_name)
+                        segment = self.segments.pop(path, None)
+                        if segment is not None:
+                            segment.close()
+                        os.remove(path)
+                        removed += 1
+        return removed
+
+    def stats(self):
+        files = size = ports = hosts = 0
+        for name in os.listdir(self.directory):
+            directory = os.path.join(self.directory, name)
+            if not os.path.isdir(directory):
+                continue
+            meta = self._read_meta(name)
+            if meta:
+                hosts += 1
+                ports += len(meta["ports"])
+            for file_name in os.listdir(directory):
+                if file_name.endswith(".f32"):
+                    files += 1
+                    size += os.path.getsize(os.path.join(directory, file_name))
+        return {"hosts": hosts, "ports": ports, "files": files, "bytes": size}
+
+
+def read_counters(net_connect):
+    # One collection: counters, error counters and port speeds
+    counters = parse_interfaces_counters(net_connect.send_command("show interfaces counters"))
+    errors = parse_interfaces_counters_errors(net_connect.send_command("show interfaces counters errors"))
+    speeds = {record.interface: speed_bps(record.speed) for record in
+              parse_interfaces_status(net_connect.send_command("show interfaces status"))}
+    return counters, errors, {interface: speed for interface, speed in speeds.items() if speed}
+
+
+def collect_on_host(data, store, connect_handler=None):
+    if connect_handler is None:
+        from netmiko import ConnectHandler
+        connect_handler = ConnectHandler
+
+    start = time.time()
+    result = {"host": data["host"], "ok": False, "ports": 0, "error": None, "elapsed": 0.0}
+    net_connect = None
+    try:
+        net_connect = connect_handler(**build_device(data))
+        net_connect.enable()
+        counters, errors, speeds = read_counters(net_connect)
+        result["ports"] = store.record(data["host"], time.time(), counters, errors, speeds)
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if net_connect is not None:
+            try:
+                net_connect.disconnect()
+            except Exception:
+                pass
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def collect_fleet(hosts, store, workers=10, on_result=None, connect_handler=None):
+    results = []
+    if not hosts:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as pool:
+        futures = [pool.submit(collect_on_host, data, store, connect_handler) for data in hosts]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def format_report(store, start, end, n=10, hosts=None):
+    span = f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(start))} - {time.strftime('%Y-%m-%d %H:%M', time.localtime(end))}"
+    lines = [f"Busiest ports, {span}:"]
+    for direction in ("in", "out"):
+        for item in store.top_ports(start, end, f"{direction}_bps", n, hosts=hosts):
+            lines.append(f"  {direction:<3} {item.host:<20} {item.interface:<12} {format_rate(item.value)} average")
+    lines.append("Error spikes (worst minute):")
+    spikes = store.error_spikes(start, end, n=n, hosts=hosts)
+    for spike in spikes:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(spike.time))
+        lines.append(f"  {spike.host:<20} {spike.interface:<12} {spike.field:<10} {spike.value:.0f}/min at {when} "
+                     f"(average {spike.baseline:.1f}/min)")
+    if not spikes:
+        lines.append("  none")
+    lines.append("Highest utilization (inbound p50 / p95 / p99 of port speed):")
+    for item in store.utilization(start, end, n=n, hosts=hosts):
+        values = " / ".join(f"{item.percentiles[p]:.1f}%" for p in (50, 95, 99))
+        lines.append(f"  {item.host:<20} {item.interface:<12} {values}")
+    return "\n".join(lines) + "\n"
+
+
+def format_counter_stats(stats):
+    return (f"Counter store: {stats['ports']} ports on {stats['hosts']} devices, "
+            f"{stats['files']} files, {stats['bytes'] / 1048576:.1f} MB")
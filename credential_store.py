@@ -0,0 +1,51 @@
+service_name = "cisco_interface_manager"
+
+
+def _keyring():
+    # keyring is optional; without it passwords are never written anywhere and must be typed per session
+    try:
+        import keyring
+    except ImportError:
+        return None
+    return keyring
+
+
+def available():
+    return _keyring() is not None
+
+
+def save_credentials(host, password="", secret=""):
+    keyring = _keyring()
+    if keyring is None:
+        return False
+    for field, value in (("password", password), ("secret", secret)):
+        if value:
+            keyring.set_password(service_name, f"{host}:{field}", value)
+        else:
+            delete_field(keyring, host, field)
+    return True
+
+
+def load_credentials(host):
+    keyring = _keyring()
+    if keyring is None:
+        return "", ""
+    try:
+        return (keyring.get_password(service_name, f"{host}:password") or "",
+                keyring.get_password(service_name, f"{host}:secret") or "")
+    except Exception:
+        return "", ""
+
+
+def delete_field(keyring, host, field):
+    try:
+        keyring.delete_password(service_name, f"{host}:{field}")
+    except Exception:
+        pass
+
+
+def delete_credentials(host):
+    keyring = _keyring()
+    if keyring is not None:
+        delete_field(keyring, host, "password")
+        delete_field(keyring, host, "secret")
@@ -0,0 +1,367 @@
+import time
+from string import Template
+
+from command_journal import CommandJournal, journal_dir
+from config_push import default_file_system, config_file_name, apply_config_file
+from config_replay import compact_history, missing_commands, compile_config
+from config_snapshots import normalize_config, config_hash, parse_sections, diff_sections
+from config_transaction import ConfigTransaction
+from config_validation import ValidationError, validate_commands
+from device_metrics import DeviceMetrics, instrument_connect, command_label
+from interface_range import expand_selection, group_interface_ranges, build_range_commands, parse_range_echo, is_multi_selection
+from ios_parsers import (parse_ip_interface_brief, parse_vlan_brief, parse_interfaces_description, parse_mac_address_table,
+                         parse_ip_arp, update_ip_interface_brief)
+from output_stream import stream_command
+from session_pool import SessionPool
+from state_cache import DeviceStateCache
+from timing_profiles import default_profile, calibrate, prompt_pattern, connect_kwargs, command_kwargs, config_kwargs
+from vlan_bulk import build_vlan_commands, parse_vlan_spec
+
+
+class NotConnectedError(Exception):
+    pass
+
+
+def vlan_commands(vlan_id, name=None):
+    return [f"vlan {vlan_id}"] + ([f"name {name}"] if name else [])
+
+
+def switchport_lines(mode, vlan):
+    lines = ["switchport trunk encapsulation dot1q"] if mode == "trunk" else []
+    lines.append(f"switchport mode {mode}")
+    lines.append(f"switchport {'access vlan' if mode == 'access' else 'trunk allowed vlan'} {vlan}")
+    return lines
+
+
+def native_vlan_lines(vlan):
+    return [f"switchport trunk native vlan {vlan}"]
+
+
+port_security_options = {
+    "maximum": "switchport port-security maximum",
+    "violation": "switchport port-security violation",
+    "mac address": "switchport port-security mac-address",
+    "aging time": "switchport port-security aging time",
+    "aging type": "switchport port-security aging type",
+}
+
+
+def port_security_lines(option, value):
+    if option not in port_security_options:
+        raise ValueError(f"Unknown port security option: {option}")
+    return [f"{port_security_options[option]} {value}"]
+
+
+def speed_duplex_lines(speed=None, duplex=None):
+    lines = []
+    if speed:
+        lines.append(f"speed {speed}")
+    if duplex:
+        lines.append(f"duplex {duplex}")
+    return lines
+
+
+def shutdown_lines(shutdown):
+    return ["shutdown" if shutdown else "no shutdown"]
+
+
+class DeviceEngine:
+    # Device operations without any GUI; every method blocks, so the GUI calls them from its device worker
+    def __init__(self, connect_handler=None, metrics=None, state_cache=None, journal_directory=journal_dir, max_sessions=8,
+                 inventory_cache=None):
+        self.metrics = metrics or DeviceMetrics()
+        self.state_cache = state_cache or DeviceStateCache()
+        # connect_handler=None imports Netmiko on the first connect rather than at import time
+        self.session_pool = SessionPool(max_sessions=max_sessions,
+                                        connect_handler=instrument_connect(connect_handler, self.metrics))
+        self.journal_directory = journal_directory
+        # Optional InventoryCache: last known interfaces/VLANs per host, kept across restarts
+        self.inventory_cache = inventory_cache
+        self.transaction = ConfigTransaction()
+        self.connection = None
+        self.journal = None
+        self.command_history = []
+        self.known_interfaces = []
+        self.known_vlans = []
+        # Config sets checked locally, and how many were stopped before costing a round trip
+        self.validation_stats = {"checked": 0, "rejected": 0}
+        # Read timeouts and verification for the connected device; see timing_profiles
+        self.timing = dict(default_profile)
+        self.device_type = "cisco_ios"
+        self.prompt = None
+
+    @property
+    def host(self):
+        return self.connection.host if self.connection is not None else None
+
+    def require_connection(self):
+        if self.connection is None:
+            raise NotConnectedError("Not connected to any device.")
+        return self.connection
+
+    def connect(self, host, username="", password="", secret="", device_type="cisco_ios", timing=None, **extra):
+        # timing is the host's stored profile; without one Netmiko's defaults apply until calibrate_timing()
+        self.timing = dict(timing or default_profile)
+        self.device_type = device_type
+        device = {"device_type": device_type, "host": host, "username": username,
+                  "password": password, "secret": secret}
+        device.update(connect_kwargs(self.timing))
+        device.update(extra)
+        # Reuses a warm session when this host was used recently
+        self.connection = self.session_pool.get(device)
+        # reads finish on the device's own prompt instead of Netmiko finding the prompt before each command
+        self.prompt = prompt_pattern(getattr(self.connection, "base_prompt", None))
+        self.known_interfaces = []
+        self.known_vlans = []
+        self.warm_start()
+        self.load_history()
+        return self.connection
+
+    def warm_start(self):
+        # Seeds the interface and VLAN lists from disk so selections and validation work before the first refresh;
+        # returns the stored snapshot (or None) for the caller to render
+        if self.inventory_cache is None or self.host is None:
+            return None
+        snapshot = self.inventory_cache.load(self.host)
+        if snapshot is not None:
+            self.known_interfaces = [record.interface for record in parse_ip_interface_brief(snapshot["interfaces"])]
+            self.known_vlans = [vlan.vlan_id for vlan in parse_vlan_brief(snapshot["vlans"])]
+        return snapshot
+
+    def calibrate_timing(self, probes=5):
+        # A few prompt round trips measure the device; returns the new profile for the caller to store
+        connection = self.require_connection()
+        samples = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            connection.find_prompt()
+            samples.append(time.perf_counter() - start)
+        self.timing = calibrate(samples, self.device_type)
+        return self.timing
+
+    def load_history(self):
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = CommandJournal(self.host, directory=self.journal_directory)
+        self.journal.import_legacy()
+        self.command_history = self.journal.load()
+        return self.command_history
+
+    def disconnect(self):
+        if self.connection is None:
+            return
+        host = self.host
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.state_cache.invalidate(host)
+        # The session stays in the pool, so reconnecting to this host is near-instant
+        self.connection = None
+
+    def keepalive(self):
+        # Returns the host whose session was lost, or None
+        host = self.host
+        self.session_pool.keepalive()
+        if self.connection is None:
+            return None
+        # Follow the active session if the keepalive had to replace it; drop it if the reconnect failed
+        connection = self.session_pool.connection_for(host)
+        if connection is None:
+            self.disconnect()
+            return host
+        self.connection = connection
+        return None
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.session_pool.close_all()
+        self.connection = None
+
+    def show(self, command, cached=True):
+        connection = self.require_connection()
+        kwargs = command_kwargs(self.timing, self.prompt)
+        if not cached:
+            return connection.send_command(command, **kwargs)
+        return self.state_cache.get(connection.host, command, lambda: connection.send_command(command, **kwargs))
+
+    def stream(self, command, on_chunk, timeout=600):
+        # For outputs too large to hold in one string; on_chunk receives complete lines as they arrive
+        connection = self.require_connection()
+        start = time.perf_counter()
+        try:
+            total = stream_command(connection, command, on_chunk, timeout)
+        except Exception:
+            self.metrics.observe(connection.host, "stream", command_label(command), time.perf_counter() - start, error=True)
+            raise
+        self.metrics.observe(connection.host, "stream", command_label(command), time.perf_counter() - start, total)
+        return total
+
+    def snapshot(self, force=False):
+        self.require_connection()
+        if force:
+            self.state_cache.invalidate(self.host)
+        snapshot = {
+            "interfaces": self.show('show ip interface brief'),
+            "vlans": self.show('show vlan brief'),
+        }
+        self.known_interfaces = [record.interface for record in parse_ip_interface_brief(snapshot["interfaces"])]
+        self.known_vlans = [vlan.vlan_id for vlan in parse_vlan_brief(snapshot["vlans"])]
+        if self.inventory_cache is not None:
+            self.inventory_cache.save(self.host, snapshot)
+        return snapshot
+
+    def apply_link_states(self, changes, ttl=None):
+        # Folds pushed link/protocol changes into the cached interface list instead of invalidating it
+        self.require_connection()
+        return self.state_cache.update(self.host, "show ip interface brief",
+                                       lambda output: update_ip_interface_brief(output, changes), ttl)
+
+    def addresses(self):
+        # Fresh MAC table and ARP entries, as fed to the MAC index
+        return (parse_mac_address_table(self.show("show mac address-table", cached=False)),
+                parse_ip_arp(self.show("show ip arp", cached=False)))
+
+    def capture_config(self, store):
+        # Running config is always read fresh; the store keeps one copy of each distinct config
+        self.require_connection()
+        return store.capture(self.host, self.show("show running-config", cached=False))
+
+    def interfaces(self, force=False):
+        return parse_ip_interface_brief(self.snapshot(force)["interfaces"])
+
+    def vlans(self, force=False):
+        return parse_vlan_brief(self.snapshot(force)["vlans"])
+
+    def record_commands(self, commands):
+        self.command_history.append(commands)
+        if self.journal is not None:
+            self.journal.append(commands)
+        self.state_cache.invalidate_for_config(self.host, commands)
+        # VLANs created here are valid targets for later changes without waiting for a new snapshot
+        for command in commands:
+            words = command.split()
+            if len(words) == 2 and words[0] == "vlan" and words[1][0].isdigit():
+                self.known_vlans.extend(parse_vlan_spec(words[1]))
+
+    def validate(self, commands):
+        # Checked against the last snapshot of the device's interfaces and VLANs; costs no round trip
+        problems = validate_commands(commands, self.known_interfaces, self.known_vlans)
+        self.validation_stats["checked"] += 1
+        if problems:
+            self.validation_stats["rejected"] += 1
+        return problems
+
+    def send_config(self, commands, save=True, validate=True):
+        connection = self.require_connection()
+        if validate:
+            problems = self.validate(commands)
+            if problems:
+                raise ValidationError(problems)
+        output = connection.send_config_set(commands, **config_kwargs(self.timing))
+        if save:
+            connection.save_config()
+        self.record_commands(commands)
+        return output
+
+    def write_memory(self):
+        return self.require_connection().save_config()
+
+    def commit(self, save=True, staged=None):
+        # Staged edits are detached first so new edits can be staged while the commit runs;
+        # a caller that detached them itself is responsible for restoring them on failure
+        connection = self.require_connection()
+        detached = staged is None
+        if detached:
+            staged = self.transaction.detach()
+        try:
+            problems = self.validate(staged.merged())
+            if problems:
+                raise ValidationError(problems)
+            commands, output = staged.commit(connection, save=save, **config_kwargs(self.timing))
+        except Exception:
+            if detached:
+                self.transaction.restore(staged)
+            raise
+        if commands:
+            self.record_commands(commands)
+        return commands, output
+
+    def apply_stored_config(self):
+        # Only push the lines of the compacted history that the device is missing
+        self.require_connection()
+        if not self.command_history:
+            return None
+        state = compact_history(self.command_history)
+        commands, skipped = missing_commands(state, self.show("show running-config"), self.show("show vlan brief"))
+        if commands:
+            self.require_connection().send_config_set(commands, **config_kwargs(self.timing))
+            self.state_cache.invalidate_for_config(self.host, commands)
+        sent = sum(1 for cmd in commands if not cmd.startswith("interface "))
+        return sent, skipped
+
+    def compile_config(self, template=None):
+        # The complete config to push: a template ($host is substituted) or the running config with the
+        # compacted command history applied. Returns (running config, compiled config), both normalized.
+        running = normalize_config(self.show("show running-config", cached=False))
+        if template is not None:
+            return running, normalize_config(Template(template).safe_substitute(host=self.host))
+        return running, compile_config(running, compact_history(self.command_history))
+
+    def push_config_file(self, transfer, template=None, replace=True, dry_run=False, save=True,
+                         file_system=default_file_system):
+        # One file transfer and one command on the device instead of a round trip per config line.
+        # transfer is a TftpTransfer or ScpTransfer; returns (section changes, device output)
+        connection = self.require_connection()
+        running, compiled = self.compile_config(template)
+        changes = diff_sections(parse_sections(running), parse_sections(compiled))
+        if dry_run or not changes:
+            return changes, ""
+        name = config_file_name(config_hash(compiled))
+        output = transfer.send(connection, name, compiled.encode('utf-8'), file_system, self.prompt)
+        try:
+            output += "\n" + apply_config_file(connection, name, file_system, replace, self.prompt)
+        finally:
+            self.state_cache.invalidate(self.host)
+        if save:
+            output += "\n" + connection.save_config()
+        return changes, output
+
+    def plan_bulk_vlans(self, requested):
+        existing = {vlan.vlan_id: vlan.name for vlan in parse_vlan_brief(self.show('show vlan brief'))}
+        return build_vlan_commands(requested, existing)
+
+    def resolve_interfaces(self, selection):
+        selection = selection.strip()
+        if not selection:
+            raise ValueError("No interface selected.")
+        if not self.known_interfaces:
+            self.snapshot()
+        if selection in self.known_interfaces or not is_multi_selection(selection):
+            return [selection]
+        descriptions = {}
+        if "desc:" in selection:
+            output = self.show('show interfaces description')
+            descriptions = {record.interface: record.description for record in parse_interfaces_description(output)}
+        return expand_selection(selection, self.known_interfaces, descriptions)
+
+    @staticmethod
+    def interface_commands(interfaces, lines):
+        # A single interface gets a plain "interface" block; several go out as "interface range" blocks
+        if len(interfaces) == 1:
+            return [f"interface {interfaces[0]}"] + lines, None
+        blocks = group_interface_ranges(interfaces)
+        return build_range_commands(blocks, lines), blocks
+
+    def configure_interfaces(self, selection, lines, save=True):
+        # Returns ({interface: error or None}, output)
+        interfaces = self.resolve_interfaces(selection)
+        if not interfaces:
+            raise ValueError(f"No interfaces match {selection}.")
+        commands, blocks = self.interface_commands(interfaces, lines)
+        output = self.send_config(commands, save)
+        if blocks is None:
+            error = next((line.strip() for line in output.splitlines() if line.strip().startswith("%")), None)
+            return {interfaces[0]: error}, output
+        return parse_range_echo(output, blocks), output
@@ -0,0 +1,241 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds, Prometheus style (+Inf is implied)
+default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Interface names and numbers are folded so "show interfaces Gi1/0/7 switchport" shares one series
+_variable_word = re.compile(r"\b[A-Za-z-]*\d+(?:/\d+)*(?:\.\d+)?\b")
+
+
+def command_label(command):
+    return _variable_word.sub("*", " ".join(command.split()))
+
+
+class Histogram:
+    def __init__(self, buckets=default_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation; the real max stands in for +Inf
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.total, "max": self.max,
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts))}
+
+
+class CommandStats:
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.bytes_read = 0
+        self.errors = 0
+
+
+class DeviceMetrics:
+    # Thread safe: the device worker and fleet threads record into the same instance
+    def __init__(self, buckets=default_buckets):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.commands = {}
+        self.queue_wait = Histogram(buckets)
+        self.started = time.time()
+
+    def observe(self, host, method, command, seconds, bytes_read=0, error=False):
+        key = (host, method, command)
+        with self.lock:
+            stats = self.commands.get(key)
+            if stats is None:
+                stats = self.commands[key] = CommandStats(self.buckets)
+            stats.latency.observe(seconds)
+            stats.bytes_read += bytes_read
+            if error:
+                stats.errors += 1
+
+    def observe_queue_wait(self, seconds):
+        if seconds is None:
+            return
+        with self.lock:
+            self.queue_wait.observe(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.commands.clear()
+            self.queue_wait = Histogram(self.buckets)
+            self.started = time.time()
+
+    def rows(self):
+        # One row per (host, method, command), slowest total time first
+        with self.lock:
+            rows = [{"host": host, "method": method, "command": command,
+                     "count": stats.latency.count, "total": stats.latency.total,
+                     "mean": stats.latency.total / stats.latency.count if stats.latency.count else 0.0,
+                     "p50": stats.latency.quantile(0.5), "p95": stats.latency.quantile(0.95),
+                     "max": stats.latency.max, "bytes": stats.bytes_read, "errors": stats.errors}
+                    for (host, method, command), stats in self.commands.items()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def host_latency(self):
+        hosts = {}
+        with self.lock:
+            for (host, _, _), stats in self.commands.items():
+                hosts.setdefault(host, Histogram(self.buckets)).merge(stats.latency)
+        return hosts
+
+    def to_json(self):
+        with self.lock:
+            commands = [{"host": host, "method": method, "command": command,
+                         "latency": stats.latency.to_dict(), "bytes_read": stats.bytes_read, "errors": stats.errors}
+                        for (host, method, command), stats in self.commands.items()]
+            queue_wait = self.queue_wait.to_dict()
+        hosts = {host: histogram.to_dict() for host, histogram in self.host_latency().items()}
+        return {"started": self.started, "exported": time.time(), "commands": commands,
+                "hosts": hosts, "queue_wait": queue_wait}
+
+    def to_prometheus(self, prefix="cisco_manager"):
+        lines = []
+
+        def histogram_lines(name, labels, histogram):
+            cumulative = 0
+            for bound, count in zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.total}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        with self.lock:
+            items = [(key, stats.latency, stats.bytes_read, stats.errors) for key, stats in self.commands.items()]
+            queue_wait = self.queue_wait
+
+            lines.append(f"# HELP {prefix}_command_seconds Latency of device calls.")
+            lines.append(f"# TYPE {prefix}_command_seconds histogram")
+            for (host, method, command), latency, _, _ in items:
+                histogram_lines(f"{prefix}_command_seconds", _labels(host, method, command), latency)
+            lines.append(f"# HELP {prefix}_command_bytes_read_total Bytes returned by device calls.")
+            lines.append(f"# TYPE {prefix}_command_bytes_read_total counter")
+            for (host, method, command), _, bytes_read, _ in items:
+                lines.append(f"{prefix}_command_bytes_read_total{{{_labels(host, method, command)}}} {bytes_read}")
+            lines.append(f"# HELP {prefix}_command_errors_total Device calls that raised an error.")
+            lines.append(f"# TYPE {prefix}_command_errors_total counter")
+            for (host, method, command), _, _, errors in items:
+                lines.append(f"{prefix}_command_errors_total{{{_labels(host, method, command)}}} {errors}")
+            lines.append(f"# HELP {prefix}_queue_wait_seconds Time device tasks waited for the worker thread.")
+            lines.append(f"# TYPE {prefix}_queue_wait_seconds histogram")
+            histogram_lines(f"{prefix}_queue_wait_seconds", "", queue_wait)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Written to a temporary file and renamed so the node_exporter textfile collector never reads half a file
+        _write_atomic(path, self.to_prometheus())
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.to_json(), indent=2))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(host, method, command):
+    return f'host="{_escape(host)}",method="{_escape(method)}",command="{_escape(command)}"'
+
+
+def _write_atomic(path, text):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class InstrumentedConnection:
+    # Wraps a Netmiko connection and times every call that goes to the device; anything else passes through
+    def __init__(self, connection, metrics, host=None):
+        self.connection = connection
+        self.metrics = metrics
+        self.metrics_host = host or getattr(connection, "host", "unknown")
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def _timed(self, method, command, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            output = fn(*args, **kwargs)
+        except Exception:
+            self.metrics.observe(self.metrics_host, method, command, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.observe(self.metrics_host, method, command, time.perf_counter() - start,
+                             len(output) if isinstance(output, str) else 0)
+        return output
+
+    def send_command(self, command, *args, **kwargs):
+        return self._timed("send_command", command_label(command), self.connection.send_command, command, *args, **kwargs)
+
+    def send_command_timing(self, command, *args, **kwargs):
+        return self._timed("send_command", command_label(command), self.connection.send_command_timing, command, *args, **kwargs)
+
+    def send_config_set(self, commands, *args, **kwargs):
+        return self._timed("send_config_set", "config", self.connection.send_config_set, commands, *args, **kwargs)
+
+    def save_config(self, *args, **kwargs):
+        return self._timed("save_config", "write memory", self.connection.save_config, *args, **kwargs)
+
+    def enable(self, *args, **kwargs):
+        return self._timed("enable", "enable", self.connection.enable, *args, **kwargs)
+
+    def find_prompt(self, *args, **kwargs):
+        return self._timed("find_prompt", "prompt", self.connection.find_prompt, *args, **kwargs)
+
+
+def instrument_connect(connect_handler, metrics):
+    # Drop-in replacement for ConnectHandler that records connect time and returns instrumented sessions
+    def connect(**device):
+        handler = connect_handler
+        if handler is None:
+            from netmiko import ConnectHandler
+            handler = ConnectHandler
+        host = device.get("host", "unknown")
+        start = time.perf_counter()
+        try:
+            connection = handler(**device)
+        except Exception:
+            metrics.observe(host, "connect", "connect", time.perf_counter() - start, error=True)
+            raise
+        metrics.observe(host, "connect", "connect", time.perf_counter() - start)
+        return InstrumentedConnection(connection, metrics, host)
+    return connect
+
+
+def format_seconds(seconds):
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
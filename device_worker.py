@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, CancelledError, TimeoutError
+
+
+class UiDispatcher:
+    # Runs callbacks queued from worker threads on the Tk main thread via root.after
+    def __init__(self, root, interval=50):
+        self.root = root
+        self.interval = interval
+        self.calls = queue.Queue()
+        self.hooks = []
+        self.root.after(self.interval, self._poll)
+
+    def __call__(self, callback, *args):
+        self.calls.put((callback, args))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    callback, args = self.calls.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+            for hook in self.hooks:
+                hook()
+        finally:
+            self.root.after(self.interval, self._poll)
+
+
+class DeviceTask:
+    def __init__(self, fn, args, kwargs, timeout, on_done):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.on_done = on_done
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.started = None
+        self.reported = False
+
+
+class DeviceWorker:
+    # Serialises all calls on one device session through a single background thread
+    def __init__(self, dispatch):
+        self.dispatch = dispatch
+        self.tasks = queue.Queue()
+        self.pending = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args, timeout=None, on_done=None, **kwargs):
+        task = DeviceTask(fn, args, kwargs, timeout, on_done)
+        self.pending.append(task)
+        self.tasks.put(task)
+        return task.future
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            task.started = time.monotonic()
+            task.future.queue_wait = task.started - task.submitted
+            try:
+                task.future.set_result(task.fn(*task.args, **task.kwargs))
+            except BaseException as e:
+                task.future.set_exception(e)
+            self.dispatch(self._report, task, task.future)
+
+    def _report(self, task, future):
+        if task.reported:
+            return
+        task.reported = True
+        if task in self.pending:
+            self.pending.remove(task)
+        if task.on_done:
+            task.on_done(future)
+
+    def _abandon(self, task, error):
+        failed = Future()
+        failed.set_exception(error)
+        self._report(task, failed)
+
+    def check_timeouts(self):
+        # Netmiko calls cannot be interrupted, so a timed out task is abandoned and its late result ignored
+        now = time.monotonic()
+        for task in list(self.pending):
+            if task.timeout and task.started and not task.future.done() and now - task.started > task.timeout:
+                self._abandon(task, TimeoutError(f"Device did not respond within {task.timeout} seconds"))
+
+    def cancel_all(self):
+        for task in list(self.pending):
+            if task.future.cancel() or not task.future.done():
+                self._abandon(task, CancelledError())
+
+    @property
+    def busy(self):
+        return bool(self.pending)
+
+    def stop(self):
+        self.tasks.put(None)
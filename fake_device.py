@@ -0,0 +1,624 @@
+import re
+import socket
+import struct
+import time
+
+from vlan_bulk import parse_vlan_spec
+from interface_range import expand_range_spec, short_interface_name
+
+invalid_input = "% Invalid input detected at '^' marker."
+default_vlans = {1: "default", 1002: "fddi-default", 1003: "token-ring-default", 1004: "fddinet-default",
+                 1005: "trnet-default"}
+
+
+class FakeSwitch:
+    # Device state shared by every session to the same host, so config survives reconnects
+    def __init__(self, hostname="fake", port_count=24):
+        self.hostname = hostname
+        self.port_count = port_count
+        self.interfaces = {name: {"shutdown": False, "lines": {}} for name in interface_names(port_count)}
+        self.vlans = dict(default_vlans)
+        # Files copied to flash: by SCP or TFTP, {name: bytes}
+        self.flash = {}
+        self.counter_tick = 0
+        self.saves = 0
+        # (address, port) to send LINK/LINEPROTO syslog to when a port is shut or enabled
+        self.syslog_target = None
+        self.syslog_sequence = 0
+
+    def set_shutdown(self, name, shutdown):
+        interface = self.interfaces[name]
+        if interface["shutdown"] == shutdown:
+            return
+        interface["shutdown"] = shutdown
+        if self.syslog_target:
+            state = "administratively down" if shutdown else "up"
+            messages = [syslog_message(name, "status", state, self.syslog_sequence),
+                        syslog_message(name, "protocol", "down" if shutdown else "up", self.syslog_sequence + 1)]
+            self.syslog_sequence += 2
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                for message in messages:
+                    sender.sendto(message, self.syslog_target)
+
+    def running_config(self):
+        lines = ["Building configuration...", "", "!", f"hostname {self.hostname}", "!"]
+        for vlan, name in sorted(self.vlans.items()):
+            if vlan == 1 or vlan >= 1002:
+                continue
+            lines.append(f"vlan {vlan}")
+            if name != f"VLAN{vlan:04}":
+                lines.append(f" name {name}")
+            lines.append("!")
+        for name, interface in self.interfaces.items():
+            lines.append(f"interface {name}")
+            lines.extend(f" {line}" for line in interface["lines"].values())
+            if interface["shutdown"]:
+                lines.append(" shutdown")
+            lines.append("!")
+        lines.append("end")
+        return "\n".join(lines)
+
+    def statuses(self):
+        return {name: "administratively down" if interface["shutdown"] else "up"
+                for name, interface in self.interfaces.items()}
+
+
+class FakeDevice:
+    # Netmiko-compatible stand-in that emulates enable/config mode and generates show output from its state
+    RETURN = "\n"
+
+    def __init__(self, host="fake", latency=0.0, line_latency=0.0, port_count=24, fail=False, switch=None,
+                 chunk_size=4096, chunk_interval=0.0, tech_repeat=20, netmiko_timing=False, **kwargs):
+        self.host = host
+        self.latency = latency
+        self.line_latency = line_latency
+        # Streaming reads return at most chunk_size bytes, one chunk per chunk_interval
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self.tech_repeat = tech_repeat
+        # Charges the extra exchanges real Netmiko makes: a prompt lookup before a command without expect_string,
+        # entering/leaving config mode, and waiting for each line's echo while cmd_verify is on
+        self.netmiko_timing = netmiko_timing
+        self.channel = ""
+        self.channel_position = 0
+        self.channel_ready = 0.0
+        self.switch = switch or FakeSwitch(host, port_count)
+        self.port_count = self.switch.port_count
+        self.base_prompt = self.switch.hostname
+        self.round_trips = 0
+        self.bytes_read = 0
+        self.config_lines = []
+        # (source, destination) of a copy waiting for its "Destination filename" answer, and one whose
+        # destination exists and waits for the "over write? [confirm]" answer
+        self.pending_copy = None
+        self.pending_overwrite = None
+        self.enabled = False
+        self.alive = True
+        if fail:
+            raise ConnectionError(f"Unable to connect to {host}")
+        self._wait()
+
+    def _wait(self, lines=0, read_timeout=None):
+        self.round_trips += 1
+        delay = self.latency + self.line_latency * lines
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise TimeoutError(f"Pattern not detected within read_timeout of {read_timeout}s on {self.host}")
+        if delay:
+            time.sleep(delay)
+
+    def _reply(self, output):
+        self.bytes_read += len(output)
+        return output
+
+    def _prompt(self):
+        return f"{self.switch.hostname}{'#' if self.enabled else '>'}"
+
+    def find_prompt(self):
+        self._wait()
+        return self._prompt()
+
+    def enable(self):
+        self._wait()
+        self.enabled = True
+
+    def check_enable_mode(self):
+        return self.enabled
+
+    def send_command(self, command, **kwargs):
+        if self.netmiko_timing and not kwargs.get("expect_string"):
+            self._wait()
+        self._wait(read_timeout=kwargs.get("read_timeout"))
+        return self._reply(self._output(command))
+
+    def write_channel(self, data):
+        # Queues the echo, output and prompt the way an SSH channel would deliver them
+        for command in data.splitlines():
+            command = command.strip()
+            if not command:
+                self.channel += self._prompt()
+                continue
+            self.round_trips += 1
+            self.channel += f"{command}\n{self._output(command)}\n{self._prompt()}"
+        if not self.channel_ready:
+            self.channel_ready = time.monotonic() + self.latency
+
+    def read_channel(self):
+        if self.channel_position >= len(self.channel):
+            return ""
+        now = time.monotonic()
+        if now < self.channel_ready:
+            time.sleep(self.channel_ready - now)
+        chunk = self.channel[self.channel_position:self.channel_position + self.chunk_size]
+        self.channel_position += len(chunk)
+        self.channel_ready = time.monotonic() + self.chunk_interval
+        if self.channel_position >= len(self.channel):
+            self.channel = ""
+            self.channel_position = 0
+            self.channel_ready = 0.0
+        return self._reply(chunk)
+
+    def _process(self, lines):
+        # Device-side parse time for config applied from a file, without a round trip per line
+        if self.line_latency and lines:
+            time.sleep(self.line_latency * lines)
+
+    def _read_file(self, path):
+        if path.startswith("tftp://"):
+            match = re.match(r"^tftp://([^/:]+)(?::(\d+))?/(.+)$", path)
+            if match is None:
+                raise OSError("Bad URL")
+            return tftp_get(match.group(1), int(match.group(2) or 69), match.group(3))
+        file_system, _, name = path.partition(":")
+        if file_system != "flash" or name not in self.switch.flash:
+            raise OSError("No such file or directory")
+        return self.switch.flash[name]
+
+    def _copy(self, source, destination):
+        try:
+            data = self._read_file(source)
+        except OSError as e:
+            return f"%Error opening {source} ({e})"
+        if destination == "running-config":
+            commands = config_file_commands(data.decode('utf-8', 'replace'))
+            self._process(len(commands))
+            errors = [line for line in self._apply_config(commands) if line.startswith("%")]
+            return "\n".join([f"{len(data)} bytes copied"] + errors)
+        file_system, _, name = destination.partition(":")
+        if file_system != "flash" or not name:
+            return f"%Error opening {destination} (Invalid argument)"
+        self.switch.flash[name] = data
+        return f"Accessing {source}...\nLoading {name} !!!\n[OK - {len(data)} bytes]\n\n{len(data)} bytes copied"
+
+    def _configure_replace(self, path):
+        # The file becomes the whole config: settings it does not contain are removed
+        try:
+            data = self._read_file(path)
+        except OSError as e:
+            return f"%Error opening {path} ({e})"
+        commands = config_file_commands(data.decode('utf-8', 'replace'))
+        self._process(len(commands))
+        shut = set()
+        current = None
+        for command in commands:
+            if command.startswith("interface "):
+                current = command[len("interface "):]
+            elif command == "exit":
+                current = None
+            elif command == "shutdown" and current:
+                shut.add(current)
+        switch = self.switch
+        switch.vlans = dict(default_vlans)
+        for name, interface in switch.interfaces.items():
+            interface["lines"].clear()
+            switch.set_shutdown(name, name in shut)
+        errors = [line for line in self._apply_config(commands) if line.startswith("%")]
+        return "\n".join(errors + ["Total number of passes: 1", "Rollback Done"])
+
+    def _output(self, command):
+        switch = self.switch
+        command = " ".join(command.split())
+        if self.pending_overwrite is not None:
+            source, destination = self.pending_overwrite
+            self.pending_overwrite = None
+            if command not in ("", "y", "yes"):
+                return "%Error: copy aborted"
+            return self._copy(source, destination)
+        if self.pending_copy is not None:
+            # Any answer to "Destination filename [...]?" accepts the default
+            source, destination = self.pending_copy
+            self.pending_copy = None
+            file_system, _, name = destination.partition(":")
+            if file_system == "flash" and name in switch.flash:
+                self.pending_overwrite = (source, destination)
+                return "%Warning:There is a file already existing with this name\nDo you want to over write? [confirm]"
+            return self._copy(source, destination)
+        if command.startswith("copy ") and len(command.split()) == 3:
+            self.pending_copy = tuple(command.split()[1:])
+            output = f"Destination filename [{self.pending_copy[1].partition(':')[2] or self.pending_copy[1]}]? "
+        elif command.startswith("configure replace "):
+            output = self._configure_replace(command.split()[2])
+        elif command.startswith("delete "):
+            path = command.split()[-1]
+            file_system, _, name = path.partition(":")
+            if file_system != "flash" or switch.flash.pop(name, None) is None:
+                output = f"%Error deleting {path} (No such file or directory)"
+            else:
+                output = ""
+        elif command == "show ip interface brief":
+            output = generate_ip_interface_brief(switch.port_count, switch.statuses())
+        elif command == "show vlan brief":
+            output = generate_vlan_brief(switch.vlans, switch.port_count)
+        elif command == "show interfaces status":
+            output = generate_interfaces_status(switch.port_count)
+        elif command == "show interfaces description":
+            output = generate_interfaces_description(switch.port_count)
+        elif command == "show interfaces counters":
+            switch.counter_tick += 1
+            output = generate_interfaces_counters(switch.port_count, switch.counter_tick)
+        elif command == "show interfaces counters errors":
+            output = generate_interfaces_counters_errors(switch.port_count, switch.counter_tick)
+        elif command == "show mac address-table":
+            output = generate_mac_address_table(switch.port_count)
+        elif command == "show ip arp":
+            output = generate_ip_arp(switch.port_count)
+        elif command in ("show running-config", "show run"):
+            output = switch.running_config()
+        elif command == "show tech-support":
+            output = generate_tech_support(switch, self.tech_repeat)
+        elif command.startswith("show interfaces ") and command.endswith(" switchport"):
+            name = command.split()[2]
+            if name not in switch.interfaces:
+                output = invalid_input
+            else:
+                lines = switch.interfaces[name]["lines"]
+                output = (f"Name: {short_interface_name(name)}\nSwitchport: Enabled\n"
+                          f"Administrative Mode: {lines.get('switchport mode', 'switchport mode dynamic auto').split()[-1]}\n"
+                          f"Access Mode VLAN: {lines.get('switchport access vlan', 'switchport access vlan 1').split()[-1]}")
+        elif command.startswith("show "):
+            output = ""
+        else:
+            output = invalid_input
+        return output
+
+    def send_config_set(self, commands, **kwargs):
+        read_timeout = kwargs.get("read_timeout")
+        if not self.netmiko_timing:
+            self._wait(len(commands), read_timeout)
+        else:
+            self._wait(read_timeout=read_timeout)
+            if kwargs.get("cmd_verify", True):
+                for _ in commands:
+                    self._wait(1, read_timeout)
+            else:
+                self._wait(len(commands), read_timeout)
+            self._wait(read_timeout=read_timeout)
+        return self._reply("\n".join(self._apply_config(commands)))
+
+    def _apply_config(self, commands):
+        # Applies config lines to the switch and returns the config-mode echo, error lines included
+        switch = self.switch
+        echo = [f"{switch.hostname}(config)#"]
+        prompt = "config"
+        context = []
+        for command in commands:
+            self.config_lines.append(command)
+            echo.append(f"{switch.hostname}({prompt})#{command}")
+            words = command.split()
+            if not words:
+                continue
+            error = None
+            if words[0] == "vlan" and len(words) == 2:
+                try:
+                    vlans = parse_vlan_spec(words[1])
+                except ValueError:
+                    vlans = []
+                    error = invalid_input
+                for vlan in vlans:
+                    switch.vlans.setdefault(vlan, f"VLAN{vlan:04}")
+                context = [("vlan", vlan) for vlan in vlans]
+                prompt = "config-vlan"
+            elif words[0] == "name" and context and context[0][0] == "vlan":
+                for _, vlan in context:
+                    switch.vlans[vlan] = " ".join(words[1:])
+            elif words[:2] == ["interface", "range"] or words[0] == "interface":
+                names = expand_range_spec(" ".join(words[2:])) if words[1] == "range" else [" ".join(words[1:])]
+                if not all(name in switch.interfaces for name in names):
+                    error = invalid_input
+                    context = []
+                    prompt = "config"
+                else:
+                    context = [("interface", name) for name in names]
+                    prompt = "config-if-range" if words[1] == "range" else "config-if"
+            elif words[:2] == ["no", "vlan"] and len(words) == 3:
+                try:
+                    vlans = parse_vlan_spec(words[2])
+                except ValueError:
+                    vlans = []
+                    error = invalid_input
+                for vlan in vlans:
+                    switch.vlans.pop(vlan, None)
+                context = []
+                prompt = "config"
+            elif words[0] in ("exit", "end"):
+                context = []
+                prompt = "config"
+            elif context and context[0][0] == "interface":
+                for _, name in context:
+                    interface = switch.interfaces[name]
+                    if command in ("shutdown", "no shutdown"):
+                        switch.set_shutdown(name, command == "shutdown")
+                    elif words[0] == "no":
+                        key = " ".join(words[1:] if "mac-address" in command else words[1:-1]) or words[1]
+                        interface["lines"].pop(key, None)
+                    else:
+                        keyed = len(words) > 1 and "mac-address" not in command and words[-1] != "port-security"
+                        key = " ".join(words[:-1]) if keyed else command
+                        interface["lines"][key] = command
+            elif not re.match(r"^(hostname|ip|no|spanning-tree|service|logging|snmp-server|username)\b", command):
+                error = invalid_input
+            if error:
+                echo.append(error)
+        echo.append(f"{switch.hostname}(config)#end")
+        echo.append(f"{switch.hostname}#")
+        return echo
+
+    def save_config(self, *args, **kwargs):
+        self._wait()
+        self.switch.saves += 1
+        return self._reply("write mem\nBuilding configuration...\n[OK]")
+
+    def is_alive(self):
+        return self.alive
+
+    def disconnect(self):
+        self.alive = False
+
+
+def fake_connect_handler(latency=0.0, port_count=24, fail_hosts=(), line_latency=0.0, syslog_target=None,
+                         netmiko_timing=False):
+    # Sessions to the same host share one FakeSwitch; the switches are exposed as connect.switches
+    switches = {}
+
+    def connect(**device):
+        host = device.get("host", "fake")
+        if host not in switches:
+            switches[host] = FakeSwitch(host, port_count)
+            switches[host].syslog_target = syslog_target
+        return FakeDevice(
+            host=host,
+            latency=latency,
+            line_latency=line_latency,
+            fail=host in fail_hosts,
+            switch=switches[host],
+            netmiko_timing=netmiko_timing,
+        )
+    connect.switches = switches
+    return connect
+
+
+def config_file_commands(text):
+    # A config file as config-mode lines; "exit" closes each section so the next top-level line is not
+    # taken as one of its settings
+    commands = []
+    in_section = False
+    for line in text.replace("\r", "").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("!") or stripped in ("end", "Building configuration...") \
+                or stripped.startswith("Current configuration"):
+            continue
+        if line[0] == " ":
+            commands.append(stripped)
+            continue
+        if in_section:
+            commands.append("exit")
+        commands.append(stripped)
+        in_section = stripped.startswith(("interface ", "vlan "))
+    return commands
+
+
+def tftp_get(address, port, name, block_size=8192, timeout=2.0):
+    # TFTP client as a switch uses it for "copy tftp://...": read request with the blksize option, one ACK per block
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(timeout)
+    data = []
+    try:
+        client.sendto(struct.pack("!H", 1) + f"{name}\0octet\0blksize\0{block_size}\0".encode('ascii'), (address, port))
+        expected = 1
+        size = 512
+        while True:
+            try:
+                packet, server = client.recvfrom(block_size + 4)
+            except socket.timeout:
+                raise OSError("Timed out")
+            opcode, number = struct.unpack("!HH", packet[:4])
+            if opcode == 5:
+                raise OSError(packet[4:].rstrip(b"\0").decode('ascii', 'replace'))
+            if opcode == 6:
+                options = packet[2:].split(b"\0")
+                size = int(options[options.index(b"blksize") + 1]) if b"blksize" in options else 512
+                client.sendto(struct.pack("!HH", 4, 0), server)
+                continue
+            if opcode != 3:
+                continue
+            if number == expected & 0xffff:
+                data.append(packet[4:])
+                expected += 1
+            client.sendto(struct.pack("!HH", 4, number), server)
+            if number == (expected - 1) & 0xffff and len(packet) - 4 < size:
+                break
+    finally:
+        client.close()
+    return b"".join(data)
+
+
+def fake_file_transfer(ssh_conn, source_file, dest_file, file_system="flash:", direction="put", overwrite_file=False,
+                       **kwargs):
+    # Stand-in for netmiko.file_transfer against a FakeDevice: the existence, space, copy and MD5 checks each cost
+    # a round trip, and the file lands in the switch's flash
+    if direction != "put":
+        raise ValueError("Only put is emulated")
+    with open(source_file, 'rb') as f:
+        data = f.read()
+    for _ in range(4):
+        ssh_conn._wait()
+    exists = dest_file in ssh_conn.switch.flash
+    if exists and not overwrite_file:
+        raise ValueError(f"File already exists and overwrite_file is disabled: {dest_file}")
+    transferred = ssh_conn.switch.flash.get(dest_file) != data
+    ssh_conn.switch.flash[dest_file] = data
+    return {"file_exists": True, "file_transferred": transferred, "file_verified": True}
+
+
+def syslog_message(interface, field, state, sequence=0):
+    # One IOS-style syslog datagram for a link (field "status") or line protocol change
+    stamp = time.strftime("%b %d %H:%M:%S", time.gmtime())
+    if field == "status":
+        severity, facility = (5, "CHANGED") if state == "administratively down" else (3, "UPDOWN")
+        body = f"%LINK-{severity}-{facility}: Interface {interface}, changed state to {state}"
+    else:
+        body = f"%LINEPROTO-5-UPDOWN: Line protocol on Interface {interface}, changed state to {state}"
+    return f"<{187 if field == 'status' else 189}>{sequence}: *{stamp}.000: {body}".encode('ascii')
+
+
+def send_link_flaps(target, count, port_count=48, rate=None, noise=0.0):
+    # Packet generator: count datagrams of random up/down flaps, optionally paced to rate per second
+    # and mixed with a share of unrelated messages that the listener must skip
+    import random
+    names = interface_names(port_count)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.perf_counter()
+    try:
+        for i in range(count):
+            if noise and random.random() < noise:
+                message = f"<189>{i}: %SYS-5-CONFIG_I: Configured from console by admin on vty0".encode('ascii')
+            else:
+                message = syslog_message(random.choice(names), random.choice(("status", "protocol")),
+                                         random.choice(("up", "down")), i)
+            sender.sendto(message, target)
+            if rate:
+                delay = start + (i + 1) / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        sender.close()
+    return time.perf_counter() - start
+
+
+def interface_names(port_count):
+    stack_size = 48
+    return [f"GigabitEthernet{i // stack_size + 1}/0/{i % stack_size + 1}" for i in range(port_count)]
+
+
+def generate_ip_interface_brief(port_count, statuses=None):
+    lines = ["Interface              IP-Address      OK? Method Status                Protocol"]
+    lines.append("Vlan1                  10.0.0.1        YES NVRAM  up                    up")
+    for i, name in enumerate(interface_names(port_count)):
+        status = statuses.get(name, "up") if statuses else ("up", "down", "administratively down")[i % 3]
+        protocol = "up" if status == "up" else "down"
+        lines.append(f"{name:<22} unassigned      YES unset  {status:<21} {protocol}")
+    return "\n".join(lines)
+
+
+def generate_vlan_brief(vlans, port_count=0):
+    lines = [
+        "VLAN Name                             Status    Ports",
+        "---- -------------------------------- --------- -------------------------------",
+    ]
+    ports = [name.replace("GigabitEthernet", "Gi") for name in interface_names(port_count)]
+    for vlan_id, name in sorted(vlans.items(), key=lambda item: int(item[0])):
+        members = ports if str(vlan_id) == "1" else []
+        chunks = [", ".join(members[i:i + 4]) for i in range(0, len(members), 4)] or [""]
+        lines.append(f"{int(vlan_id):<4} {name:<32} active    {chunks[0]}".rstrip())
+        lines.extend(f"{'':<48}{chunk}" for chunk in chunks[1:])
+    return "\n".join(lines)
+
+
+def generate_interfaces_status(port_count):
+    lines = ["Port      Name               Status       Vlan       Duplex  Speed Type"]
+    for i, name in enumerate(interface_names(port_count)):
+        short = name.replace("GigabitEthernet", "Gi")
+        status = ("connected", "notconnect", "disabled")[i % 3]
+        description = f"desk-{i}" if i % 2 else ""
+        lines.append(f"{short:<9} {description:<18} {status:<12} {1 + i % 10:<10} a-full  a-1000 10/100/1000BaseTX")
+    return "\n".join(lines)
+
+
+def generate_interfaces_description(port_count):
+    lines = ["Interface                      Status         Protocol Description"]
+    for i, name in enumerate(interface_names(port_count)):
+        short = name.replace("GigabitEthernet", "Gi")
+        status = ("up", "down", "admin down")[i % 3]
+        protocol = "up" if status == "up" else "down"
+        description = f"AP-{i}" if i % 4 == 0 else (f"desk-{i}" if i % 2 else "")
+        lines.append(f"{short:<30} {status:<14} {protocol:<8} {description}".rstrip())
+    return "\n".join(lines)
+
+
+def generate_interfaces_counters(port_count, tick=0):
+    names = [name.replace("GigabitEthernet", "Gi") for name in interface_names(port_count)]
+    lines = ["", "Port            InOctets    InUcastPkts    InMcastPkts    InBcastPkts"]
+    for i, name in enumerate(names):
+        base = (i + 1) * 1000 * (tick + 1)
+        lines.append(f"{name:<15} {base * 100:>10} {base:>14} {i:>14} {i // 2:>14}")
+    lines.extend(["", "Port           OutOctets   OutUcastPkts   OutMcastPkts   OutBcastPkts"])
+    for i, name in enumerate(names):
+        base = (i + 1) * 800 * (tick + 1)
+        lines.append(f"{name:<15} {base * 100:>10} {base:>14} {i:>14} {i // 2:>14}")
+    return "\n".join(lines)
+
+
+def generate_interfaces_counters_errors(port_count, tick=0, burst_every=60, burst_size=500):
+    # A trickle of FCS errors on every third port, plus a burst on one port every burst_every ticks
+    names = [name.replace("GigabitEthernet", "Gi") for name in interface_names(port_count)]
+    lines = ["", "Port        Align-Err     FCS-Err    Xmit-Err     Rcv-Err  UnderSize  OutDiscards"]
+    for i, name in enumerate(names):
+        bursts = sum(1 for k in range(1, tick // burst_every + 1) if k % port_count == i)
+        fcs = tick * (i % 3 == 0) + bursts * burst_size
+        lines.append(f"{name:<11} {0:>10} {fcs:>11} {0:>11} {fcs:>11} {0:>10} {bursts * 10:>12}")
+    return "\n".join(lines)
+
+
+def generate_mac_address_table(port_count, macs_per_port=1, offset=0):
+    lines = [
+        "          Mac Address Table",
+        "-------------------------------------------",
+        "",
+        "Vlan    Mac Address       Type        Ports",
+        "----    -----------       --------    -----",
+    ]
+    for i, name in enumerate(interface_names(port_count)):
+        short = name.replace("GigabitEthernet", "Gi")
+        for j in range(macs_per_port):
+            value = offset + i * macs_per_port + j
+            mac = f"0011.{value >> 16 & 0xffff:04x}.{value & 0xffff:04x}"
+            lines.append(f" {1 + i % 10:>4}    {mac}    DYNAMIC     {short}")
+    lines.append(f"Total Mac Addresses for this criterion: {port_count * macs_per_port}")
+    return "\n".join(lines)
+
+
+def generate_ip_arp(port_count, offset=0):
+    # One host per access port, matching the addresses in generate_mac_address_table
+    lines = ["Protocol  Address          Age (min)  Hardware Addr   Type   Interface",
+             "Internet  10.0.0.1                -   0011.2233.4455  ARPA   Vlan1"]
+    for i in range(offset, offset + port_count):
+        lines.append(f"Internet  10.{1 + i % 10}.{i >> 8 & 0xff}.{i & 0xff or 1:<14} {i % 240:>3}   "
+                     f"0011.{i >> 16 & 0xffff:04x}.{i & 0xffff:04x}  ARPA   Vlan{1 + i % 10}")
+    return "\n".join(lines)
+
+
+def generate_tech_support(switch, repeat=20):
+    # Stand-in for "show tech-support": the other show outputs repeated under section banners
+    sections = [
+        ("show running-config", switch.running_config()),
+        ("show ip interface brief", generate_ip_interface_brief(switch.port_count, switch.statuses())),
+        ("show vlan brief", generate_vlan_brief(switch.vlans, switch.port_count)),
+        ("show interfaces status", generate_interfaces_status(switch.port_count)),
+        ("show interfaces counters", generate_interfaces_counters(switch.port_count)),
+        ("show mac address-table", generate_mac_address_table(switch.port_count, 4)),
+    ]
+    blocks = []
+    for i in range(repeat):
+        for command, output in sections:
+            blocks.append(f"\n------------------ {command} ({i + 1}) ------------------\n\n{output}")
+    return "\n".join(blocks)
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from timing_profiles import connect_kwargs, config_kwargs
+
+saved_inputs_file = "saved_inputs.json"
+
+
+def load_hosts(path=saved_inputs_file, defaults=None):
+    # Accepts the saved_inputs.json format or a plain text file with one host per line
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        content = f.read()
+    try:
+        return json.loads(content)
+    except ValueError:
+        pass
+
+    defaults = defaults or {}
+    hosts = []
+    for line in content.splitlines():
+        host = line.strip()
+        if not host or host.startswith('#'):
+            continue
+        hosts.append({
+            "host": host,
+            "username": defaults.get("username", ""),
+            "password": defaults.get("password", ""),
+            "secret": defaults.get("secret", "")
+        })
+    return hosts
+
+
+def build_device(data):
+    device = {
+        "device_type": data.get("device_type", "cisco_ios"),
+        "host": data["host"],
+        "username": data.get("username", ""),
+        "password": data.get("password", ""),
+        "secret": data.get("secret", ""),
+    }
+    # Hosts from the inventory carry their calibrated timing profile
+    if data.get("timing"):
+        device.update(connect_kwargs(data["timing"]))
+    return device
+
+
+def run_on_host(data, commands, connect_handler=None, save=True):
+    if connect_handler is None:
+        from netmiko import ConnectHandler
+        connect_handler = ConnectHandler
+
+    start = time.time()
+    result = {"host": data["host"], "ok": False, "output": "", "error": None, "elapsed": 0.0}
+    net_connect = None
+    try:
+        net_connect = connect_handler(**build_device(data))
+        net_connect.enable()
+        output = net_connect.send_config_set(commands, **(config_kwargs(data["timing"]) if data.get("timing") else {}))
+        if save:
+            output += "\n" + net_connect.save_config()
+        result["output"] = output
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if net_connect is not None:
+            try:
+                net_connect.disconnect()
+            except Exception:
+                pass
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def run_fleet(hosts, commands, workers=10, on_result=None, connect_handler=None, save=True):
+    results = []
+    if not hosts:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as pool:
+        futures = [pool.submit(run_on_host, data, commands, connect_handler, save) for data in hosts]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def plan_waves(hosts, canary_size=1, wave_size=None):
+    if not hosts:
+        return []
+    canary_size = max(1, canary_size)
+    waves = [hosts[:canary_size]]
+    remaining = hosts[canary_size:]
+    if not wave_size:
+        wave_size = len(remaining)
+    for i in range(0, len(remaining), max(1, wave_size)):
+        waves.append(remaining[i:i + wave_size])
+    return waves
+
+
+def staged_rollout(hosts, commands, workers=10, canary_size=1, wave_size=None, max_failures=0,
+                   on_result=None, on_wave=None, connect_handler=None, save=True):
+    start = time.time()
+    waves = plan_waves(hosts, canary_size, wave_size)
+    summary = {"waves": len(waves), "completed_waves": 0, "succeeded": [], "failed": [], "skipped": [], "elapsed": 0.0}
+
+    for index, wave in enumerate(waves):
+        if on_wave:
+            on_wave(index, wave)
+        results = run_fleet(wave, commands, workers, on_result, connect_handler, save)
+        summary["completed_waves"] += 1
+        for result in results:
+            key = "succeeded" if result["ok"] else "failed"
+            summary[key].append(result["host"])
+
+        # Halt the rollout once failures exceed the allowed budget
+        if len(summary["failed"]) > max_failures:
+            for later_wave in waves[index + 1:]:
+                summary["skipped"].extend(data["host"] for data in later_wave)
+            break
+
+    summary["elapsed"] = time.time() - start
+    return summary
+
+
+def format_summary(summary):
+    return (f"{len(summary['succeeded'])} succeeded, {len(summary['failed'])} failed, "
+            f"{len(summary['skipped'])} skipped in {summary['completed_waves']}/{summary['waves']} waves "
+            f"({summary['elapsed']:.1f}s)")
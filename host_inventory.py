@@ -0,0 +1,205 @@
+import json
+import os
+import sqlite3
+import time
+
+import credential_store
+
+inventory_file = "inventory.db"
+legacy_inputs_file = "saved_inputs.json"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY COLLATE NOCASE,
+    username TEXT NOT NULL DEFAULT '',
+    device_type TEXT NOT NULL DEFAULT 'cisco_ios',
+    description TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL,
+    timing TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    host TEXT NOT NULL COLLATE NOCASE REFERENCES hosts(host) ON DELETE CASCADE,
+    PRIMARY KEY (tag, host)
+);
+CREATE INDEX IF NOT EXISTS tags_by_host ON tags(host);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def parse_query(text):
+    # "tag:core sw-" -> ("sw-", ["core"])
+    tags = []
+    words = []
+    for word in text.split():
+        if word.lower().startswith("tag:") and len(word) > 4:
+            tags.append(word[4:])
+        else:
+            words.append(word)
+    return " ".join(words), tags
+
+
+def _host_data(row):
+    data = dict(row)
+    data["timing"] = json.loads(data["timing"]) if data.get("timing") else None
+    return data
+
+
+class HostInventory:
+    # SQLite-backed host list: lookups and prefix searches use the primary key index, writes touch one row.
+    # Passwords and secrets never go in the database; they are kept in the OS keyring when available.
+    def __init__(self, path=inventory_file):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(_schema)
+        # Databases created before timing profiles were stored per host
+        if "timing" not in [row[1] for row in self.db.execute("PRAGMA table_info(hosts)")]:
+            with self.db:
+                self.db.execute("ALTER TABLE hosts ADD COLUMN timing TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM hosts").fetchone()[0]
+
+    def _row(self, row):
+        if row is None:
+            return None
+        data = _host_data(row)
+        data["tags"] = self.host_tags(data["host"])
+        return data
+
+    def get(self, host):
+        return self._row(self.db.execute("SELECT * FROM hosts WHERE host = ?", (host,)).fetchone())
+
+    def add(self, host, username="", device_type="cisco_ios", description="", tags=(), replace=False):
+        # Returns False when the host exists and replace is not set
+        with self.db:
+            if replace:
+                self.db.execute(
+                    "INSERT INTO hosts (host, username, device_type, description, updated) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(host) DO UPDATE SET username = excluded.username, device_type = excluded.device_type, "
+                    "description = excluded.description, updated = excluded.updated",
+                    (host, username, device_type, description, time.time()))
+            else:
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO hosts (host, username, device_type, description, updated) VALUES (?, ?, ?, ?, ?)",
+                    (host, username, device_type, description, time.time()))
+                if cursor.rowcount == 0:
+                    return False
+            self.db.executemany("INSERT OR IGNORE INTO tags (tag, host) VALUES (?, ?)", [(tag, host) for tag in tags])
+        return True
+
+    def set_timing(self, host, profile):
+        # Calibrated timing profile (see timing_profiles), reused on the next connect
+        with self.db:
+            return bool(self.db.execute("UPDATE hosts SET timing = ? WHERE host = ?",
+                                        (json.dumps(profile) if profile else "", host)).rowcount)
+
+    def delete(self, host):
+        with self.db:
+            deleted = self.db.execute("DELETE FROM hosts WHERE host = ?", (host,)).rowcount
+        credential_store.delete_credentials(host)
+        return bool(deleted)
+
+    def host_tags(self, host):
+        return [row[0] for row in self.db.execute("SELECT tag FROM tags WHERE host = ? ORDER BY tag", (host,))]
+
+    def set_tags(self, host, tags):
+        with self.db:
+            self.db.execute("DELETE FROM tags WHERE host = ?", (host,))
+            self.db.executemany("INSERT OR IGNORE INTO tags (tag, host) VALUES (?, ?)", [(tag, host) for tag in tags])
+
+    def tags(self):
+        return [(row[0], row[1]) for row in self.db.execute("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY tag")]
+
+    def search(self, text="", limit=200, offset=0):
+        # Host-name prefix matches come first and use the index; substring and description matches fill the rest
+        text, tags = parse_query(text)
+        join, params = self._tag_join(tags)
+
+        if not text:
+            rows = self.db.execute(f"SELECT hosts.* FROM hosts{join} ORDER BY hosts.host LIMIT ? OFFSET ?",
+                                   params + [limit, offset]).fetchall()
+            return [dict(row) for row in rows]
+
+        rows = self.db.execute(
+            f"SELECT hosts.* FROM hosts{join} WHERE hosts.host >= ? AND hosts.host < ? ORDER BY hosts.host LIMIT ?",
+            params + [text, text + "\U0010ffff", limit + offset]).fetchall()
+        if len(rows) < limit + offset:
+            rows += self.db.execute(
+                f"SELECT hosts.* FROM hosts{join} WHERE NOT (hosts.host >= ? AND hosts.host < ?) "
+                f"AND (instr(lower(hosts.host), ?) OR instr(lower(hosts.description), ?)) ORDER BY hosts.host LIMIT ?",
+                params + [text, text + "\U0010ffff", text.lower(), text.lower(), limit + offset - len(rows)]).fetchall()
+        return [dict(row) for row in rows[offset:]]
+
+    def count(self, text=""):
+        # Same matches as search(), counted in SQLite instead of fetched
+        text, tags = parse_query(text)
+        if not text and not tags:
+            return len(self)
+        join, params = self._tag_join(tags)
+        if not text:
+            return self.db.execute(f"SELECT COUNT(*) FROM hosts{join}", params).fetchone()[0]
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM hosts{join} WHERE (hosts.host >= ? AND hosts.host < ?) "
+            f"OR instr(lower(hosts.host), ?) OR instr(lower(hosts.description), ?)",
+            params + [text, text + "\U0010ffff", text.lower(), text.lower()]).fetchone()[0]
+
+    @staticmethod
+    def _tag_join(tags):
+        # One join per "tag:" term, so a host must carry every tag
+        join = ""
+        params = []
+        for i, tag in enumerate(tags):
+            join += f" JOIN tags t{i} ON t{i}.host = hosts.host AND t{i}.tag = ?"
+            params.append(tag)
+        return join, params
+
+    def hosts(self, tag=None):
+        # Full entries with credentials, as used by the fleet runner
+        if tag:
+            rows = self.db.execute("SELECT hosts.* FROM hosts JOIN tags ON tags.host = hosts.host AND tags.tag = ? "
+                                   "ORDER BY hosts.host", (tag,)).fetchall()
+        else:
+            rows = self.db.execute("SELECT * FROM hosts ORDER BY host").fetchall()
+        hosts = []
+        for row in rows:
+            data = _host_data(row)
+            data["password"], data["secret"] = credential_store.load_credentials(data["host"])
+            hosts.append(data)
+        return hosts
+
+    def import_json(self, path=legacy_inputs_file):
+        # Imports saved_inputs.json once; passwords move to the keyring when it is available and are dropped otherwise.
+        # Returns (imported, skipped, credentials_stored)
+        if not os.path.exists(path) or self.db.execute("SELECT 1 FROM meta WHERE key = ?", (f"imported:{path}",)).fetchone():
+            return 0, 0, 0
+        with open(path, 'r') as f:
+            saved_inputs = json.load(f)
+
+        imported = skipped = stored = 0
+        with self.db:
+            for data in saved_inputs:
+                host = data.get("host", "").strip()
+                if not host:
+                    continue
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO hosts (host, username, device_type, description, updated) VALUES (?, ?, ?, ?, ?)",
+                    (host, data.get("username", ""), data.get("device_type", "cisco_ios"), data.get("description", ""), time.time()))
+                if cursor.rowcount == 0:
+                    skipped += 1
+                    continue
+                imported += 1
+                self.db.executemany("INSERT OR IGNORE INTO tags (tag, host) VALUES (?, ?)",
+                                    [(tag, host) for tag in data.get("tags", [])])
+                if (data.get("password") or data.get("secret")) and credential_store.save_credentials(
+                        host, data.get("password", ""), data.get("secret", "")):
+                    stored += 1
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"imported:{path}", str(time.time())))
+        return imported, skipped, stored
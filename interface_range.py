@@ -0,0 +1,150 @@
+import re
+
+# IOS accepts at most five comma-separated ranges in one "interface range" command
+max_ranges_per_command = 5
+
+abbreviations = {
+    "GigabitEthernet": "Gi",
+    "FastEthernet": "Fa",
+    "TenGigabitEthernet": "Te",
+    "TwentyFiveGigE": "Twe",
+    "FortyGigabitEthernet": "Fo",
+    "HundredGigE": "Hu",
+    "AppGigabitEthernet": "Ap",
+    "Ethernet": "Et",
+    "Port-channel": "Po",
+    "Vlan": "Vl",
+    "Loopback": "Lo",
+    "Tunnel": "Tu",
+}
+
+_interface_name = re.compile(r"^([A-Za-z-]+)((?:\d+/)*)(\d+)$")
+_selection_token = re.compile(r"^([A-Za-z-]+)\s*((?:\d+/)*)(\d+)(?:\s*-\s*(\d+))?$")
+
+
+def split_interface(name):
+    match = _interface_name.match(name)
+    if match is None:
+        return None
+    return match.group(1), match.group(2), int(match.group(3))
+
+
+def short_interface_name(name):
+    parts = split_interface(name)
+    if parts is None:
+        return name
+    return f"{abbreviations.get(parts[0], parts[0][:2])}{parts[1]}{parts[2]}"
+
+
+def is_multi_selection(selection):
+    return "," in selection or selection.startswith("desc:") or re.search(r"\d\s*-\s*\d", selection) is not None
+
+
+def expand_selection(selection, interfaces, descriptions=None):
+    # "Gi1/0/1-24, Gi1/0/30, desc:^AP-" -> full interface names from the inventory
+    descriptions = descriptions or {}
+    selected = []
+    seen = set()
+    for token in selection.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if token.startswith("desc:"):
+            pattern = re.compile(token[5:], re.I)
+            matches = [name for name in interfaces
+                       if pattern.search(descriptions.get(name) or descriptions.get(short_interface_name(name), ""))]
+        elif token in interfaces:
+            matches = [token]
+        else:
+            match = _selection_token.match(token)
+            if match is None:
+                raise ValueError(f"Unrecognised interface selection: {token}")
+            kind, slot, start = match.group(1).lower(), match.group(2), int(match.group(3))
+            end = int(match.group(4)) if match.group(4) else start
+            matches = []
+            for name in interfaces:
+                parts = split_interface(name)
+                if parts and parts[0].lower().startswith(kind) and parts[1] == slot and start <= parts[2] <= end:
+                    matches.append(name)
+        for name in matches:
+            if name not in seen:
+                seen.add(name)
+                selected.append(name)
+    return selected
+
+
+def group_interface_ranges(interfaces, max_ranges=max_ranges_per_command):
+    # Returns [(range spec, [member interfaces]), ...] with at most max_ranges segments per spec
+    segments = []
+    for name in sorted(interfaces, key=lambda name: split_interface(name) or (name, "", 0)):
+        parts = split_interface(name)
+        last = segments[-1] if segments else None
+        if parts and last and last[0] == parts[0] and last[1] == parts[1] and last[3] + 1 == parts[2]:
+            last[3] = parts[2]
+            last[4].append(name)
+        elif parts:
+            segments.append([parts[0], parts[1], parts[2], parts[2], [name]])
+        else:
+            segments.append([name, "", None, None, [name]])
+
+    blocks = []
+    for i in range(0, len(segments), max_ranges):
+        texts = []
+        members = []
+        for kind, slot, start, end, names in segments[i:i + max_ranges]:
+            if start is None:
+                texts.append(kind)
+            else:
+                texts.append(f"{kind}{slot}{start}" + (f" - {end}" if end > start else ""))
+            members.extend(names)
+        blocks.append((", ".join(texts), members))
+    return blocks
+
+
+def expand_range_spec(spec):
+    names = []
+    for segment in spec.split(","):
+        segment = segment.strip()
+        match = _selection_token.match(segment)
+        if match is None:
+            if segment:
+                names.append(segment)
+            continue
+        start = int(match.group(3))
+        end = int(match.group(4)) if match.group(4) else start
+        names.extend(f"{match.group(1)}{match.group(2)}{port}" for port in range(start, end + 1))
+    return names
+
+
+def build_range_commands(blocks, lines):
+    commands = []
+    for spec, _ in blocks:
+        commands.append(f"interface range {spec}")
+        commands.extend(lines)
+    return commands
+
+
+def parse_range_echo(output, blocks):
+    # Maps each interface to None on success or the IOS error printed under its "interface range" block
+    results = {}
+    output_lines = output.splitlines()
+    positions = []
+    search_from = 0
+    for spec, members in blocks:
+        command = f"interface range {spec}"
+        position = next((i for i in range(search_from, len(output_lines)) if command in output_lines[i]), None)
+        positions.append(position)
+        if position is not None:
+            search_from = position + 1
+
+    for index, (spec, members) in enumerate(blocks):
+        start = positions[index]
+        if start is None:
+            error = "No confirmation from device"
+        else:
+            end = next((p for p in positions[index + 1:] if p is not None), len(output_lines))
+            errors = [line.strip() for line in output_lines[start + 1:end] if line.strip().startswith("%")]
+            error = "; ".join(errors) or None
+        for name in members:
+            results[name] = error
+    return results
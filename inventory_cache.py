@@ -0,0 +1,67 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+inventory_cache_dir = "inventory_cache"
+
+
+class InventoryCache:
+    # Last known "show ip interface brief" / "show vlan brief" per host, zlib-compressed on disk,
+    # so the UI can show a device before (or without) a round trip. Files are rewritten only on change.
+    def __init__(self, directory=inventory_cache_dir):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.saved = {}
+
+    def _path(self, host):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', host) or "default"
+        return os.path.join(self.directory, f"{name}.snap")
+
+    def load(self, host):
+        # Returns {"interfaces": ..., "vlans": ..., "taken": ...} or None
+        try:
+            with open(self._path(host), 'rb') as f:
+                snapshot = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        except (OSError, ValueError, zlib.error):
+            return None
+        with self.lock:
+            self.saved[host] = (snapshot["interfaces"], snapshot["vlans"])
+        return snapshot
+
+    def save(self, host, snapshot):
+        # Returns True when the snapshot differed from the stored one and was written
+        key = (snapshot["interfaces"], snapshot["vlans"])
+        with self.lock:
+            if self.saved.get(host) == key:
+                return False
+            self.saved[host] = key
+        data = zlib.compress(json.dumps({"interfaces": key[0], "vlans": key[1], "taken": time.time()}).encode('utf-8'), 6)
+        path = self._path(host)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return True
+
+    def delete(self, host):
+        with self.lock:
+            self.saved.pop(host, None)
+        try:
+            os.remove(self._path(host))
+        except OSError:
+            pass
+
+
+def format_age(taken):
+    seconds = max(0, time.time() - taken)
+    if seconds < 120:
+        return f"{seconds:.0f}s ago"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 172800:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} days ago"
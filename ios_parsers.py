@@ -0,0 +1,123 @@
+import re
+from collections import namedtuple
+
+IpInterface = namedtuple("IpInterface", "interface ip_address ok method status protocol")
+Vlan = namedtuple("Vlan", "vlan_id name status ports")
+InterfaceStatus = namedtuple("InterfaceStatus", "interface name status vlan duplex speed type")
+InterfaceCounters = namedtuple(
+    "InterfaceCounters",
+    "interface in_octets in_ucast in_mcast in_bcast out_octets out_ucast out_mcast out_bcast"
+)
+InterfaceErrors = namedtuple("InterfaceErrors", "interface align fcs xmit rcv undersize out_discards")
+MacEntry = namedtuple("MacEntry", "vlan mac type interface")
+InterfaceDescription = namedtuple("InterfaceDescription", "interface status protocol description")
+ArpEntry = namedtuple("ArpEntry", "ip_address age mac interface")
+
+# Templates are compiled once and applied to the whole output with findall,
+# so each line is scanned a single time by the regex engine (IOS pads columns with spaces only)
+_ip_interface_brief = re.compile(
+    r"^(\S+) +(\S+) +(YES|NO) +(\S+) +(up|down|administratively down|deleted) +(\S+) *$",
+    re.M
+)
+_vlan_brief = re.compile(
+    r"^(\d{1,4}) +(\S+) +(\S+) *(.*(?:\n +\S.*)*)",
+    re.M
+)
+_interfaces_status = re.compile(
+    r"^(\S+) +(.*?) *(connected|notconnect|disabled|err-disabled|inactive|monitoring|sfpAbsent|suspended)"
+    r" +(\S+) +(\S+) +(\S+) *(.*?) *$",
+    re.M
+)
+_counters_header = re.compile(r"^Port +(In|Out)Octets.*$", re.M)
+_counters_row = re.compile(r"^(\S+) +(\d+) +(\d+) +(\d+) +(\d+) *$", re.M)
+_errors_header = re.compile(r"^Port +Align-Err +FCS-Err.*$", re.M)
+_errors_row = re.compile(r"^(\S+) +(\d+) +(\d+) +(\d+) +(\d+) +(\d+) +(\d+) *$", re.M)
+_next_port_header = re.compile(r"^Port +\S", re.M)
+_mac_address_table = re.compile(
+    r"^[ *]*(\d{1,4}) +([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}) +(\S+) +(?:\S+ +)*?(\S+) *$",
+    re.M
+)
+_interfaces_description = re.compile(
+    r"^(\S+) +(up|down|admin down|deleted) +(up|down|notpresent) *(.*?) *$",
+    re.M
+)
+_ip_arp = re.compile(
+    r"^Internet +(\d+\.\d+\.\d+\.\d+) +(\S+) +([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}) +\S+ +(\S+) *$",
+    re.M
+)
+_port_separator = re.compile(r"[,\s]+")
+
+
+def parse_ip_interface_brief(output):
+    return list(map(IpInterface._make, _ip_interface_brief.findall(output)))
+
+
+def parse_vlan_brief(output):
+    vlans = []
+    for vlan_id, name, status, ports in _vlan_brief.findall(output):
+        ports = tuple(port for port in _port_separator.split(ports) if port)
+        vlans.append(Vlan(int(vlan_id), name, status, ports))
+    return vlans
+
+
+def parse_interfaces_status(output):
+    return list(map(InterfaceStatus._make, _interfaces_status.findall(output)))
+
+
+def parse_interfaces_counters(output):
+    # The command prints an input table followed by an output table; merge them per port
+    headers = list(_counters_header.finditer(output))
+    tables = {"In": {}, "Out": {}}
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(output)
+        rows = tables[header.group(1)]
+        for port, octets, ucast, mcast, bcast in _counters_row.findall(output, header.end(), end):
+            rows[port] = (int(octets), int(ucast), int(mcast), int(bcast))
+
+    counters = []
+    empty = (0, 0, 0, 0)
+    for port, inbound in tables["In"].items():
+        counters.append(InterfaceCounters(port, *inbound, *tables["Out"].get(port, empty)))
+    for port, outbound in tables["Out"].items():
+        if port not in tables["In"]:
+            counters.append(InterfaceCounters(port, *empty, *outbound))
+    return counters
+
+
+def parse_interfaces_counters_errors(output):
+    # Only the first table (Align-Err ... OutDiscards); the collision table that some platforms print next is skipped
+    header = _errors_header.search(output)
+    if header is None:
+        return []
+    following = _next_port_header.search(output, header.end())
+    end = following.start() if following else len(output)
+    return [InterfaceErrors(port, *map(int, values))
+            for port, *values in _errors_row.findall(output, header.end(), end)]
+
+
+def parse_mac_address_table(output):
+    return [MacEntry(int(vlan), mac.lower(), kind, interface)
+            for vlan, mac, kind, interface in _mac_address_table.findall(output)]
+
+
+def parse_interfaces_description(output):
+    return list(map(InterfaceDescription._make, _interfaces_description.findall(output)))
+
+
+def parse_ip_arp(output):
+    # Incomplete entries have no hardware address and are skipped
+    return [ArpEntry(ip, age, mac.lower(), interface) for ip, age, mac, interface in _ip_arp.findall(output)]
+
+
+def update_ip_interface_brief(output, changes):
+    # Rewrites the Status/Protocol columns of "show ip interface brief" output in place of a refetch;
+    # changes maps an interface name to {"status": ..., "protocol": ...} (either key may be missing)
+    def replace(match):
+        change = changes.get(match.group(1))
+        if not change:
+            return match.group(0)
+        status = change.get("status", match.group(5))
+        protocol = change.get("protocol", "down" if status != "up" else match.group(6))
+        return f"{match.group(1):<22} {match.group(2):<15} {match.group(3):<3} {match.group(4):<6} {status:<21} {protocol}"
+
+    return _ip_interface_brief.sub(replace, output)
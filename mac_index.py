@@ -0,0 +1,218 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fleet import build_device
+from interface_range import short_interface_name
+from ios_parsers import parse_mac_address_table, parse_ip_arp
+
+index_file = "mac_index.db"
+# Ports that learned more MACs than this are treated as uplinks when locating a MAC
+uplink_threshold = 8
+
+MacLocation = namedtuple("MacLocation", "mac host interface vlan port_macs seen")
+
+_schema = """
+CREATE TABLE IF NOT EXISTS macs (
+    mac TEXT NOT NULL,
+    host TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    vlan INTEGER NOT NULL,
+    PRIMARY KEY (host, mac, vlan)
+);
+CREATE TABLE IF NOT EXISTS arp (
+    ip TEXT NOT NULL,
+    mac TEXT NOT NULL,
+    host TEXT NOT NULL,
+    PRIMARY KEY (host, ip)
+);
+CREATE TABLE IF NOT EXISTS collected (host TEXT PRIMARY KEY, seen REAL NOT NULL);
+"""
+
+_mac_digits = re.compile(r"[^0-9a-f]")
+_ip_address = re.compile(r"^\d{1,3}(\.\d{1,3}){3}$")
+
+
+def normalize_mac(text):
+    # "00:11:22:33:44:55", "0011.2233.4455" and "00-11-22-33-44-55" all become "0011.2233.4455"
+    digits = _mac_digits.sub("", text.lower())
+    if len(digits) != 12:
+        raise ValueError(f"Not a MAC address: {text}")
+    return f"{digits[0:4]}.{digits[4:8]}.{digits[8:12]}"
+
+
+class MacIndex:
+    # Lookups are answered from dictionaries in memory; SQLite keeps a copy so the index survives restarts.
+    # Each collection replaces only the rows of the hosts it visited.
+    def __init__(self, path=index_file):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(_schema)
+        self.macs = {}          # mac -> {(host, interface, vlan)}
+        self.ports = {}         # (host, interface) -> {mac}
+        self.host_ports = {}    # host -> {interface}
+        self.ips = {}           # ip -> {host: mac}
+        self.host_ips = {}      # host -> {ip}
+        self.seen = {}          # host -> time of the last collection
+        self.loaded = False
+
+    def _load(self):
+        # Deferred to the first use (called with the lock held) so a large index does not slow startup
+        if self.loaded:
+            return
+        for mac, host, interface, vlan in self.db.execute("SELECT mac, host, interface, vlan FROM macs"):
+            self._add_mac(mac, host, interface, vlan)
+        for ip, mac, host in self.db.execute("SELECT ip, mac, host FROM arp"):
+            self.ips.setdefault(ip, {})[host] = mac
+            self.host_ips.setdefault(host, set()).add(ip)
+        self.seen = dict(self.db.execute("SELECT host, seen FROM collected"))
+        self.loaded = True
+
+    def close(self):
+        self.db.close()
+
+    def _add_mac(self, mac, host, interface, vlan):
+        self.macs.setdefault(mac, set()).add((host, interface, vlan))
+        self.ports.setdefault((host, interface), set()).add(mac)
+        self.host_ports.setdefault(host, set()).add(interface)
+
+    def _drop_host(self, host):
+        for interface in self.host_ports.pop(host, ()):
+            for mac in self.ports.pop((host, interface)):
+                sightings = self.macs.get(mac)
+                if sightings is not None:
+                    sightings.difference_update({s for s in sightings if s[0] == host})
+                    if not sightings:
+                        del self.macs[mac]
+        for ip in self.host_ips.pop(host, ()):
+            hosts = self.ips.get(ip)
+            if hosts is not None:
+                hosts.pop(host, None)
+                if not hosts:
+                    del self.ips[ip]
+
+    def update_host(self, host, mac_entries, arp_entries, seen=None):
+        # Replaces everything known about one host with a fresh collection
+        seen = seen or time.time()
+        macs = {(entry.mac, short_interface_name(entry.interface), entry.vlan) for entry in mac_entries}
+        arps = {entry.ip_address: entry.mac for entry in arp_entries}
+        with self.lock:
+            self._load()
+            self._drop_host(host)
+            for mac, interface, vlan in macs:
+                self._add_mac(mac, host, interface, vlan)
+            for ip, mac in arps.items():
+                self.ips.setdefault(ip, {})[host] = mac
+            self.host_ips[host] = set(arps)
+            self.seen[host] = seen
+            with self.db:
+                self.db.execute("DELETE FROM macs WHERE host = ?", (host,))
+                self.db.execute("DELETE FROM arp WHERE host = ?", (host,))
+                self.db.executemany("INSERT OR IGNORE INTO macs (mac, host, interface, vlan) VALUES (?, ?, ?, ?)",
+                                    [(mac, host, interface, vlan) for mac, interface, vlan in macs])
+                self.db.executemany("INSERT OR REPLACE INTO arp (ip, mac, host) VALUES (?, ?, ?)",
+                                    [(ip, mac, host) for ip, mac in arps.items()])
+                self.db.execute("INSERT OR REPLACE INTO collected (host, seen) VALUES (?, ?)", (host, seen))
+
+    def locate(self, mac):
+        # Every sighting of the MAC, the most likely access port first: the port with the fewest MACs
+        mac = normalize_mac(mac)
+        with self.lock:
+            self._load()
+            sightings = [MacLocation(mac, host, interface, vlan, len(self.ports[(host, interface)]), self.seen.get(host))
+                         for host, interface, vlan in self.macs.get(mac, ())]
+        return sorted(sightings, key=lambda location: (location.port_macs, location.host, location.interface))
+
+    def lookup(self, query):
+        # A MAC or an IP address; returns (mac or None, [MacLocation])
+        query = query.strip()
+        if _ip_address.match(query):
+            with self.lock:
+                self._load()
+                macs = set(self.ips.get(query, {}).values())
+            if not macs:
+                return None, []
+            mac = macs.pop()
+            return mac, self.locate(mac)
+        mac = normalize_mac(query)
+        return mac, self.locate(mac)
+
+    def ips_for(self, mac):
+        mac = normalize_mac(mac)
+        with self.lock:
+            self._load()
+            return sorted({ip for ip, hosts in self.ips.items() if mac in hosts.values()})
+
+    def suggest_sticky_macs(self, host, interface, limit=uplink_threshold):
+        # MACs currently learned on an access port, as candidates for port-security mac-address entries
+        with self.lock:
+            self._load()
+            macs = self.ports.get((host, short_interface_name(interface)), set())
+            if len(macs) > limit:
+                return []
+            return sorted(macs)
+
+    def stale_hosts(self, hosts, max_age):
+        now = time.time()
+        with self.lock:
+            self._load()
+        return [data for data in hosts if now - self.seen.get(data["host"], 0) > max_age]
+
+    def stats(self):
+        with self.lock:
+            self._load()
+            return {"hosts": len(self.seen), "macs": len(self.macs), "ips": len(self.ips), "ports": len(self.ports)}
+
+
+def collect_on_host(data, connect_handler=None):
+    if connect_handler is None:
+        from netmiko import ConnectHandler
+        connect_handler = ConnectHandler
+
+    start = time.time()
+    result = {"host": data["host"], "ok": False, "macs": [], "arp": [], "error": None, "elapsed": 0.0}
+    net_connect = None
+    try:
+        net_connect = connect_handler(**build_device(data))
+        net_connect.enable()
+        result["macs"] = parse_mac_address_table(net_connect.send_command("show mac address-table"))
+        result["arp"] = parse_ip_arp(net_connect.send_command("show ip arp"))
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if net_connect is not None:
+            try:
+                net_connect.disconnect()
+            except Exception:
+                pass
+    result["elapsed"] = time.time() - start
+    return result
+
+
+def collect_fleet(hosts, index, workers=10, max_age=0, on_result=None, connect_handler=None):
+    # Hosts collected less than max_age seconds ago are skipped, so a refresh only visits stale devices
+    hosts = index.stale_hosts(hosts, max_age) if max_age else hosts
+    results = []
+    if not hosts:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as pool:
+        futures = [pool.submit(collect_on_host, data, connect_handler) for data in hosts]
+        for future in as_completed(futures):
+            result = future.result()
+            if result["ok"]:
+                index.update_host(result["host"], result["macs"], result["arp"])
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def format_index_stats(stats):
+    return f"MAC index: {stats['macs']} MACs, {stats['ips']} IPs on {stats['hosts']} devices"
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+more_prompt = "--More--"
+
+
+def stream_command(connection, command, on_chunk, timeout=600, poll_interval=0.02):
+    # Reads the channel directly instead of send_command, handing complete lines to on_chunk as they arrive.
+    # The echoed command and the trailing prompt are dropped; timeout is the longest silence allowed.
+    prompt = connection.find_prompt().strip()
+    connection.write_channel(command + "\n")
+    pending = ""
+    echo_seen = False
+    total = 0
+    deadline = time.monotonic() + timeout
+    while True:
+        data = connection.read_channel()
+        if not data:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No output from '{command}' for {timeout} seconds")
+            time.sleep(poll_interval)
+            continue
+        deadline = time.monotonic() + timeout
+        pending += data.replace("\r", "")
+        if more_prompt in pending:
+            # Only seen when the session was not set to "terminal length 0"
+            pending = pending.replace(f" {more_prompt} ", "").replace(more_prompt, "")
+            connection.write_channel(" ")
+        if not echo_seen:
+            if "\n" not in pending:
+                continue
+            pending = pending.split("\n", 1)[1]
+            echo_seen = True
+        cut = pending.rfind("\n") + 1
+        if cut:
+            on_chunk(pending[:cut])
+            total += cut
+            pending = pending[cut:]
+        if pending.strip() == prompt:
+            return total
+
+
+class OutputSpool:
+    # Every line is written to a temporary file and only line offsets stay in memory,
+    # so the size of the output does not affect memory use
+    def __init__(self, directory=None, block_size=1 << 20):
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.offsets = array('q', [0])
+        self.size = 0
+        self.block_size = block_size
+        self.lock = threading.Lock()
+
+    def append(self, text):
+        data = text.encode('utf-8', 'replace')
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(data)
+            position = data.find(b"\n")
+            while position != -1:
+                self.offsets.append(self.size + position + 1)
+                position = data.find(b"\n", position + 1)
+            self.size += len(data)
+
+    def line_count(self):
+        # A trailing line without a newline yet still counts
+        with self.lock:
+            return len(self.offsets) - (1 if self.offsets[-1] == self.size else 0)
+
+    def lines(self, start, end):
+        with self.lock:
+            count = len(self.offsets) - (1 if self.offsets[-1] == self.size else 0)
+            start, end = max(0, start), min(end, count)
+            if start >= end:
+                return []
+            end_offset = self.offsets[end] if end < len(self.offsets) else self.size
+            self.file.seek(self.offsets[start])
+            data = self.file.read(end_offset - self.offsets[start])
+        return data.decode('utf-8', 'replace').split("\n")[:end - start]
+
+    def search(self, text, start=0, backwards=False, ignore_case=True):
+        # Returns the index of the first line at or after start (before start when backwards) containing text
+        needle = text.encode('utf-8')
+        if ignore_case:
+            needle = needle.lower()
+        if not needle:
+            return None
+        with self.lock:
+            size = self.size
+            offsets = self.offsets
+            start = max(0, min(start, len(offsets) - 1))
+            if backwards:
+                position = size if start >= len(offsets) else offsets[start]
+                while position > 0:
+                    block_start = max(0, position - self.block_size)
+                    self.file.seek(block_start)
+                    block = self.file.read(position - block_start + len(needle) - 1)
+                    found = (block.lower() if ignore_case else block).rfind(needle, 0, position - block_start + len(needle) - 1)
+                    if found != -1:
+                        return bisect_right(offsets, block_start + found) - 1
+                    position = block_start
+                return None
+            position = offsets[start]
+            while position < size:
+                self.file.seek(position)
+                # Blocks overlap by len(needle) - 1 bytes so matches across a boundary are not missed
+                block = self.file.read(self.block_size + len(needle) - 1)
+                found = (block.lower() if ignore_case else block).find(needle)
+                if found != -1:
+                    return bisect_right(offsets, position + found) - 1
+                position += self.block_size
+        return None
+
+    def save(self, path):
+        with self.lock:
+            self.file.flush()
+            self.file.seek(0)
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(self.file, f)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
@@ -0,0 +1,197 @@
+import tkinter as tk
+from tkinter import filedialog
+
+from output_stream import OutputSpool
+
+
+class OutputViewer:
+    # Shows one page of an OutputSpool at a time; while following, new lines are appended and the oldest
+    # dropped from the Text widget so it never holds more than max_lines, whatever the output size
+    def __init__(self, parent, title, dispatch=None, page_size=2000, max_lines=5000):
+        self.dispatch = dispatch
+        self.page_size = page_size
+        self.max_lines = max_lines
+        self.spool = OutputSpool()
+        self.first = 0
+        self.shown = 0
+        self.match_line = None
+        self.refresh_pending = False
+        self.search_after_id = None
+        self.finished = False
+        self.error = None
+        self.closed = False
+
+        self.popup = tk.Toplevel(parent)
+        self.popup.title(title)
+        self.popup.geometry("900x600")
+        self.popup.protocol("WM_DELETE_WINDOW", self.close)
+
+        toolbar = tk.Frame(self.popup)
+        toolbar.pack(fill='x', padx=5, pady=5)
+        tk.Label(toolbar, text="Find:").pack(side='left')
+        self.search_entry = tk.Entry(toolbar, width=24)
+        self.search_entry.pack(side='left', padx=5)
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
+        self.search_entry.bind("<Return>", lambda e: self.find_next())
+        self.search_entry.bind("<Shift-Return>", lambda e: self.find_previous())
+        tk.Button(toolbar, text="Prev", command=self.find_previous).pack(side='left')
+        tk.Button(toolbar, text="Next", command=self.find_next).pack(side='left', padx=(0, 10))
+        for text, command in (("Top", self.page_top), ("Page Up", self.page_up),
+                              ("Page Down", self.page_down), ("End", self.page_end)):
+            tk.Button(toolbar, text=text, command=command).pack(side='left')
+        self.follow_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(toolbar, text="Follow", variable=self.follow_var, command=self._on_follow).pack(side='left', padx=10)
+        tk.Button(toolbar, text="Save...", command=self.save, bg='lightblue').pack(side='right')
+
+        self.status_label = tk.Label(self.popup, anchor='w', text="Waiting for output...")
+        self.status_label.pack(side='bottom', fill='x', padx=5)
+
+        frame = tk.Frame(self.popup)
+        frame.pack(expand=True, fill='both')
+        self.text = tk.Text(frame, wrap='none')
+        scrollbar = tk.Scrollbar(frame, orient='vertical', command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set, state=tk.DISABLED)
+        self.text.tag_configure('match', background='yellow')
+        scrollbar.pack(side='right', fill='y')
+        self.text.pack(side='left', expand=True, fill='both')
+
+    def append(self, chunk):
+        # Safe to call from the device worker: the spool is locked and the redraw is coalesced onto the Tk thread
+        if self.closed:
+            return
+        self.spool.append(chunk)
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            if self.dispatch:
+                self.dispatch(self.refresh)
+            else:
+                self.popup.after_idle(self.refresh)
+
+    def finish(self, error=None):
+        self.finished = True
+        self.error = error
+        if not self.closed:
+            self.refresh()
+
+    def refresh(self):
+        self.refresh_pending = False
+        if self.closed:
+            return
+        total = self.spool.line_count()
+        if self.follow_var.get():
+            end = self.first + self.shown
+            # The last shown line may have been partial, so it is re-read with the new lines
+            start = max(self.first, end - 1)
+            new_lines = self.spool.lines(start, total)
+            if new_lines:
+                self.text.config(state=tk.NORMAL)
+                self.text.delete(f"{start - self.first + 1}.0", tk.END)
+                self.text.insert(tk.END, "\n".join(new_lines))
+                self.shown = total - self.first
+                if self.shown > self.max_lines:
+                    excess = self.shown - self.max_lines
+                    self.text.delete("1.0", f"{excess + 1}.0")
+                    self.first += excess
+                    self.shown -= excess
+                self.text.config(state=tk.DISABLED)
+                self.text.see(tk.END)
+        self._update_status(total)
+
+    def _update_status(self, total=None):
+        total = self.spool.line_count() if total is None else total
+        state = "done" if self.finished else "streaming"
+        if self.finished and self.error:
+            state = f"stopped: {self.error}"
+        self.status_label.config(text=f"Lines {self.first + 1}-{self.first + self.shown} of {total} "
+                                      f"({self.spool.size / 1024:.0f} KB, {state})")
+
+    def show_page(self, first):
+        total = self.spool.line_count()
+        first = max(0, min(first, max(0, total - self.page_size)))
+        lines = self.spool.lines(first, first + self.page_size)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "\n".join(lines))
+        self.text.config(state=tk.DISABLED)
+        self.first = first
+        self.shown = len(lines)
+        self._update_status(total)
+
+    def _stop_following(self):
+        self.follow_var.set(False)
+
+    def _on_follow(self):
+        if self.follow_var.get():
+            self.page_end()
+
+    def page_top(self):
+        self._stop_following()
+        self.show_page(0)
+        self.text.see("1.0")
+
+    def page_up(self):
+        self._stop_following()
+        self.show_page(self.first - self.page_size)
+        self.text.see("1.0")
+
+    def page_down(self):
+        self._stop_following()
+        self.show_page(self.first + self.page_size)
+        self.text.see("1.0")
+
+    def page_end(self):
+        self.show_page(self.spool.line_count() - self.page_size)
+        self.text.see(tk.END)
+
+    def _on_search_key(self, event):
+        if event.keysym in ("Return", "Shift_L", "Shift_R"):
+            return
+        # Incremental search runs once typing pauses and restarts from the top of the current page
+        if self.search_after_id is not None:
+            self.popup.after_cancel(self.search_after_id)
+        self.search_after_id = self.popup.after(150, lambda: self._search(self.first, False))
+
+    def find_next(self):
+        self._search(self.first if self.match_line is None else self.match_line + 1, False)
+
+    def find_previous(self):
+        self._search(self.first + self.shown if self.match_line is None else self.match_line, True)
+
+    def _search(self, start, backwards):
+        self.search_after_id = None
+        text = self.search_entry.get()
+        self.text.tag_remove('match', "1.0", tk.END)
+        if not text:
+            self.match_line = None
+            return
+        line = self.spool.search(text, start, backwards)
+        if line is None and not backwards and start > 0:
+            line = self.spool.search(text, 0)
+        if line is None:
+            self.match_line = None
+            self.status_label.config(text=f"'{text}' not found")
+            return
+        self.match_line = line
+        if not self.first <= line < self.first + self.shown:
+            self._stop_following()
+            self.show_page(line - self.page_size // 2)
+        index = f"{line - self.first + 1}.0"
+        found = self.text.search(text, index, stopindex=f"{index} lineend", nocase=True)
+        if found:
+            self.text.tag_add('match', found, f"{found}+{len(text)}c")
+        self.text.see(index)
+
+    def save(self):
+        path = filedialog.asksaveasfilename(parent=self.popup, defaultextension=".txt",
+                                            filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if path:
+            try:
+                self.spool.save(path)
+                self.status_label.config(text=f"Saved {self.spool.line_count()} lines to {path}")
+            except OSError as e:
+                self.status_label.config(text=f"An error occurred while saving: {e}")
+
+    def close(self):
+        self.closed = True
+        self.popup.destroy()
+        self.spool.close()
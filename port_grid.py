@@ -0,0 +1,135 @@
+import tkinter as tk
+
+up_color = '#00ff00'
+down_color = '#ff0000'
+
+
+def grid_positions(count, width, cell_width, cell_height):
+    columns = max(1, width // cell_width)
+    return [((i % columns) * cell_width, (i // columns) * cell_height) for i in range(count)]
+
+
+def status_color(status):
+    return up_color if status == 'up' else down_color
+
+
+class PortGrid:
+    # Draws every port on one Canvas; refreshes only recolor ports whose status changed
+    def __init__(self, parent, on_double_click=None, cell_width=44, cell_height=54, square_size=30, height=200):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.square_size = square_size
+        self.on_double_click = on_double_click
+
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, height=height, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.order = []
+        self.ports = {}
+        self.items = {}
+        self.width = 0
+        self.tooltip = None
+        self.tooltip_label = None
+        self.tooltip_interface = None
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self._hide_tooltip())
+        self.canvas.bind("<Double-1>", self._on_double_click)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def update(self, statuses):
+        interfaces = [interface for interface, _ in statuses]
+        if interfaces != self.order:
+            self._rebuild(statuses)
+            return len(statuses)
+
+        changed = 0
+        for interface, status in statuses:
+            if self.ports[interface][2] != status:
+                self.set_status(interface, status)
+                changed += 1
+        return changed
+
+    def set_status(self, interface, status):
+        port = self.ports.get(interface)
+        if port is None:
+            return
+        square, text, _ = port
+        self.ports[interface] = (square, text, status)
+        self.canvas.itemconfigure(square, fill=status_color(status))
+        if self.tooltip_interface == interface:
+            self.tooltip_label.config(text=f"{interface}: {status}")
+
+    def status(self, interface):
+        port = self.ports.get(interface)
+        return port[2] if port else None
+
+    def _rebuild(self, statuses):
+        self.canvas.delete('all')
+        self.order = [interface for interface, _ in statuses]
+        self.ports = {}
+        self.items = {}
+        positions = grid_positions(len(statuses), self.width or self.canvas.winfo_width(), self.cell_width, self.cell_height)
+        offset = (self.cell_width - self.square_size) // 2
+        for (interface, status), (x, y) in zip(statuses, positions):
+            square = self.canvas.create_rectangle(x + offset, y + 4, x + offset + self.square_size, y + 4 + self.square_size,
+                                                  fill=status_color(status), outline='')
+            short_interface_name = interface.replace("Ethernet", "e")
+            text = self.canvas.create_text(x + self.cell_width // 2, y + self.square_size + 12,
+                                           text=short_interface_name, font=("Arial", 8))
+            self.ports[interface] = (square, text, status)
+            self.items[square] = interface
+            self.items[text] = interface
+        self.canvas.configure(scrollregion=self.canvas.bbox('all') or (0, 0, 0, 0))
+
+    def _on_configure(self, event):
+        # Re-wrap the existing items when the width changes instead of recreating them
+        if event.width == self.width:
+            return
+        self.width = event.width
+        positions = grid_positions(len(self.order), self.width, self.cell_width, self.cell_height)
+        offset = (self.cell_width - self.square_size) // 2
+        for interface, (x, y) in zip(self.order, positions):
+            square, text, _ = self.ports[interface]
+            self.canvas.coords(square, x + offset, y + 4, x + offset + self.square_size, y + 4 + self.square_size)
+            self.canvas.coords(text, x + self.cell_width // 2, y + self.square_size + 12)
+        self.canvas.configure(scrollregion=self.canvas.bbox('all') or (0, 0, 0, 0))
+
+    def _interface_at(self, event):
+        current = self.canvas.find_withtag('current')
+        return self.items.get(current[0]) if current else None
+
+    def _on_motion(self, event):
+        interface = self._interface_at(event)
+        if interface is None:
+            self._hide_tooltip()
+            return
+        if self.tooltip is None:
+            # One tooltip window is created lazily and reused for every hover
+            self.tooltip = tk.Toplevel(self.canvas)
+            self.tooltip.wm_overrideredirect(True)
+            self.tooltip_label = tk.Label(self.tooltip, background="yellow", relief='solid', borderwidth=1,
+                                          font=("Arial", "10", "normal"))
+            self.tooltip_label.pack()
+        if interface != self.tooltip_interface:
+            self.tooltip_interface = interface
+            self.tooltip_label.config(text=f"{interface}: {self.ports[interface][2]}")
+        self.tooltip.geometry(f"+{event.x_root+10}+{event.y_root+10}")
+        self.tooltip.deiconify()
+
+    def _hide_tooltip(self):
+        if self.tooltip is not None:
+            self.tooltip.withdraw()
+        self.tooltip_interface = None
+
+    def _on_double_click(self, event):
+        interface = self._interface_at(event)
+        if interface is not None and self.on_double_click:
+            self.on_double_click(interface)
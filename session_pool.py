@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionPool:
+    # Keeps authenticated sessions keyed by host; the least recently used one is closed when the pool is full
+    def __init__(self, max_sessions=8, keepalive_interval=60, connect_handler=None, max_retries=3, backoff=1.0, max_backoff=30.0):
+        self.max_sessions = max_sessions
+        self.keepalive_interval = keepalive_interval
+        self.connect_handler = connect_handler
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sessions = OrderedDict()
+        self.lock = threading.RLock()
+        self.counters = {"hits": 0, "misses": 0, "reconnects": 0, "evictions": 0,
+                         "keepalives": 0, "keepalive_failures": 0, "connect_failures": 0}
+        self.connect_time = 0.0
+
+    def _open(self, device):
+        connect_handler = self.connect_handler
+        if connect_handler is None:
+            from netmiko import ConnectHandler
+            connect_handler = ConnectHandler
+
+        delay = self.backoff
+        for attempt in range(self.max_retries):
+            start = time.monotonic()
+            try:
+                connection = connect_handler(**device)
+                connection.enable()
+                self.connect_time += time.monotonic() - start
+                return connection
+            except Exception:
+                self.counters["connect_failures"] += 1
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            return connection.is_alive()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.disconnect()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _identity(device):
+        # Timing options such as read timeouts change after calibration; only the login decides if a session fits
+        return tuple(device.get(key) for key in ("device_type", "host", "username", "password", "secret"))
+
+    def get(self, device):
+        host = device["host"]
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is not None and self._identity(session["device"]) == self._identity(device):
+                self.sessions.move_to_end(host)
+                # Reconnects use the latest options
+                session["device"] = dict(device)
+                if self._is_alive(session["connection"]):
+                    self.counters["hits"] += 1
+                    session["last_used"] = time.monotonic()
+                    return session["connection"]
+                self.counters["reconnects"] += 1
+                self._close(session["connection"])
+            else:
+                self.counters["misses"] += 1
+                if session is not None:
+                    self._close(session["connection"])
+
+            connection = self._open(device)
+            self.sessions[host] = {"device": dict(device), "connection": connection, "last_used": time.monotonic()}
+            self.sessions.move_to_end(host)
+            while len(self.sessions) > self.max_sessions:
+                _, evicted = self.sessions.popitem(last=False)
+                self._close(evicted["connection"])
+                self.counters["evictions"] += 1
+            return connection
+
+    def keepalive(self):
+        # Call periodically from the thread that owns the sessions, since Netmiko sessions are not thread safe
+        now = time.monotonic()
+        with self.lock:
+            for host, session in list(self.sessions.items()):
+                if now - session["last_used"] < self.keepalive_interval:
+                    continue
+                self.counters["keepalives"] += 1
+                if self._is_alive(session["connection"]):
+                    session["last_used"] = now
+                    continue
+                self.counters["keepalive_failures"] += 1
+                self._close(session["connection"])
+                try:
+                    session["connection"] = self._open(session["device"])
+                    session["last_used"] = time.monotonic()
+                    self.counters["reconnects"] += 1
+                except Exception:
+                    del self.sessions[host]
+
+    def connection_for(self, host):
+        with self.lock:
+            session = self.sessions.get(host)
+            return session["connection"] if session else None
+
+    def release(self, host):
+        # Closes the host's session for good; callers that may come back leave it in the pool instead
+        with self.lock:
+            session = self.sessions.pop(host, None)
+        if session is not None:
+            self._close(session["connection"])
+
+    def close_all(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            self._close(session["connection"])
+
+    def metrics(self):
+        with self.lock:
+            metrics = dict(self.counters)
+            metrics["open_sessions"] = len(self.sessions)
+            metrics["hosts"] = list(self.sessions)
+            metrics["connect_time"] = self.connect_time
+            lookups = metrics["hits"] + metrics["misses"]
+            metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+            return metrics
+
+
+def format_metrics(metrics):
+    return (f"Sessions: {metrics['open_sessions']} open, {metrics['hits']} reused, "
+            f"{metrics['misses']} new, {metrics['reconnects']} reconnects, {metrics['evictions']} evicted")
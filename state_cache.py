@@ -0,0 +1,110 @@
+import threading
+import time
+
+# Seconds each show command stays fresh; commands not listed here are never cached
+default_ttls = {
+    "show ip interface brief": 30,
+    "show vlan brief": 60,
+    "show interfaces status": 30,
+    "show interfaces trunk": 60,
+    "show interfaces switchport": 60,
+    "show interfaces description": 60,
+    "show running-config": 300,
+}
+
+# Show commands made stale by config lines starting with each keyword
+invalidation_rules = {
+    "vlan": ("show vlan", "show interfaces trunk", "show running-config"),
+    "interface": ("show ip interface brief", "show interfaces", "show vlan", "show running-config"),
+}
+
+
+class DeviceStateCache:
+    def __init__(self, ttls=None):
+        self.ttls = dict(default_ttls if ttls is None else ttls)
+        self.entries = {}
+        # Bumped by every invalidation of a key, so a fetch that was running at the time does not store stale output
+        self.generations = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.updates = 0
+
+    def ttl_for(self, command):
+        if command in self.ttls:
+            return self.ttls[command]
+        # "show interfaces Gi0/1 switchport" uses the TTL of "show interfaces switchport"
+        words = command.split()
+        if len(words) == 4 and words[:2] == ["show", "interfaces"]:
+            return self.ttls.get(f"show interfaces {words[3]}", 0)
+        return 0
+
+    def get(self, host, command, fetch):
+        key = (host, command)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.generations.setdefault(key, 0)
+
+        output = fetch()
+        ttl = self.ttl_for(command)
+        if ttl > 0:
+            with self.lock:
+                if self.generations.get(key) == generation:
+                    self.entries[key] = (time.monotonic() + ttl, output)
+        return output
+
+    def update(self, host, command, transform, ttl=None):
+        # Edits a fresh cached output in place (e.g. from a pushed event); ttl extends its lifetime.
+        # Returns False when nothing was cached, in which case the next get() fetches as usual.
+        key = (host, command)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return False
+            expires = time.monotonic() + ttl if ttl else entry[0]
+            self.entries[key] = (expires, transform(entry[1]))
+            self.updates += 1
+            return True
+
+    def invalidate(self, host, prefixes=None):
+        with self.lock:
+            for key in self.generations:
+                if key[0] == host and (prefixes is None or key[1].startswith(prefixes)):
+                    self.generations[key] += 1
+                    if self.entries.pop(key, None) is not None:
+                        self.invalidations += 1
+
+    def invalidate_for_config(self, host, commands):
+        prefixes = set()
+        for command in commands:
+            words = command.split()
+            # "no vlan 10" stales the same output as "vlan 10"
+            if words[:1] == ["no"]:
+                words = words[1:]
+            keyword = words[0] if words else ""
+            prefixes.update(invalidation_rules.get(keyword, ()))
+        if prefixes:
+            self.invalidate(host, tuple(prefixes))
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "updates": self.updates,
+                "entries": len(self.entries),
+            }
+
+
+def format_stats(stats):
+    return (f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} entries")
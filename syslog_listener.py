@@ -0,0 +1,112 @@
+import re
+import socket
+import threading
+import time
+from collections import namedtuple
+
+# 514 needs root; point the switches' "logging host <ip> transport udp port 5514" here instead
+default_port = 5514
+
+LinkEvent = namedtuple("LinkEvent", "source interface field state")
+
+# %LINK-3-UPDOWN: Interface Gi1/0/1, changed state to down
+# %LINK-5-CHANGED: Interface Gi1/0/1, changed state to administratively down
+# %LINEPROTO-5-UPDOWN: Line protocol on Interface Gi1/0/1, changed state to up
+_link_message = re.compile(
+    rb"%(LINK|LINEPROTO)-\d-(?:UPDOWN|CHANGED): (?:Line protocol on )?Interface ([^,\s]+), "
+    rb"changed state to (up|down|administratively down)"
+)
+
+
+def parse_syslog(data, source=""):
+    match = _link_message.search(data)
+    if match is None:
+        return None
+    kind, interface, state = match.groups()
+    return LinkEvent(source, interface.decode('ascii', 'replace'),
+                     "status" if kind == b"LINK" else "protocol", state.decode('ascii'))
+
+
+def merge_events(events):
+    # Latest state per source and interface, shaped for update_ip_interface_brief:
+    # {source: {interface: {"status": ..., "protocol": ...}}}
+    merged = {}
+    for event in events:
+        change = merged.setdefault(event.source, {}).setdefault(event.interface, {})
+        change[event.field] = event.state
+        if event.field == "status":
+            # Protocol follows the link down; on link up it is left for the LINEPROTO message that follows
+            if event.state != "up":
+                change["protocol"] = "down"
+            else:
+                change.pop("protocol", None)
+    return merged
+
+
+class SyslogListener:
+    # Receives UDP syslog on a background thread and hands on_events one coalesced batch per
+    # batch_interval, so a flapping port or a burst of thousands of messages costs one UI update
+    def __init__(self, on_events, host="0.0.0.0", port=default_port, batch_interval=0.2, buffer_size=4 << 20):
+        self.on_events = on_events
+        self.batch_interval = batch_interval
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+        except OSError:
+            pass  # Keep the OS default; bursts beyond it are dropped by the kernel
+        self.socket.bind((host, port))
+        self.socket.settimeout(batch_interval)
+        self.address = self.socket.getsockname()
+        self.received = 0
+        self.matched = 0
+        self.batches = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.socket.close()
+
+    def _run(self):
+        pending = []
+        flush_at = time.monotonic() + self.batch_interval
+        while self.running:
+            try:
+                data, (source, _) = self.socket.recvfrom(65535)
+            except socket.timeout:
+                data = None
+            except OSError:
+                break
+            if data is not None:
+                self.received += 1
+                event = parse_syslog(data, source)
+                if event is not None:
+                    self.matched += 1
+                    pending.append(event)
+            if time.monotonic() >= flush_at:
+                flush_at = time.monotonic() + self.batch_interval
+                if pending:
+                    self.batches += 1
+                    batch, pending = merge_events(pending), []
+                    try:
+                        self.on_events(batch)
+                    except Exception:
+                        pass  # A failing consumer must not stop the listener
+        if pending:
+            self.on_events(merge_events(pending))
+
+    def stats(self):
+        return {"received": self.received, "matched": self.matched, "batches": self.batches}
+
+
+def format_listener_stats(stats):
+    return f"Syslog: {stats['received']} messages, {stats['matched']} port events, {stats['batches']} updates"
@@ -0,0 +1,54 @@
+import json
+
+from command_journal import CommandJournal
+from device_engine import DeviceEngine
+from fake_device import FakeSwitch, fake_connect_handler
+
+
+def test_engine_journal_replays_to_wiped_switch(tmp_path):
+    connect = fake_connect_handler(port_count=8)
+    engine = DeviceEngine(connect_handler=connect, journal_directory=str(tmp_path))
+    engine.connect("sw1")
+    engine.snapshot()
+    engine.send_config(["vlan 30", "name lab"])
+    engine.send_config(["interface GigabitEthernet1/0/2", "switchport access vlan 30"])
+    engine.close()
+
+    # The switch lost its config; a new session replays only what the journal says is missing
+    connect.switches["sw1"] = FakeSwitch("sw1", 8)
+    engine = DeviceEngine(connect_handler=connect, journal_directory=str(tmp_path))
+    engine.connect("sw1")
+    assert engine.command_history == [["vlan 30", "name lab"],
+                                      ["interface GigabitEthernet1/0/2", "switchport access vlan 30"]]
+    assert engine.apply_stored_config() == (3, 0)
+    switch = connect.switches["sw1"]
+    assert switch.vlans[30] == "lab"
+    assert switch.interfaces["GigabitEthernet1/0/2"]["lines"]["switchport access vlan"] == "switchport access vlan 30"
+    assert engine.apply_stored_config() == (0, 3)
+    engine.close()
+
+
+def test_tail_reads_across_blocks(tmp_path):
+    journal = CommandJournal("sw1", directory=str(tmp_path), compact_every=0)
+    entries = [[f"interface GigabitEthernet1/0/{i % 48 + 1}", f"description {'x' * 200} {i}"] for i in range(1000)]
+    for commands in entries:
+        journal.append(commands, commit=False)
+    journal.close()
+    assert journal.tail(3) == entries[-3:]
+    assert journal.tail(400) == entries[-400:]
+    assert journal.tail(0) == []
+
+
+def test_import_legacy_runs_once(tmp_path):
+    legacy = tmp_path / "running_config.json"
+    legacy.write_text(json.dumps([["vlan 10"], ["vlan 20", "name users"]]))
+    journal = CommandJournal("sw1", directory=str(tmp_path / "journals"))
+    assert journal.import_legacy(str(legacy)) == 2
+    assert journal.import_legacy(str(legacy)) == 0
+    journal.close()
+    assert CommandJournal("sw1", directory=str(tmp_path / "journals")).load() == [["vlan 10"], ["vlan 20", "name users"]]
+
+
+def test_host_names_are_safe_file_names(tmp_path):
+    journal = CommandJournal("10.0.0.1:22/a b", directory=str(tmp_path))
+    assert journal.journal_path == str(tmp_path / "10.0.0.1_22_a_b.jsonl")
@@ -0,0 +1,55 @@
+import pytest
+
+from config_push import TftpServer, TftpTransfer, ScpTransfer, PushError, apply_config_file, config_file_name
+from config_snapshots import config_hash
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler, fake_file_transfer
+
+
+@pytest.fixture
+def server():
+    server = TftpServer("127.0.0.1", 0).start()
+    yield server
+    server.stop()
+
+
+def engine_for(tmp_path, handler):
+    engine = DeviceEngine(connect_handler=handler, journal_directory=str(tmp_path))
+    engine.connect("sw1")
+    engine.command_history = [["vlan 10", "name users"],
+                              ["interface GigabitEthernet1/0/1", "switchport access vlan 10"]]
+    return engine
+
+
+@pytest.mark.parametrize("transfer", ["tftp", "scp"])
+def test_push_applies_and_deletes_the_file(tmp_path, server, transfer):
+    handler = fake_connect_handler(port_count=8)
+    engine = engine_for(tmp_path, handler)
+    method = TftpTransfer(server, "127.0.0.1") if transfer == "tftp" else ScpTransfer(fake_file_transfer)
+    changes, _ = engine.push_config_file(method)
+    assert changes
+    switch = handler.switches["sw1"]
+    assert switch.vlans[10] == "users"
+    assert switch.flash == {}
+    assert engine.push_config_file(method)[0] == []
+    engine.close()
+
+
+def test_leftover_file_is_overwritten(tmp_path, server):
+    handler = fake_connect_handler(port_count=8)
+    engine = engine_for(tmp_path, handler)
+    _, compiled = engine.compile_config()
+    handler.switches["sw1"].flash[config_file_name(config_hash(compiled))] = b"stale"
+    _, output = engine.push_config_file(TftpTransfer(server, "127.0.0.1"))
+    assert "[confirm]" in output
+    assert handler.switches["sw1"].vlans[10] == "users"
+    assert handler.switches["sw1"].flash == {}
+    engine.close()
+
+
+def test_missing_file_is_an_error(tmp_path):
+    handler = fake_connect_handler(port_count=8)
+    engine = engine_for(tmp_path, handler)
+    with pytest.raises(PushError, match="No such file"):
+        apply_config_file(engine.connection, "cim-missing.cfg")
+    engine.close()
@@ -0,0 +1,98 @@
+from command_journal import CommandJournal
+from config_replay import compact_history, compile_config, desired_commands, missing_commands
+from fake_device import FakeDevice
+
+history = [
+    ["vlan 10", "name users"],
+    ["vlan 20"],
+    ["interface GigabitEthernet1/0/1", "switchport mode access", "switchport access vlan 10"],
+    ["interface GigabitEthernet1/0/1", "switchport access vlan 20"],
+    ["interface range GigabitEthernet1/0/2 - 3", "shutdown"],
+    ["interface GigabitEthernet1/0/3", "no shutdown"],
+    ["vlan 10", "name staff"],
+]
+
+
+def test_compact_history_keeps_last_setting():
+    state = compact_history(history)
+    assert state["vlans"] == {"10": "staff", "20": None}
+    assert list(state["interfaces"]["GigabitEthernet1/0/1"].values()) == ["switchport mode access",
+                                                                         "switchport access vlan 20"]
+    assert list(state["interfaces"]["GigabitEthernet1/0/2"].values()) == ["shutdown"]
+    assert list(state["interfaces"]["GigabitEthernet1/0/3"].values()) == ["no shutdown"]
+
+
+def test_missing_commands_against_fake_device():
+    device = FakeDevice("sw1", port_count=8)
+    state = compact_history(history)
+    commands, skipped = missing_commands(state, device.send_command("show running-config"),
+                                         device.send_command("show vlan brief"))
+    # Gi1/0/3 is not shut on the device, so its "no shutdown" is already in place
+    assert skipped == 1
+    assert commands[0] == "vlan 20"
+    assert "interface GigabitEthernet1/0/3" not in commands
+
+    device.send_config_set(commands)
+    commands, skipped = missing_commands(state, device.send_command("show running-config"),
+                                         device.send_command("show vlan brief"))
+    assert commands == []
+    # Every desired line except the three interface headers is now skipped
+    assert skipped == len(desired_commands(state)) - 3
+
+
+def test_journal_compaction_keeps_state(tmp_path):
+    journal = CommandJournal("sw1", directory=str(tmp_path), compact_every=4)
+    for commands in history:
+        journal.append(commands)
+    # The seventh append is past one compaction; only the entries since are left in the journal
+    assert journal.entries_since_snapshot == 3
+    journal.close()
+
+    reopened = CommandJournal("sw1", directory=str(tmp_path))
+    assert compact_history(reopened.load()) == compact_history(history)
+    assert reopened.tail(1) == [history[-1]]
+
+
+def test_journal_skips_torn_line(tmp_path):
+    journal = CommandJournal("sw1", directory=str(tmp_path))
+    journal.append(history[0])
+    journal.close()
+    with open(journal.journal_path, 'a') as f:
+        f.write('["vlan 30", "na')
+    assert CommandJournal("sw1", directory=str(tmp_path)).load() == [history[0]]
+
+
+def test_no_vlan_cancels_earlier_vlan():
+    state = compact_history([["vlan 100", "name lab"], ["vlan 200"], ["no vlan 100"]])
+    assert state["vlans"] == {"200": None}
+    assert desired_commands(state) == ["vlan 200", "no vlan 100"]
+
+    device = FakeDevice("sw1", port_count=8)
+    device.send_config_set(["vlan 100", "name lab"])
+    commands, _ = missing_commands(state, device.send_command("show running-config"),
+                                   device.send_command("show vlan brief"))
+    assert commands == ["vlan 200", "no vlan 100"]
+    device.send_config_set(commands)
+    assert "lab" not in device.send_command("show vlan brief")
+    assert missing_commands(state, device.send_command("show running-config"),
+                            device.send_command("show vlan brief"))[0] == []
+
+    # Recreating the VLAN afterwards drops the negation again
+    state = compact_history([["no vlan 100"], ["vlan 100"]])
+    assert state["vlans"] == {"100": None}
+    assert state["negations"] == {}
+
+
+def test_port_security_mac_negation_shares_key():
+    mac = "switchport port-security mac-address 0011.2233.4455"
+    state = compact_history([["interface GigabitEthernet1/0/1", mac],
+                             ["interface GigabitEthernet1/0/1", f"no {mac}"]])
+    assert list(state["interfaces"]["GigabitEthernet1/0/1"].values()) == [f"no {mac}"]
+
+    device = FakeDevice("sw1", port_count=8)
+    device.send_config_set(["interface GigabitEthernet1/0/1", mac])
+    running = device.send_command("show running-config")
+    assert missing_commands(state, running)[0] == ["interface GigabitEthernet1/0/1", f"no {mac}"]
+    compiled = compile_config(running, state)
+    assert mac not in compiled
+    assert "interface GigabitEthernet1/0/1" in compiled
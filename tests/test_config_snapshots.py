@@ -0,0 +1,40 @@
+from config_replay import compile_config
+from config_snapshots import SnapshotStore, parse_sections, diff_sections
+
+banner_config = """hostname sw1
+!
+banner motd ^C
+Authorized access only
+!
+vlan 10 is not a section
+^C
+!
+interface GigabitEthernet1/0/1
+ description uplink
+!
+end
+"""
+
+
+def test_torn_index_line_keeps_later_entries(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.capture("sw1", "hostname sw1\n")
+    with open(store.index_path, 'a') as f:
+        f.write('{"host":"sw2","ha')
+    store.capture("sw3", "hostname sw3\n")
+    store.capture("sw4", "hostname sw4\n")
+    assert [entry["host"] for entry in SnapshotStore(str(tmp_path)).history()] == ["sw1", "sw3", "sw4"]
+
+
+def test_banner_text_is_not_split_into_sections():
+    sections = parse_sections(banner_config)
+    assert list(sections) == ["hostname sw1", "banner motd ^C", "interface GigabitEthernet1/0/1", "end"]
+    assert sections["banner motd ^C"][-1] == "^C"
+
+
+def test_compiled_banner_is_unchanged():
+    state = {"vlans": {}, "interfaces": {"GigabitEthernet1/0/1": {"shutdown": "shutdown"}}}
+    compiled = compile_config(banner_config, state)
+    assert "banner motd ^C\nAuthorized access only\n!\nvlan 10 is not a section\n^C\n" in compiled
+    changes = diff_sections(parse_sections(banner_config), parse_sections(compiled))
+    assert changes == [("interface GigabitEthernet1/0/1", [], ["shutdown"], "changed")]
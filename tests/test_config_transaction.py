@@ -0,0 +1,48 @@
+from config_transaction import ConfigTransaction
+from device_engine import DeviceEngine
+
+
+def test_merged_shares_interface_line():
+    transaction = ConfigTransaction()
+    transaction.stage(["interface Gi1/0/1", "switchport mode access"])
+    transaction.stage(["interface Gi1/0/1", "switchport access vlan 10"])
+    transaction.stage(["interface Gi1/0/2", "shutdown"])
+    assert transaction.merged() == ["interface Gi1/0/1", "switchport mode access", "switchport access vlan 10",
+                                    "interface Gi1/0/2", "shutdown"]
+
+
+def test_merged_does_not_merge_after_other_context():
+    transaction = ConfigTransaction()
+    transaction.stage(["interface Gi1/0/1", "shutdown"])
+    transaction.stage(["vlan 10", "name users"])
+    transaction.stage(["interface Gi1/0/1", "no shutdown"])
+    assert transaction.merged().count("interface Gi1/0/1") == 2
+
+
+def test_merged_keeps_every_range_block():
+    # Six non-contiguous ports need two "interface range" blocks (at most five ranges each); the second change
+    # must reach both blocks, not only the one that was last in the previous fragment
+    ports = [f"GigabitEthernet1/0/{port}" for port in (1, 3, 5, 7, 9, 11)]
+    transaction = ConfigTransaction()
+    for line in ("switchport mode access", "switchport access vlan 10"):
+        transaction.stage(DeviceEngine.interface_commands(ports, [line])[0])
+    merged = transaction.merged()
+
+    current = None
+    applied = {}
+    for line in merged:
+        if line.startswith("interface range "):
+            current = line
+        else:
+            applied.setdefault(current, []).append(line)
+    assert len(applied) == 2
+    for lines in applied.values():
+        assert lines == ["switchport mode access", "switchport access vlan 10"]
+
+
+def test_merged_skips_repeated_header_of_last_block():
+    transaction = ConfigTransaction()
+    transaction.stage(["interface range Gi1/0/1 - 5", "shutdown", "interface range Gi1/0/11", "shutdown"])
+    transaction.stage(["interface range Gi1/0/11", "description spare"])
+    assert transaction.merged() == ["interface range Gi1/0/1 - 5", "shutdown",
+                                    "interface range Gi1/0/11", "shutdown", "description spare"]
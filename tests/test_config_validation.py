@@ -0,0 +1,81 @@
+import pytest
+
+from config_validation import validate_commands
+
+interfaces = [f"GigabitEthernet1/0/{port}" for port in range(1, 9)]
+
+
+def messages(commands, **kwargs):
+    return [problem.message for problem in validate_commands(commands, **kwargs)]
+
+
+@pytest.mark.parametrize("command", [
+    "cdp run",
+    "no cdp run",
+    "lldp run",
+    "spanning-tree mode rapid-pvst",
+    "spanning-tree vlan 10 priority 4096",
+    "spanning-tree portfast default",
+    "power redundancy-mode combined",
+])
+def test_global_forms_are_accepted(command):
+    assert messages([command]) == []
+    # Also right after an interface block, which the global line ends
+    assert messages(["interface Gi1/0/1", "shutdown", command]) == []
+
+
+@pytest.mark.parametrize("command", [
+    "switchport mode access",
+    "shutdown",
+    "spanning-tree portfast",
+    "cdp enable",
+    "no lldp transmit",
+    "power inline never",
+    "spanning-tree vlan 10 cost 4",
+])
+def test_interface_forms_need_an_interface(command):
+    assert len(messages([command])) == 1
+    assert messages(["interface Gi1/0/1", command]) == []
+
+
+def test_global_line_ends_the_interface_block():
+    problems = validate_commands(["interface Gi1/0/1", "description uplink", "cdp run", "switchport mode trunk"])
+    assert [problem.line for problem in problems] == [4]
+
+
+def test_indented_lines_stay_in_the_block():
+    assert messages(["interface Gi1/0/1", " ip address 10.0.0.2 255.255.255.0", " no shutdown"]) == []
+
+
+def test_vlan_block():
+    assert messages(["vlan 10", "name users", "state active", "shutdown"]) == []
+    assert messages(["vlan 10", "exit", "name users"]) == ["'name' is only valid under a vlan"]
+    assert len(messages(["vlan 10", "name this-name-is-far-too-long-for-ios-vlans"])) == 1
+    assert messages(["vlan 1003"]) == ["VLANs 1002-1005 are reserved"]
+
+
+@pytest.mark.parametrize("command", ["vlan", "vlan abc", "vlan 10a", "vlan 5000"])
+def test_vlan_id_is_checked(command):
+    # An empty VLAN ID field in the GUI sends a bare "vlan"
+    problems = messages([command, "name users"])
+    assert len(problems) == 1
+    assert problems[0].startswith("VLAN IDs must be between 1 and 4094")
+
+
+def test_vlan_global_forms_are_accepted():
+    assert messages(["vlan internal allocation policy ascending", "vlan dot1q tag native"]) == []
+
+
+def test_values_are_checked():
+    assert len(messages(["interface Gi1/0/1", "speed 42", "duplex quarter", "switchport mode hybrid"])) == 3
+    assert len(messages(["interface Gi1/0/1", "switchport port-security mac-address 0011-2233-4455"])) == 1
+    assert messages(["interface Gi1/0/1", "switchport port-security mac-address 0011.2233.4455"]) == []
+
+
+def test_inventory_checks():
+    assert messages(["interface range Gi1/0/7 - 9", "shutdown"], interfaces=interfaces) == [
+        "no such interface on the device: Gi1/0/9"]
+    assert messages(["interface Gi1/0/1", "switchport access vlan 30"], interfaces=interfaces, vlans=[1, 10]) == [
+        "VLAN 30 does not exist on the device; create it first"]
+    assert messages(["vlan 30", "interface Gi1/0/1", "switchport access vlan 30"],
+                    interfaces=interfaces, vlans=[1, 10]) == []
@@ -0,0 +1,61 @@
+import time
+
+from counter_store import CounterStore, collect_fleet, format_report
+from fake_device import fake_connect_handler
+from ios_parsers import InterfaceCounters, InterfaceErrors
+
+start_time = 1767225600  # 2026-01-01 00:00 UTC
+
+
+def counters(octets):
+    return [InterfaceCounters("Gi1/0/1", octets, 0, 0, 0, octets // 2, 0, 0, 0)]
+
+
+def errors(fcs, xmit=0):
+    return [InterfaceErrors("Gi1/0/1", 0, fcs, xmit, 0, 0, 0)]
+
+
+def test_report_with_wall_clock_times(tmp_path):
+    store = CounterStore(str(tmp_path))
+    handler = fake_connect_handler(port_count=8)
+    hosts = [{"host": "sw1"}, {"host": "sw2"}]
+    for _ in range(2):
+        assert all(result["ok"] for result in collect_fleet(hosts, store, connect_handler=handler))
+    now = time.time()
+    report = format_report(store, now - 3600, now)
+    assert "Busiest ports" in report and "sw1" in report
+    assert store.top_ports(now - 3600, now, n=1)
+    assert store.top_ports(now - 7 * 86400, now, n=1, level="hour")
+    store.close()
+
+
+def test_rates_and_errors_per_minute(tmp_path):
+    store = CounterStore(str(tmp_path))
+    store.record("sw1", start_time, counters(0), errors(0))
+    store.record("sw1", start_time + 60, counters(7500000), errors(30))
+    assert store.series("sw1", "Gi1/0/1", "in_bps", start_time, start_time + 120) == [(start_time + 60, 1e6)]
+    assert store.series("sw1", "Gi1/0/1", "in_errors", start_time, start_time + 120) == [(start_time + 60, 30)]
+    store.close()
+
+
+def test_polls_without_errors_keep_the_error_baseline(tmp_path):
+    store = CounterStore(str(tmp_path))
+    store.record("sw1", start_time, counters(0), errors(0))
+    store.record("sw1", start_time + 60, counters(600000), errors(10))
+    # Traffic monitor polls in between carry no error counters
+    store.record("sw1", start_time + 65, counters(650000))
+    store.record("sw1", start_time + 90, counters(900000))
+    store.record("sw1", start_time + 120, counters(1200000), errors(40))
+    window = (start_time, start_time + 180)
+    assert [value for _, value in store.series("sw1", "Gi1/0/1", "in_errors", *window)] == [10, 30]
+    # The hourly rollup agrees with the minute samples
+    assert store.series("sw1", "Gi1/0/1", "in_errors", *window, level="hour") == [(start_time, 20)]
+    store.close()
+
+
+def test_error_counter_wrap_is_checked_per_counter(tmp_path):
+    store = CounterStore(str(tmp_path))
+    store.record("sw1", start_time, counters(0), [InterfaceErrors("Gi1/0/1", 0, 2 ** 32 - 5, 0, 100, 0, 0)])
+    store.record("sw1", start_time + 60, counters(0), [InterfaceErrors("Gi1/0/1", 0, 5, 0, 110, 0, 0)])
+    assert store.series("sw1", "Gi1/0/1", "in_errors", start_time, start_time + 120) == [(start_time + 60, 20)]
+    store.close()
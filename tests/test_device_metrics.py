@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from device_engine import DeviceEngine
+from device_metrics import DeviceMetrics, Histogram, InstrumentedConnection, command_label
+from fake_device import FakeDevice, fake_connect_handler
+
+
+def test_engine_calls_are_recorded(tmp_path):
+    engine = DeviceEngine(connect_handler=fake_connect_handler(port_count=8), journal_directory=str(tmp_path))
+    engine.connect("sw1")
+    for port in (1, 2, 3):
+        engine.show(f"show interfaces GigabitEthernet1/0/{port} switchport", cached=False)
+    engine.send_config(["vlan 50"], validate=False)
+
+    rows = {(row["method"], row["command"]): row for row in engine.metrics.rows()}
+    assert rows[("send_command", "show interfaces * switchport")]["count"] == 3
+    assert rows[("send_command", "show interfaces * switchport")]["bytes"] > 0
+    assert rows[("send_config_set", "config")]["count"] == 1
+    assert rows[("save_config", "write memory")]["count"] == 1
+    assert ("connect", "connect") in rows and ("enable", "enable") in rows
+    assert {row["host"] for row in rows.values()} == {"sw1"}
+    assert engine.metrics.host_latency()["sw1"].count == sum(row["count"] for row in rows.values())
+
+
+def test_errors_and_exports(tmp_path):
+    metrics = DeviceMetrics()
+    connection = InstrumentedConnection(FakeDevice("sw1", latency=0.02), metrics)
+    with pytest.raises(TimeoutError):
+        connection.send_command("show version", read_timeout=0.001)
+    connection.send_command("show version")
+    row = metrics.rows()[0]
+    assert (row["count"], row["errors"]) == (2, 1)
+    metrics.observe_queue_wait(0.003)
+
+    text = metrics.to_prometheus()
+    assert 'cisco_manager_command_errors_total{host="sw1",method="send_command",command="show version"} 1' in text
+    assert 'cisco_manager_command_seconds_bucket{host="sw1",method="send_command",command="show version",le="+Inf"} 2' in text
+    assert "cisco_manager_queue_wait_seconds_count 1" in text
+
+    metrics.write_json(str(tmp_path / "metrics.json"))
+    exported = json.loads((tmp_path / "metrics.json").read_text())
+    assert exported["commands"][0]["errors"] == 1
+    assert exported["hosts"]["sw1"]["count"] == 2
+    assert not (tmp_path / "metrics.json.tmp").exists()
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == 3.0
+    assert command_label("show interfaces Gi1/0/12 counters") == "show interfaces * counters"
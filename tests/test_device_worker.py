@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, TimeoutError
+
+from device_engine import DeviceEngine
+from device_worker import DeviceWorker
+from fake_device import fake_connect_handler
+
+
+class Dispatch:
+    # Stands in for UiDispatcher: callbacks queue up and run on the test thread when drained
+    def __init__(self):
+        self.calls = queue.Queue()
+
+    def __call__(self, callback, *args):
+        self.calls.put((callback, args))
+
+    def drain(self, count, timeout=5.0):
+        for _ in range(count):
+            callback, args = self.calls.get(timeout=timeout)
+            callback(*args)
+
+
+def test_tasks_run_in_order_on_one_thread(tmp_path):
+    dispatch = Dispatch()
+    worker = DeviceWorker(dispatch)
+    engine = DeviceEngine(connect_handler=fake_connect_handler(latency=0.005, port_count=8),
+                          journal_directory=str(tmp_path))
+    done = []
+    threads = set()
+
+    def on_done(future):
+        done.append(future.result())
+        threads.add(threading.current_thread())
+
+    worker.submit(engine.connect, "sw1", on_done=on_done)
+    worker.submit(engine.send_config, ["vlan 40"], on_done=on_done)
+    worker.submit(lambda: [vlan.vlan_id for vlan in engine.vlans()], on_done=on_done)
+    assert worker.busy
+    dispatch.drain(3)
+    # Callbacks run where the dispatcher drains, never on the worker thread
+    assert threads == {threading.current_thread()}
+    assert 40 in done[2]
+    assert not worker.busy
+    worker.stop()
+
+
+def test_timed_out_task_is_abandoned():
+    dispatch = Dispatch()
+    worker = DeviceWorker(dispatch)
+    results = []
+    release = threading.Event()
+    future = worker.submit(release.wait, 5, timeout=0.05, on_done=lambda f: results.append(f))
+    time.sleep(0.1)
+    worker.check_timeouts()
+    assert isinstance(results[0].exception(), TimeoutError)
+    assert not worker.busy
+
+    # The late result is dropped instead of reaching on_done a second time
+    release.set()
+    future.result(timeout=5)
+    dispatch.drain(1)
+    assert len(results) == 1
+    worker.stop()
+
+
+def test_cancel_all_reports_queued_tasks():
+    dispatch = Dispatch()
+    worker = DeviceWorker(dispatch)
+    release = threading.Event()
+    results = []
+    worker.submit(release.wait, 5, on_done=lambda f: results.append("first"))
+    queued = worker.submit(lambda: "never", on_done=lambda f: results.append(f))
+    worker.cancel_all()
+    assert queued.cancelled()
+    assert results[0] == "first"
+    assert isinstance(results[1].exception(), CancelledError)
+    assert not worker.busy
+    release.set()
+    worker.stop()
+    worker.thread.join(5)
+    while not dispatch.calls.empty():
+        dispatch.drain(1)
+    assert len(results) == 2
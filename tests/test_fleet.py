@@ -0,0 +1,49 @@
+from fake_device import fake_connect_handler
+from fleet import build_device, format_summary, load_hosts, plan_waves, run_fleet, staged_rollout
+
+hosts = [{"host": f"sw{i}"} for i in range(1, 8)]
+commands = ["vlan 300", "name fleet"]
+
+
+def test_run_fleet_applies_and_saves():
+    connect = fake_connect_handler(port_count=4)
+    results = run_fleet(hosts, commands, workers=4, connect_handler=connect)
+    assert sorted(result["host"] for result in results) == sorted(data["host"] for data in hosts)
+    assert all(result["ok"] for result in results)
+    for switch in connect.switches.values():
+        assert switch.vlans[300] == "fleet"
+        assert switch.saves == 1
+
+
+def test_rollout_halts_after_failed_wave():
+    connect = fake_connect_handler(port_count=4, fail_hosts=("sw4",))
+    waves = []
+    summary = staged_rollout(hosts, commands, canary_size=1, wave_size=3, on_wave=lambda index, wave: waves.append(index),
+                             connect_handler=connect)
+    # Waves: [sw1], [sw2 sw3 sw4], [sw5 sw6 sw7]; sw4 fails so the last wave never runs
+    assert waves == [0, 1]
+    assert sorted(summary["succeeded"]) == ["sw1", "sw2", "sw3"]
+    assert summary["failed"] == ["sw4"]
+    assert summary["skipped"] == ["sw5", "sw6", "sw7"]
+    assert "sw5" not in connect.switches
+    assert 300 not in connect.switches["sw4"].vlans
+    assert format_summary(summary).startswith("3 succeeded, 1 failed, 3 skipped in 2/3 waves")
+
+    summary = staged_rollout(hosts, commands, canary_size=1, wave_size=3, max_failures=1, connect_handler=connect)
+    assert (len(summary["succeeded"]), summary["skipped"]) == (6, [])
+
+
+def test_plan_waves():
+    assert plan_waves([]) == []
+    assert plan_waves([1, 2, 3, 4], canary_size=2) == [[1, 2], [3, 4]]
+    assert plan_waves([1, 2, 3, 4, 5], wave_size=2) == [[1], [2, 3], [4, 5]]
+
+
+def test_load_hosts_text_file(tmp_path):
+    path = tmp_path / "hosts.txt"
+    path.write_text("# core\nsw1\n\n  sw2  \n")
+    loaded = load_hosts(str(path), defaults={"username": "admin"})
+    assert [(data["host"], data["username"]) for data in loaded] == [("sw1", "admin"), ("sw2", "admin")]
+    assert load_hosts(str(tmp_path / "missing.txt")) == []
+    assert build_device(loaded[0]) == {"device_type": "cisco_ios", "host": "sw1", "username": "admin",
+                                       "password": "", "secret": ""}
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+import credential_store
+from fake_device import fake_connect_handler
+from fleet import run_fleet
+from host_inventory import HostInventory, parse_query
+from timing_profiles import calibrate
+
+
+@pytest.fixture
+def inventory(tmp_path, monkeypatch):
+    # Never touch the real keyring from tests
+    monkeypatch.setattr(credential_store, "_keyring", lambda: None)
+    inventory = HostInventory(str(tmp_path / "inventory.db"))
+    yield inventory
+    inventory.close()
+
+
+def test_count_matches_search(inventory):
+    for i in range(60):
+        inventory.add(f"sw-{i:02d}", description="core" if i % 7 == 0 else "", tags=("a",) if i % 2 else ("b",))
+    inventory.add("edge-sw-9", description="lobby")
+    for query in ("", "sw-1", "sw", "core", "lobby", "tag:a", "tag:a sw-0", "tag:b core", "9"):
+        assert inventory.count(query) == len(inventory.search(query, limit=1000)), query
+
+
+def test_search_order_and_paging(inventory):
+    for host in ("sw-b", "sw-a", "edge-sw", "core-1"):
+        inventory.add(host, description="uplink" if host == "core-1" else "")
+    # Prefix matches first, then substring and description matches
+    assert [data["host"] for data in inventory.search("sw")] == ["sw-a", "sw-b", "edge-sw"]
+    assert [data["host"] for data in inventory.search("sw", limit=1, offset=1)] == ["sw-b"]
+    assert [data["host"] for data in inventory.search("UPLINK")] == ["core-1"]
+    assert parse_query("tag:core tag:lab sw-") == ("sw-", ["core", "lab"])
+
+
+def test_add_replace_tags_and_delete(inventory):
+    assert inventory.add("sw1", username="admin", tags=("core", "lab"))
+    assert not inventory.add("SW1", username="other")
+    assert inventory.get("sw1")["username"] == "admin"
+    assert inventory.add("sw1", username="ops", description="closet", replace=True)
+    assert inventory.get("Sw1")["description"] == "closet"
+    assert inventory.get("sw1")["tags"] == ["core", "lab"]
+
+    inventory.set_tags("sw1", ["edge"])
+    inventory.add("sw2", tags=("edge",))
+    assert inventory.tags() == [("edge", 2)]
+    assert [data["host"] for data in inventory.hosts("edge")] == ["sw1", "sw2"]
+
+    assert inventory.delete("sw1")
+    assert not inventory.delete("sw1")
+    assert inventory.tags() == [("edge", 1)]
+    assert len(inventory) == 1
+
+
+def test_import_json_once(inventory, tmp_path):
+    path = tmp_path / "saved_inputs.json"
+    path.write_text(json.dumps([{"host": "sw1", "username": "admin", "password": "pw", "tags": ["core"]},
+                                {"host": "sw1"}, {"host": " "}]))
+    # Without a keyring the password is dropped rather than stored
+    assert inventory.import_json(str(path)) == (1, 1, 0)
+    assert inventory.import_json(str(path)) == (0, 0, 0)
+    assert inventory.hosts() == [{"host": "sw1", "username": "admin", "device_type": "cisco_ios", "description": "",
+                                  "updated": inventory.get("sw1")["updated"], "timing": None,
+                                  "password": "", "secret": ""}]
+
+
+def test_timing_profile_used_by_fleet(inventory):
+    inventory.add("sw1", tags=("lab",))
+    inventory.add("sw2", tags=("lab",))
+    profile = calibrate([0.01, 0.02])
+    assert inventory.set_timing("sw1", profile)
+    assert not inventory.set_timing("sw9", profile)
+
+    seen = []
+    connect = fake_connect_handler(port_count=4)
+
+    def recording_connect(**device):
+        seen.append((device["host"], device.get("fast_cli")))
+        return connect(**device)
+
+    hosts = inventory.hosts("lab")
+    assert hosts[0]["timing"] == profile
+    results = run_fleet(hosts, ["vlan 77"], connect_handler=recording_connect)
+    assert all(result["ok"] for result in results)
+    assert sorted(seen) == [("sw1", True), ("sw2", None)]
+    assert connect.switches["sw2"].vlans[77] == "VLAN0077"
@@ -0,0 +1,60 @@
+import pytest
+
+from device_engine import DeviceEngine
+from fake_device import FakeDevice, interface_names
+from interface_range import (group_interface_ranges, expand_range_spec, expand_selection, build_range_commands,
+                             parse_range_echo)
+
+interfaces = interface_names(52)
+
+
+def test_contiguous_ports_form_one_range():
+    blocks = group_interface_ranges([f"GigabitEthernet1/0/{port}" for port in (3, 1, 2, 4, 10)])
+    assert blocks == [("GigabitEthernet1/0/1 - 4, GigabitEthernet1/0/10",
+                       [f"GigabitEthernet1/0/{port}" for port in (1, 2, 3, 4, 10)])]
+
+
+def test_at_most_five_ranges_per_block():
+    ports = [f"GigabitEthernet1/0/{port}" for port in (1, 3, 5, 7, 9, 11)]
+    blocks = group_interface_ranges(ports)
+    assert [len(members) for _, members in blocks] == [5, 1]
+    assert blocks[1][0] == "GigabitEthernet1/0/11"
+
+
+def test_ranges_do_not_cross_stack_members():
+    blocks = group_interface_ranges(["GigabitEthernet1/0/48", "GigabitEthernet2/0/1", "GigabitEthernet2/0/2"])
+    assert blocks[0][0] == "GigabitEthernet1/0/48, GigabitEthernet2/0/1 - 2"
+
+
+def test_range_spec_round_trip():
+    ports = [f"GigabitEthernet1/0/{port}" for port in (1, 2, 3, 8, 20, 21)] + ["GigabitEthernet2/0/4"]
+    for spec, members in group_interface_ranges(ports):
+        assert expand_range_spec(spec) == members
+
+
+def test_expand_selection():
+    assert expand_selection("Gi1/0/1-3, Gi2/0/4", interfaces) == [
+        "GigabitEthernet1/0/1", "GigabitEthernet1/0/2", "GigabitEthernet1/0/3", "GigabitEthernet2/0/4"]
+    descriptions = {"GigabitEthernet1/0/5": "AP-lobby", "GigabitEthernet1/0/6": "desk"}
+    assert expand_selection("desc:^AP-", interfaces, descriptions) == ["GigabitEthernet1/0/5"]
+    with pytest.raises(ValueError):
+        expand_selection("bogus!", interfaces)
+
+
+def test_range_push_on_fake_device():
+    device = FakeDevice("sw1", port_count=52)
+    ports = [f"GigabitEthernet1/0/{port}" for port in (1, 2, 3, 5, 7, 9, 11)] + ["GigabitEthernet2/0/3"]
+    commands, blocks = DeviceEngine.interface_commands(ports, ["description range-test"])
+    results = parse_range_echo(device.send_config_set(commands), blocks)
+    assert results == {port: None for port in ports}
+    assert all(device.switch.interfaces[port]["lines"] for port in ports)
+    assert not device.switch.interfaces["GigabitEthernet1/0/4"]["lines"]
+
+
+def test_range_errors_map_to_their_block():
+    device = FakeDevice("sw1", port_count=8)
+    blocks = [("GigabitEthernet1/0/1 - 2", ["GigabitEthernet1/0/1", "GigabitEthernet1/0/2"]),
+              ("GigabitEthernet1/0/9", ["GigabitEthernet1/0/9"])]
+    results = parse_range_echo(device.send_config_set(build_range_commands(blocks, ["shutdown"])), blocks)
+    assert results["GigabitEthernet1/0/1"] is None
+    assert results["GigabitEthernet1/0/9"].startswith("%")
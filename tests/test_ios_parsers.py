@@ -0,0 +1,84 @@
+from fake_device import FakeDevice, generate_ip_interface_brief
+from ios_parsers import (parse_ip_interface_brief, parse_vlan_brief, parse_interfaces_status,
+                         parse_interfaces_counters, parse_interfaces_counters_errors, parse_mac_address_table,
+                         parse_interfaces_description, parse_ip_arp, update_ip_interface_brief)
+
+
+def device(port_count=12):
+    return FakeDevice("sw1", port_count=port_count)
+
+
+def test_ip_interface_brief():
+    records = parse_ip_interface_brief(generate_ip_interface_brief(12))
+    assert len(records) == 13
+    assert records[0].interface == "Vlan1" and records[0].ip_address == "10.0.0.1"
+    assert records[1].interface == "GigabitEthernet1/0/1"
+    assert (records[1].status, records[1].protocol) == ("up", "up")
+    assert (records[3].status, records[3].protocol) == ("administratively down", "down")
+
+
+def test_ip_interface_brief_follows_shutdown():
+    connection = device()
+    connection.send_config_set(["interface GigabitEthernet1/0/2", "shutdown"])
+    records = {r.interface: r for r in parse_ip_interface_brief(connection.send_command("show ip interface brief"))}
+    assert records["GigabitEthernet1/0/2"].status == "administratively down"
+
+
+def test_update_ip_interface_brief():
+    output = device().send_command("show ip interface brief")
+    updated = update_ip_interface_brief(output, {"GigabitEthernet1/0/1": {"status": "down"}})
+    records = {r.interface: r for r in parse_ip_interface_brief(updated)}
+    assert (records["GigabitEthernet1/0/1"].status, records["GigabitEthernet1/0/1"].protocol) == ("down", "down")
+    assert records["GigabitEthernet1/0/2"] == {r.interface: r for r in parse_ip_interface_brief(output)}["GigabitEthernet1/0/2"]
+
+
+def test_vlan_brief_wraps_port_lists():
+    connection = device()
+    connection.send_config_set(["vlan 10", "name users"])
+    vlans = {vlan.vlan_id: vlan for vlan in parse_vlan_brief(connection.send_command("show vlan brief"))}
+    assert vlans[10].name == "users"
+    assert vlans[10].ports == ()
+    # Twelve ports print four per line over three lines
+    assert len(vlans[1].ports) == 12
+    assert vlans[1].ports[-1] == "Gi1/0/12"
+
+
+def test_interfaces_status_and_description():
+    connection = device()
+    status = parse_interfaces_status(connection.send_command("show interfaces status"))
+    assert len(status) == 12
+    assert status[1].interface == "Gi1/0/2" and status[1].name == "desk-1" and status[1].status == "notconnect"
+    assert status[0].name == ""
+    descriptions = parse_interfaces_description(connection.send_command("show interfaces description"))
+    assert descriptions[0].description == "AP-0"
+    assert descriptions[2].status == "admin down" and descriptions[2].description == ""
+
+
+def test_interfaces_counters_merges_in_and_out_tables():
+    counters = parse_interfaces_counters(device().send_command("show interfaces counters"))
+    assert len(counters) == 12
+    first = counters[0]
+    assert first.interface == "Gi1/0/1"
+    assert (first.in_octets, first.in_ucast) == (200000, 2000)
+    assert (first.out_octets, first.out_ucast) == (160000, 1600)
+
+
+def test_interfaces_counters_errors():
+    connection = device()
+    connection.switch.counter_tick = 5
+    errors = parse_interfaces_counters_errors(connection.send_command("show interfaces counters errors"))
+    assert len(errors) == 12
+    assert errors[0].fcs == 5 and errors[1].fcs == 0
+    assert parse_interfaces_counters_errors("") == []
+
+
+def test_mac_address_table_and_arp():
+    connection = device()
+    macs = parse_mac_address_table(connection.send_command("show mac address-table"))
+    assert len(macs) == 12
+    assert macs[1] == (2, "0011.0000.0001", "DYNAMIC", "Gi1/0/2")
+    arp = parse_ip_arp(connection.send_command("show ip arp"))
+    assert len(arp) == 13
+    assert arp[0].ip_address == "10.0.0.1" and arp[0].age == "-"
+    # The ARP entry of a host matches its MAC table entry
+    assert arp[2].mac == macs[1].mac
@@ -0,0 +1,52 @@
+import pytest
+
+from fake_device import fake_connect_handler
+from mac_index import MacIndex, collect_fleet, normalize_mac
+
+hosts = [{"host": "sw1"}, {"host": "sw2"}]
+
+
+def test_collect_and_locate(tmp_path):
+    index = MacIndex(str(tmp_path / "mac_index.db"))
+    results = collect_fleet(hosts, index, connect_handler=fake_connect_handler(port_count=8))
+    assert sorted(result["host"] for result in results) == ["sw1", "sw2"]
+    assert all(result["ok"] for result in results)
+
+    locations = index.locate("00:11:00:00:00:03")
+    assert [(location.host, location.interface, location.vlan) for location in locations] == [
+        ("sw1", "Gi1/0/4", 4), ("sw2", "Gi1/0/4", 4)]
+    assert index.lookup("10.4.0.3") == ("0011.0000.0003", locations)
+    assert index.ips_for("0011.0000.0003") == ["10.4.0.3"]
+    assert index.suggest_sticky_macs("sw1", "GigabitEthernet1/0/4") == ["0011.0000.0003"]
+    stats = index.stats()
+    index.close()
+
+    # The copy in SQLite answers the same after a restart
+    reopened = MacIndex(str(tmp_path / "mac_index.db"))
+    assert reopened.stats() == stats
+    assert reopened.locate("0011.0000.0003") == locations
+    reopened.close()
+
+
+def test_refresh_skips_recent_hosts_and_failures():
+    index = MacIndex(":memory:")
+    connect = fake_connect_handler(port_count=4, fail_hosts=("sw2",))
+    results = collect_fleet(hosts, index, connect_handler=connect)
+    assert {result["host"]: result["ok"] for result in results} == {"sw1": True, "sw2": False}
+    assert index.stats()["hosts"] == 1
+    # Only the host that failed is still stale
+    assert [result["host"] for result in collect_fleet(hosts, index, max_age=3600, connect_handler=connect)] == ["sw2"]
+
+
+def test_update_replaces_only_that_host():
+    index = MacIndex(":memory:")
+    collect_fleet(hosts, index, connect_handler=fake_connect_handler(port_count=4))
+    index.update_host("sw1", [], [])
+    assert [location.host for location in index.locate("0011.0000.0001")] == ["sw2"]
+    assert index.lookup("10.2.0.1")[1][0].host == "sw2"
+
+
+def test_normalize_mac():
+    assert normalize_mac("00-11-22-33-44-55") == normalize_mac("0011.2233.4455") == "0011.2233.4455"
+    with pytest.raises(ValueError):
+        normalize_mac("0011.2233")
@@ -0,0 +1,46 @@
+from device_engine import DeviceEngine
+from fake_device import FakeDevice, fake_connect_handler
+from output_stream import OutputSpool, stream_command
+
+
+def test_stream_matches_send_command():
+    device = FakeDevice("sw1", port_count=48, chunk_size=100)
+    expected = device.send_command("show running-config")
+    chunks = []
+    total = stream_command(device, "show running-config", chunks.append, timeout=5, poll_interval=0)
+    # Whole lines only, without the echoed command or the prompt
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert "".join(chunks) == expected + "\n"
+    assert total == len(expected) + 1
+    assert len(chunks) > 1
+
+
+def test_engine_stream_into_spool(tmp_path):
+    engine = DeviceEngine(connect_handler=fake_connect_handler(port_count=48), journal_directory=str(tmp_path))
+    engine.connect("sw1")
+    spool = OutputSpool(directory=str(tmp_path), block_size=256)
+    engine.stream("show running-config", spool.append, timeout=5)
+    lines = engine.show("show running-config", cached=False).split("\n")
+    assert spool.line_count() == len(lines)
+    assert spool.lines(0, 3) == lines[:3]
+    assert spool.lines(len(lines) - 2, len(lines) + 5) == lines[-2:]
+    assert [row["count"] for row in engine.metrics.rows() if row["method"] == "stream"] == [1]
+
+    target = lines.index("interface GigabitEthernet1/0/40")
+    assert spool.search("gigabitethernet1/0/40") == target
+    assert spool.search("GigabitEthernet1/0/40", ignore_case=False, start=target + 1) is None
+    assert spool.search("hostname sw1", start=target, backwards=True) == lines.index("hostname sw1")
+
+    spool.save(str(tmp_path / "run.txt"))
+    assert (tmp_path / "run.txt").read_text() == "\n".join(lines) + "\n"
+    spool.close()
+
+
+def test_spool_partial_lines(tmp_path):
+    spool = OutputSpool(directory=str(tmp_path))
+    spool.append("first\nsec")
+    assert spool.line_count() == 2
+    spool.append("ond\nthird\n")
+    assert spool.line_count() == 3
+    assert spool.lines(0, 10) == ["first", "second", "third"]
+    spool.close()
@@ -0,0 +1,64 @@
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler
+from session_pool import SessionPool
+
+
+def engine_with(connect, tmp_path):
+    engine = DeviceEngine(connect_handler=connect, journal_directory=str(tmp_path))
+    engine.session_pool.backoff = 0
+    return engine
+
+
+def test_reconnect_after_disconnect_reuses_session(tmp_path):
+    engine = engine_with(fake_connect_handler(), tmp_path)
+    first = engine.connect("sw1", "admin", "pw")
+    engine.disconnect()
+    assert engine.connection is None
+    assert engine.connect("sw1", "admin", "pw") is first
+    metrics = engine.session_pool.metrics()
+    assert (metrics["hits"], metrics["misses"]) == (1, 1)
+
+
+def test_timing_profile_does_not_miss_pool(tmp_path):
+    engine = engine_with(fake_connect_handler(), tmp_path)
+    first = engine.connect("sw1", "admin", "pw")
+    timing = engine.calibrate_timing(probes=2)
+    assert engine.connect("sw1", "admin", "pw", timing=timing) is first
+    # A different login is a different session
+    assert engine.connect("sw1", "other", "pw", timing=timing) is not first
+    assert engine.session_pool.metrics()["misses"] == 2
+
+
+def test_lost_session_clears_connection(tmp_path):
+    connect = fake_connect_handler()
+    state = {"down": False}
+
+    def flaky(**device):
+        if state["down"]:
+            raise ConnectionError("unreachable")
+        return connect(**device)
+
+    engine = engine_with(flaky, tmp_path)
+    engine.session_pool.keepalive_interval = 0
+    engine.connect("sw1")
+    engine.connection.disconnect()
+    state["down"] = True
+    assert engine.keepalive() == "sw1"
+    assert engine.connection is None
+    assert engine.session_pool.metrics()["keepalive_failures"] == 1
+
+    # Once the host is back, the keepalive replaces a dead session and the engine follows it
+    state["down"] = False
+    old = engine.connect("sw1")
+    old.disconnect()
+    assert engine.keepalive() is None
+    assert engine.connection is not old
+    assert engine.connection.is_alive()
+
+
+def test_lru_eviction_closes_oldest():
+    pool = SessionPool(max_sessions=2, connect_handler=fake_connect_handler())
+    sessions = [pool.get({"host": host}) for host in ("sw1", "sw2", "sw3")]
+    assert list(pool.sessions) == ["sw2", "sw3"]
+    assert not sessions[0].is_alive()
+    assert pool.metrics()["evictions"] == 1
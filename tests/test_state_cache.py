@@ -0,0 +1,29 @@
+from state_cache import DeviceStateCache
+
+
+def test_hit_after_fetch():
+    cache = DeviceStateCache()
+    assert cache.get("sw1", "show vlan brief", lambda: "first") == "first"
+    assert cache.get("sw1", "show vlan brief", lambda: "second") == "first"
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidation_during_fetch_discards_the_result():
+    cache = DeviceStateCache()
+
+    def fetch():
+        # A config push lands while the show command is still running
+        cache.invalidate_for_config("sw1", ["vlan 10"])
+        return "stale"
+
+    assert cache.get("sw1", "show vlan brief", fetch) == "stale"
+    assert cache.get("sw1", "show vlan brief", lambda: "fresh") == "fresh"
+
+
+def test_no_lines_invalidate_like_their_positive_form():
+    cache = DeviceStateCache()
+    cache.get("sw1", "show vlan brief", lambda: "with vlan 10")
+    cache.get("sw1", "show interfaces status", lambda: "status")
+    cache.invalidate_for_config("sw1", ["no vlan 10"])
+    assert cache.get("sw1", "show vlan brief", lambda: "without vlan 10") == "without vlan 10"
+    assert cache.get("sw1", "show interfaces status", lambda: "refetched") == "status"
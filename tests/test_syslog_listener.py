@@ -0,0 +1,45 @@
+import queue
+
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler, syslog_message
+from syslog_listener import LinkEvent, SyslogListener, merge_events, parse_syslog
+
+
+def test_shutdown_on_device_reaches_listener(tmp_path):
+    batches = queue.Queue()
+    listener = SyslogListener(batches.put, host="127.0.0.1", port=0, batch_interval=0.05).start()
+    try:
+        connect = fake_connect_handler(port_count=8, syslog_target=listener.address)
+        engine = DeviceEngine(connect_handler=connect, journal_directory=str(tmp_path))
+        engine.connect("sw1")
+        engine.snapshot()
+        # Someone shuts the port from the console; the switch reports it by syslog
+        connect.switches["sw1"].set_shutdown("GigabitEthernet1/0/3", True)
+        batch = batches.get(timeout=5)
+        while batch.get("127.0.0.1", {}).get("GigabitEthernet1/0/3", {}).get("protocol") is None:
+            batch = batches.get(timeout=5)
+        assert batch["127.0.0.1"]["GigabitEthernet1/0/3"] == {"status": "administratively down", "protocol": "down"}
+
+        # Folded into the cached interface list without another show command
+        trips = engine.connection.round_trips
+        assert engine.apply_link_states(batch["127.0.0.1"])
+        records = engine.interfaces()
+        assert engine.connection.round_trips == trips
+        assert [record.status for record in records if record.interface == "GigabitEthernet1/0/3"] == [
+            "administratively down"]
+    finally:
+        listener.stop()
+    assert listener.stats()["matched"] == 2
+
+
+def test_parse_and_merge():
+    down = parse_syslog(syslog_message("Gi1/0/1", "status", "down"), "10.0.0.2")
+    assert down == LinkEvent("10.0.0.2", "Gi1/0/1", "status", "down")
+    assert parse_syslog(b"<189>1: %SYS-5-CONFIG_I: Configured from console", "10.0.0.2") is None
+
+    up = parse_syslog(syslog_message("Gi1/0/1", "status", "up"), "10.0.0.2")
+    protocol = parse_syslog(syslog_message("Gi1/0/1", "protocol", "up"), "10.0.0.2")
+    assert merge_events([down]) == {"10.0.0.2": {"Gi1/0/1": {"status": "down", "protocol": "down"}}}
+    # Link up leaves the protocol to the LINEPROTO message that follows
+    assert merge_events([down, up]) == {"10.0.0.2": {"Gi1/0/1": {"status": "up"}}}
+    assert merge_events([down, up, protocol]) == {"10.0.0.2": {"Gi1/0/1": {"status": "up", "protocol": "up"}}}
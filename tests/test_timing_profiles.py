@@ -0,0 +1,46 @@
+from device_engine import DeviceEngine
+from fake_device import fake_connect_handler
+from fleet import build_device
+from timing_profiles import calibrate, connect_kwargs, default_profile, format_profile, prompt_pattern
+
+
+def test_calibrate_modes():
+    fast = calibrate([0.02, 0.01, 0.03])
+    assert (fast["mode"], fast["cmd_verify"], fast["latency"]) == ("fast", False, 0.02)
+    assert fast["read_timeout"] == 2.0
+    # A slow answer or an unknown platform keeps per-line verification
+    assert calibrate([0.02, 0.9])["mode"] == "normal"
+    assert calibrate([0.02], "cisco_nxos")["mode"] == "normal"
+    assert calibrate([50.0])["read_timeout"] == 120.0
+    assert format_profile(default_profile) == "Timing: defaults (not calibrated)"
+
+
+def test_calibrated_engine_saves_round_trips(tmp_path):
+    connect = fake_connect_handler(port_count=8, netmiko_timing=True)
+    engine = DeviceEngine(connect_handler=connect, journal_directory=str(tmp_path))
+    commands = ["interface GigabitEthernet1/0/1", "description a", "speed 100", "duplex full"]
+
+    engine.connect("sw1")
+    trips = engine.connection.round_trips
+    engine.send_config(commands, save=False, validate=False)
+    engine.show("show vlan brief", cached=False)
+    default_trips = engine.connection.round_trips - trips
+
+    timing = engine.calibrate_timing(probes=3)
+    assert timing["mode"] == "fast"
+    engine.connect("sw1", timing=timing)
+    trips = engine.connection.round_trips
+    engine.send_config(commands, save=False, validate=False)
+    engine.show("show vlan brief", cached=False)
+    # The lines go in one write instead of waiting for each line's echo
+    assert engine.connection.round_trips - trips == default_trips - (len(commands) - 1)
+    assert engine.session_pool.metrics()["misses"] == 1
+
+
+def test_prompt_pattern_and_connect_options():
+    assert prompt_pattern(None) is None
+    pattern = prompt_pattern("sw1.lab")
+    assert pattern == r"(?m)^sw1\.lab[^\n]*[>#]\s*$"
+    device = build_device({"host": "sw1", "timing": calibrate([0.01])})
+    assert device["fast_cli"] is True
+    assert device["conn_timeout"] == connect_kwargs(calibrate([0.01]))["conn_timeout"] == 5.0
@@ -0,0 +1,30 @@
+from fake_device import generate_interfaces_counters
+from traffic_monitor import TrafficMonitor, counter_delta
+
+
+def counters_output(in_octets, in_ucast, in_mcast, in_bcast):
+    return (f"\nPort            InOctets    InUcastPkts    InMcastPkts    InBcastPkts\n"
+            f"Gi1/0/1         {in_octets:>10} {in_ucast:>14} {in_mcast:>14} {in_bcast:>14}\n")
+
+
+def test_counter_delta_wraps():
+    assert counter_delta(100, 250) == 150
+    assert counter_delta(2 ** 32 - 10, 5) == 15
+    assert counter_delta(2 ** 64 - 10, 5) == 15
+    assert counter_delta(1000, 5) is None
+
+
+def test_rates_from_fake_counters():
+    monitor = TrafficMonitor()
+    assert monitor.update(generate_interfaces_counters(4, 0), 0) == {}
+    rates = monitor.update(generate_interfaces_counters(4, 1), 10)
+    # Gi1/0/1 gains 100,000 octets in and 80,000 out over 10 s
+    assert rates["Gi1/0/1"]["in_bps"] == 80000
+    assert rates["Gi1/0/1"]["out_bps"] == 64000
+
+
+def test_packet_rate_survives_a_wrap_in_one_counter():
+    monitor = TrafficMonitor()
+    monitor.update(counters_output(1000, 2 ** 32 - 10, 5, 5), 0)
+    rates = monitor.update(counters_output(2000, 20, 5, 5), 10)
+    assert rates["Gi1/0/1"]["in_pps"] == 3.0
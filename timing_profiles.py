@@ -0,0 +1,68 @@
+import re
+import time
+
+# Platforms whose prompts and echo are reliable enough to skip per-line command verification
+known_good_platforms = {"cisco_ios", "cisco_xe"}
+# A device answering slower than this (worst case seen) is never put in fast mode
+fast_latency_limit = 0.5
+min_read_timeout = 2.0
+max_read_timeout = 120.0
+
+# Netmiko's own defaults; used until a device has been calibrated
+default_profile = {
+    "mode": "normal",
+    "latency": None,
+    "read_timeout": 10.0,
+    "config_read_timeout": 20.0,
+    "cmd_verify": True,
+    "calibrated": None,
+}
+
+
+def calibrate(samples, device_type="cisco_ios", fast=None):
+    # samples are observed round-trip times in seconds; timeouts scale with the slowest one so a slow
+    # switch is given time to answer and a dead session on a fast one is noticed quickly
+    samples = sorted(samples)
+    median = samples[len(samples) // 2]
+    worst = samples[-1]
+    read_timeout = round(min(max_read_timeout, max(min_read_timeout, worst * 10 + 1)), 1)
+    if fast is None:
+        fast = device_type in known_good_platforms and worst < fast_latency_limit
+    return {
+        "mode": "fast" if fast else "normal",
+        "latency": round(median, 4),
+        "read_timeout": read_timeout,
+        "config_read_timeout": read_timeout * 2,
+        "cmd_verify": not fast,
+        "calibrated": time.time(),
+    }
+
+
+def prompt_pattern(base_prompt):
+    # Matches "sw1>", "sw1#" and "sw1(config-if)#" at the start of a line, so a read returns as soon
+    # as the prompt arrives instead of Netmiko looking the prompt up again before every command
+    if not base_prompt:
+        return None
+    return rf"(?m)^{re.escape(base_prompt)}[^\n]*[>#]\s*$"
+
+
+def connect_kwargs(profile):
+    return {"fast_cli": profile["mode"] == "fast", "conn_timeout": max(5.0, profile["read_timeout"])}
+
+
+def command_kwargs(profile, prompt=None):
+    kwargs = {"read_timeout": profile["read_timeout"]}
+    if prompt:
+        kwargs["expect_string"] = prompt
+    return kwargs
+
+
+def config_kwargs(profile):
+    return {"read_timeout": profile["config_read_timeout"], "cmd_verify": profile["cmd_verify"]}
+
+
+def format_profile(profile):
+    if not profile or profile.get("latency") is None:
+        return "Timing: defaults (not calibrated)"
+    return (f"Timing: {profile['mode']} mode, {profile['latency'] * 1000:.0f} ms typical, "
+            f"read timeout {profile['read_timeout']:.0f}s{'' if profile['cmd_verify'] else ', no per-line verify'}")
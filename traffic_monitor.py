@@ -0,0 +1,102 @@
+from array import array
+
+from ios_parsers import parse_interfaces_counters
+
+
+class RingBuffer:
+    # Fixed-size array-backed history, so memory stays constant however long the monitor runs
+    def __init__(self, size):
+        self.size = size
+        self.values = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[self.index - 1]
+
+    def items(self):
+        if self.count < self.size:
+            return self.values[:self.count].tolist()
+        return (self.values[self.index:] + self.values[:self.index]).tolist()
+
+    def peak(self):
+        return max(self.items(), default=0.0)
+
+    def __len__(self):
+        return self.count
+
+
+def counter_delta(previous, current):
+    if current >= previous:
+        return current - previous
+    # A counter that went backwards either wrapped or was cleared; only a
+    # previous value near the top of the 32 or 64 bit range is treated as a wrap
+    if 2 ** 31 <= previous < 2 ** 32:
+        return 2 ** 32 - previous + current
+    if previous >= 2 ** 63:
+        return 2 ** 64 - previous + current
+    return None
+
+
+class TrafficMonitor:
+    series = ("in_bps", "out_bps", "in_pps", "out_pps")
+
+    def __init__(self, history_size=360):
+        self.history_size = history_size
+        self.previous = {}
+        self.history = {}
+
+    def update(self, output, timestamp):
+        rates = {}
+        counters = parse_interfaces_counters(output)
+        seen = set()
+        for record in counters:
+            seen.add(record.interface)
+            # The raw hardware counters, so each one gets its own wrap check before packets are summed
+            current = tuple(record[1:])
+            previous = self.previous.get(record.interface)
+            self.previous[record.interface] = (timestamp, current)
+            if previous is None or timestamp <= previous[0]:
+                continue
+
+            deltas = [counter_delta(old, new) for old, new in zip(previous[1], current)]
+            if None in deltas:
+                # Counters were cleared; the next sample starts a fresh baseline
+                continue
+            in_octets, in_ucast, in_mcast, in_bcast, out_octets, out_ucast, out_mcast, out_bcast = deltas
+            elapsed = timestamp - previous[0]
+            sample = (in_octets * 8 / elapsed, out_octets * 8 / elapsed,
+                      (in_ucast + in_mcast + in_bcast) / elapsed, (out_ucast + out_mcast + out_bcast) / elapsed)
+
+            buffers = self.history.get(record.interface)
+            if buffers is None:
+                buffers = self.history[record.interface] = {name: RingBuffer(self.history_size) for name in self.series}
+            for name, value in zip(self.series, sample):
+                buffers[name].append(value)
+            rates[record.interface] = dict(zip(self.series, sample))
+
+        # Forget interfaces that disappeared (e.g. a removed stack member)
+        for interface in list(self.previous):
+            if interface not in seen:
+                del self.previous[interface]
+                self.history.pop(interface, None)
+        return rates
+
+    def peak(self, interface, name):
+        buffers = self.history.get(interface)
+        return buffers[name].peak() if buffers else 0.0
+
+
+def format_rate(value, unit="bps"):
+    for prefix in ("", "K", "M", "G"):
+        if abs(value) < 1000:
+            return f"{value:.1f} {prefix}{unit}"
+        value /= 1000
+    return f"{value:.1f} T{unit}"
@@ -0,0 +1,69 @@
+import csv
+import io
+
+max_ranges_per_line = 20
+
+
+def parse_vlan_spec(spec):
+    # "100-399, 500 600" -> [100, 101, ..., 399, 500, 600]
+    vlans = set()
+    for part in spec.replace(",", " ").split():
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start, end = int(start), int(end)
+            if start > end:
+                start, end = end, start
+            vlans.update(range(start, end + 1))
+        else:
+            vlans.add(int(part))
+    invalid = [vlan for vlan in vlans if not 1 <= vlan <= 4094]
+    if invalid:
+        raise ValueError(f"VLAN IDs must be between 1 and 4094: {sorted(invalid)[:5]}")
+    return sorted(vlans)
+
+
+def parse_vlan_csv(text):
+    vlans = {}
+    for row in csv.reader(io.StringIO(text)):
+        if not row or not row[0].strip():
+            continue
+        if not row[0].strip().isdigit():
+            continue  # Header or comment row
+        vlan = int(row[0])
+        if not 1 <= vlan <= 4094:
+            raise ValueError(f"VLAN ID out of range: {vlan}")
+        name = row[1].strip() if len(row) > 1 else ""
+        vlans[vlan] = name or None
+    return vlans
+
+
+def compress_ranges(vlans):
+    ranges = []
+    for vlan in sorted(vlans):
+        if ranges and vlan == ranges[-1][1] + 1:
+            ranges[-1][1] = vlan
+        else:
+            ranges.append([vlan, vlan])
+    return [f"{start}-{end}" if end > start else str(start) for start, end in ranges]
+
+
+def range_commands(vlans):
+    ranges = compress_ranges(vlans)
+    return [f"vlan {','.join(ranges[i:i + max_ranges_per_line])}" for i in range(0, len(ranges), max_ranges_per_line)]
+
+
+def build_vlan_commands(requested, existing):
+    # requested: {vlan_id: name or None}; existing: {vlan_id: name} from show vlan brief
+    unnamed = []
+    commands = []
+    skipped = 0
+    for vlan, name in sorted(requested.items()):
+        if vlan in existing and (not name or existing[vlan] == name):
+            skipped += 1
+        elif name:
+            commands.extend([f"vlan {vlan}", f"name {name}"])
+        else:
+            unnamed.append(vlan)
+
+    # VLANs without names are created with range syntax, a handful of ranges per line
+    return range_commands(unnamed) + commands, len(requested) - skipped, skipped